@@ -3,26 +3,39 @@ from pathlib import Path
 import joblib
 import xgboost as xgb
 
+from src.models.model_wrappers import NativeBoosterModel, native_parity
 
-def convert_model(pkl_path: Path):
-    booster = joblib.load(pkl_path)
-    if hasattr(booster, "get_booster"):
-        booster = booster.get_booster()
+
+def convert_model(pkl_path: Path, check: bool = False, tolerance: float = 1e-5) -> bool:
+    model = joblib.load(pkl_path)
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
     out_path = pkl_path.with_suffix(".json")
     booster.save_model(str(out_path))
     print(f"Converted {pkl_path} -> {out_path}")
 
+    if not check:
+        return True
+    diff = native_parity(model, NativeBoosterModel.load(str(out_path)))
+    ok = diff <= tolerance
+    print(f"  parity max |diff| = {diff:.2e} {'OK' if ok else 'FAILED'}")
+    return ok
+
 
-def convert_directory(model_dir: Path):
+def convert_directory(model_dir: Path, check: bool = False, tolerance: float = 1e-5) -> bool:
+    ok = True
     for pkl in model_dir.glob("*_model.pkl"):
-        convert_model(pkl)
+        ok = convert_model(pkl, check, tolerance) and ok
+    return ok
 
 
 def main():
     parser = argparse.ArgumentParser(description="Convert pickled XGBoost models to JSON format")
     parser.add_argument("model_dir", help="Directory containing *_model.pkl files")
+    parser.add_argument("--check", action="store_true", help="Verify native predictions match the pickled models")
+    parser.add_argument("--tolerance", type=float, default=1e-5, help="Max allowed probability difference")
     args = parser.parse_args()
-    convert_directory(Path(args.model_dir))
+    if not convert_directory(Path(args.model_dir), args.check, args.tolerance):
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
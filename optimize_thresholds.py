@@ -9,6 +9,7 @@ import xgboost as xgb
 from sklearn.metrics import f1_score, precision_recall_curve
 from collections import defaultdict
 from src.models.xgboost_symbol_specific import prepare_symbol_data
+from src.data.dataset_store import dataset_symbols, is_dataset, read_trades
 
 
 def optimize_threshold_f1(df: pd.DataFrame, model, features: list, debug=False):
@@ -77,10 +78,15 @@ def main(data_dir: str, model_dir: str, debug: bool = False):
     all_thresholds = []
     all_f1_scores = []
     
-    for csv_file in sorted(data_dir.glob('*_trades.csv')):
-        sym = csv_file.stem.split('_')[0]
-        model_file = model_dir / f"{csv_file.stem}_model.pkl"
-        feature_file = model_dir / f"{csv_file.stem}_features.pkl"
+    # Either a partitioned Parquet dataset or a directory of *_trades.csv files
+    if is_dataset(data_dir):
+        sources = [(sym, data_dir) for sym in dataset_symbols(data_dir)]
+    else:
+        sources = [(f.stem.split('_')[0], f) for f in sorted(data_dir.glob('*_trades.csv'))]
+
+    for sym, source in sources:
+        model_file = model_dir / f"{sym}_trades_model.pkl"
+        feature_file = model_dir / f"{sym}_trades_features.pkl"
         
         if not model_file.exists():
             print(f"Model not found for {sym}, skipping")
@@ -91,7 +97,7 @@ def main(data_dir: str, model_dir: str, debug: bool = False):
         model = joblib.load(model_file)
         
         # Load and prepare data
-        df = pd.read_csv(csv_file, low_memory=False)
+        df = read_trades(source, symbols=[sym])
         
         # Prepare data to create target column from profit
         df, _ = prepare_symbol_data(df)
@@ -170,7 +176,7 @@ def main(data_dir: str, model_dir: str, debug: bool = False):
 if __name__ == '__main__':
     import argparse
     p = argparse.ArgumentParser(description='Optimize thresholds')
-    p.add_argument('data_dir', help='Directory with *_trades.csv files')
+    p.add_argument('data_dir', help='Directory with *_trades.csv files or a Parquet dataset')
     p.add_argument('model_dir', help='Directory with trained models')
     p.add_argument('--debug', action='store_true', help='Enable debug output')
     args = p.parse_args()
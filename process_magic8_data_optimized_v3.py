@@ -17,12 +17,67 @@ import logging
 from pathlib import Path
 import time
 import gc
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+# Column types for the columnar (Parquet) output
+STRING_COLUMNS = {
+    'date', 'time', 'timestamp', 'symbol', 'strategy', 'source',
+    'direction1', 'type1', 'direction2', 'type2', 'direction3', 'type3', 'direction4', 'type4',
+    'trade_description', 'source_file',
+}
+BOOL_COLUMNS = {'expired'}
+INT_COLUMNS = {'win', 'format_year'}
+
+MANIFEST_VERSION = 1
+
+
+def _process_folder_worker(source_path: str, output_path: str, parts_dir: str, folder: str) -> Dict:
+    """Parse one date folder in a worker process into a Parquet part.
+
+    Returns the part path plus the per-folder statistics the parent merges.
+    """
+    processor = Magic8DataProcessorOptimized(source_path, output_path)
+    folder = Path(folder)
+    part_path = None
+    rows = 0
+    try:
+        processor.process_folder(folder)
+        table = processor.batch_to_table(processor.current_batch)
+        rows = table.num_rows
+        part_file = Path(parts_dir) / f"{folder.name}.parquet"
+        if rows:
+            part_path = str(part_file)
+            pq.write_table(table, part_path)
+        elif part_file.exists():
+            # Folder no longer yields trades; drop the part from an earlier run
+            part_file.unlink()
+    except Exception as e:
+        logger.error(f"Error processing {folder.name}: {e}")
+        processor.quality_issues['folder_errors'].append({
+            'folder': folder.name,
+            'error': str(e)
+        })
+
+    return {
+        'folder': folder.name,
+        'part': part_path,
+        'rows': rows,
+        'quality_issues': dict(processor.quality_issues),
+        'strategy_counts': dict(processor.strategy_counts),
+        'symbol_counts': dict(processor.symbol_counts),
+        'timestamp_stats': processor.timestamp_stats,
+    }
+
+
 class Magic8DataProcessorOptimized:
     def __init__(self, source_path: str, output_path: str, batch_size: int = 1000):
         self.source_path = Path(source_path)
@@ -146,6 +201,291 @@ class Magic8DataProcessorOptimized:
         self.current_batch = []
         gc.collect()
     
+    @property
+    def arrow_schema(self) -> pa.Schema:
+        """Arrow schema for ``column_order``."""
+        fields = []
+        for col in self.column_order:
+            if col in STRING_COLUMNS:
+                fields.append(pa.field(col, pa.string()))
+            elif col in BOOL_COLUMNS:
+                fields.append(pa.field(col, pa.bool_()))
+            elif col in INT_COLUMNS:
+                fields.append(pa.field(col, pa.int64()))
+            else:
+                fields.append(pa.field(col, pa.float64()))
+        return pa.schema(fields)
+
+    def batch_to_table(self, trades: List[Dict]) -> pa.Table:
+        """Convert trades to an Arrow table ordered like :meth:`write_batch`."""
+        if not trades:
+            return self.arrow_schema.empty_table()
+        df = pd.DataFrame(trades)
+        for col in self.column_order:
+            if col not in df.columns:
+                df[col] = None
+        df['temp_datetime'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df = df.sort_values(['temp_datetime', 'symbol', 'strategy'], kind='stable')
+        return pa.Table.from_pandas(df[self.column_order], schema=self.arrow_schema, preserve_index=False)
+
+    def process_all_folders_parallel(self, workers: Optional[int] = None):
+        """Process date folders in a process pool and merge the results.
+
+        Each worker parses one folder into a Parquet part under
+        ``output_path/parts``. Parts are merged in folder order, so the
+        output is deterministic regardless of which worker finishes first,
+        and trade keys already seen in an earlier folder are dropped as
+        duplicates exactly like the serial path does.
+        """
+        folders = sorted([f for f in self.source_path.iterdir() if f.is_dir()])
+        logger.info(f"Found {len(folders)} folders to process with {workers or os.cpu_count()} workers")
+
+        results = self.parse_folders(folders, workers)
+        for result in results:
+            self.add_folder_stats(result)
+        self.merge_parts([r for r in results if r['part']])
+
+    def parse_folders(self, folders: List[Path], workers: Optional[int] = None) -> List[Dict]:
+        """Parse ``folders`` into Parquet parts and return their results in order.
+
+        ``workers=1`` parses in-process; anything else uses a process pool.
+        """
+        parts_dir = self.output_path / 'parts'
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        args = [(str(self.source_path), str(self.output_path), str(parts_dir), str(f)) for f in folders]
+
+        results = []
+        if workers == 1:
+            for i, a in enumerate(args):
+                results.append(_process_folder_worker(*a))
+                if i % 50 == 0:
+                    logger.info(f"Parsed folder {i+1}/{len(folders)}: {folders[i].name}")
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_process_folder_worker, *a) for a in args]
+            for i, future in enumerate(futures):
+                results.append(future.result())
+                if i % 50 == 0:
+                    logger.info(f"Parsed folder {i+1}/{len(folders)}: {folders[i].name}")
+        return results
+
+    def add_folder_stats(self, result: Dict):
+        """Fold one folder's worker statistics into the run totals."""
+        for issue, items in result['quality_issues'].items():
+            self.quality_issues[issue].extend(items)
+        for strategy, count in result['strategy_counts'].items():
+            self.strategy_counts[strategy] += count
+        for symbol, count in result['symbol_counts'].items():
+            self.symbol_counts[symbol] += count
+        for stat, count in result['timestamp_stats'].items():
+            self.timestamp_stats[stat] += count
+        self.folders_processed += 1
+
+    def merge_parts(self, results: List[Dict], write_csv: bool = True, csv_start: int = 0):
+        """Merge per-folder Parquet parts into the final outputs.
+
+        Writes ``magic8_trades_complete.parquet`` (one row group per folder)
+        and, unless ``write_csv`` is False, the CSV used downstream. With
+        ``csv_start > 0`` the CSV already holds the rows of the first
+        ``csv_start`` parts and only later parts are appended to it.
+
+        Each result gets ``row_start``/``row_end``: its row range in the
+        merged output after duplicate removal.
+        """
+        parquet_file = self.output_path / 'magic8_trades_complete.parquet'
+        tmp_file = parquet_file.with_suffix('.parquet.tmp')
+        writer = pq.ParquetWriter(str(tmp_file), self.arrow_schema)
+        self.first_write = csv_start == 0
+        self.total_trades_processed = 0
+        self.seen_trade_keys = set()
+        try:
+            for i, result in enumerate(results):
+                result['row_start'] = result['row_end'] = self.total_trades_processed
+                table = pq.read_table(result['part'])
+                keys = [
+                    f"{d}_{t}_{sym}_{strat}"
+                    for d, t, sym, strat in zip(
+                        table.column('date').to_pylist(),
+                        table.column('time').to_pylist(),
+                        table.column('symbol').to_pylist(),
+                        table.column('strategy').to_pylist(),
+                    )
+                ]
+                keep = []
+                for key in keys:
+                    duplicate = key in self.seen_trade_keys
+                    if duplicate:
+                        self.quality_issues['duplicates'].append({
+                            'file': result['folder'],
+                            'key': key
+                        })
+                    else:
+                        self.seen_trade_keys.add(key)
+                    keep.append(not duplicate)
+                if not all(keep):
+                    table = table.filter(pa.array(keep))
+                if table.num_rows == 0:
+                    continue
+
+                writer.write_table(table)
+                if write_csv and i >= csv_start:
+                    df = table.to_pandas()
+                    df.to_csv(
+                        self.output_file,
+                        index=False,
+                        mode='w' if self.first_write else 'a',
+                        header=self.first_write,
+                        quoting=csv.QUOTE_NONNUMERIC,
+                    )
+                    self.first_write = False
+                self.total_trades_processed += table.num_rows
+                result['row_end'] = self.total_trades_processed
+        finally:
+            writer.close()
+        os.replace(tmp_file, parquet_file)
+
+        logger.info(f"Merged {len(results)} folder parts: {self.total_trades_processed:,} trades -> {parquet_file}")
+
+    @property
+    def manifest_file(self) -> Path:
+        return self.output_path / 'manifest.json'
+
+    def load_manifest(self) -> Dict:
+        """Load the folder manifest written by :meth:`process_incremental`."""
+        if not self.manifest_file.exists():
+            return {'version': MANIFEST_VERSION, 'folders': {}}
+        with open(self.manifest_file) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            logger.warning("Manifest version changed, reprocessing all folders")
+            return {'version': MANIFEST_VERSION, 'folders': {}}
+        return manifest
+
+    def save_manifest(self, manifest: Dict):
+        tmp_file = self.manifest_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+
+    @staticmethod
+    def folder_signature(folder: Path, previous: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Return ``{file name: {size, mtime_ns, sha1}}`` for a folder's CSVs.
+
+        Files whose size and mtime match ``previous`` reuse the stored hash,
+        so unchanged folders are not reread.
+        """
+        previous = previous or {}
+        signature = {}
+        for file_path in sorted(folder.glob('*.csv')):
+            st = file_path.stat()
+            old = previous.get(file_path.name)
+            if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+                digest = old['sha1']
+            else:
+                with open(file_path, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            signature[file_path.name] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': digest}
+        return signature
+
+    @staticmethod
+    def _same_files(a: Dict[str, Dict], b: Dict[str, Dict]) -> bool:
+        return a.keys() == b.keys() and all(a[name]['sha1'] == b[name]['sha1'] for name in a)
+
+    def process_incremental(self, workers: Optional[int] = 1):
+        """Parse only new or changed folders and merge them into the dataset.
+
+        ``manifest.json`` records each folder's file signatures, its Parquet
+        part, worker statistics and row range in the merged output. Folders
+        whose files hash the same are not parsed again. When the only
+        changes are new folders after the last known one, the new rows are
+        appended to the existing CSV instead of rewriting it. Folders that
+        failed to parse are not recorded, so they are retried next run.
+        """
+        manifest = self.load_manifest()
+        known = manifest['folders']
+        folders = sorted([f for f in self.source_path.iterdir() if f.is_dir()])
+        names = {f.name for f in folders}
+        removed = sorted(set(known) - names)
+
+        signatures = {}
+        todo = []
+        for folder in folders:
+            entry = known.get(folder.name)
+            signatures[folder.name] = self.folder_signature(folder, entry and entry['files'])
+            if (
+                entry is None
+                or not self._same_files(entry['files'], signatures[folder.name])
+                or (entry['part'] and not Path(entry['part']).exists())
+            ):
+                todo.append(folder)
+
+        logger.info(
+            f"Found {len(folders)} folders: {len(todo)} new/changed, "
+            f"{len(folders) - len(todo)} unchanged, {len(removed)} removed"
+        )
+
+        parsed = {r['folder']: r for r in self.parse_folders(todo, workers)} if todo else {}
+        for name in removed:
+            part = known[name].get('part')
+            if part and Path(part).exists():
+                os.remove(part)
+
+        results = []
+        for folder in folders:
+            if folder.name in parsed:
+                result = parsed[folder.name]
+                self.add_folder_stats(result)
+            else:
+                entry = known[folder.name]
+                result = dict(
+                    entry['stats'],
+                    folder=folder.name,
+                    part=entry['part'],
+                    row_start=entry['row_start'],
+                    row_end=entry['row_end'],
+                )
+                # Reports cover the whole dataset, not just this run
+                self.add_folder_stats(result)
+            results.append(result)
+
+        # Append to the CSV when every parsed folder sorts after the known ones
+        csv_start = 0
+        merged = [r for r in results if r['part']]
+        if (
+            known
+            and not removed
+            and self.output_file.exists()
+            and all(name not in known for name in parsed)
+            and all(name > max(known) for name in parsed)
+        ):
+            csv_start = sum(1 for r in merged if r['folder'] in known)
+
+        if todo or removed or not (self.output_path / 'magic8_trades_complete.parquet').exists():
+            self.merge_parts(merged, csv_start=csv_start)
+        else:
+            logger.info("No folder changes, dataset is up to date")
+            self.total_trades_processed = max((r['row_end'] for r in merged), default=0)
+
+        manifest['folders'] = {}
+        for result in results:
+            if result['quality_issues'].get('folder_errors'):
+                # Leave failed folders out so the next run parses them again
+                logger.warning(f"Not recording {result['folder']} in the manifest: it failed to parse")
+                continue
+            manifest['folders'][result['folder']] = {
+                'files': signatures[result['folder']],
+                'part': result['part'],
+                'rows': result['rows'],
+                'row_start': result.get('row_start', 0),
+                'row_end': result.get('row_end', 0),
+                'stats': {
+                    k: result[k]
+                    for k in ('rows', 'quality_issues', 'strategy_counts', 'symbol_counts', 'timestamp_stats')
+                },
+            }
+        self.save_manifest(manifest)
+
     def process_all_folders(self):
         """Process all date folders in the source directory."""
         folders = sorted([f for f in self.source_path.iterdir() if f.is_dir()])
@@ -827,25 +1167,45 @@ class Magic8DataProcessorOptimized:
 
 def main():
     """Main execution function."""
-    # Set paths
-    source_path = "/Users/jt/magic8/magic8-accuracy-predictor/data/source"
-    output_path = "/Users/jt/magic8/magic8-accuracy-predictor/data/processed_optimized_v3"
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Process Magic8 source folders")
+    parser.add_argument("--source", default="/Users/jt/magic8/magic8-accuracy-predictor/data/source")
+    parser.add_argument("--output", default="/Users/jt/magic8/magic8-accuracy-predictor/data/processed_optimized_v3")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes; >1 parses folders in parallel into Parquet parts (0 = all cores)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only parse folders that are new or changed since the last run (see manifest.json)",
+    )
+    args = parser.parse_args()
+
     # Create processor with batch size
-    processor = Magic8DataProcessorOptimized(source_path, output_path, batch_size=5000)
+    processor = Magic8DataProcessorOptimized(args.source, args.output, batch_size=args.batch_size)
     
     # Process all data
     logger.info("Starting Magic8 data processing (optimized v3)...")
     logger.info("This version tracks delta sheet integration")
     
-    processor.process_all_folders()
+    if args.incremental:
+        processor.process_incremental(workers=args.workers or None)
+    elif args.workers == 1:
+        processor.process_all_folders()
+    else:
+        processor.process_all_folders_parallel(workers=args.workers or None)
     
     # Save final reports
     logger.info("\nSaving final analysis reports...")
     processor.save_final_reports()
     
     logger.info("\nProcessing complete!")
-    logger.info(f"Output saved to: {output_path}")
+    logger.info(f"Output saved to: {args.output}")
 
 
 if __name__ == "__main__":
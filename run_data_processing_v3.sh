@@ -12,7 +12,9 @@ echo ""
 mkdir -p data/processed_optimized_v3
 
 # Run the processor
-python process_magic8_data_optimized_v3.py
+# Pass --workers N to parse folders in parallel (also writes a Parquet copy),
+# and --incremental to only parse folders that changed since the last run
+python process_magic8_data_optimized_v3.py "$@"
 
 # Check if successful
 if [ $? -eq 0 ]; then
@@ -1,6 +1,40 @@
 #!/bin/bash
 
 echo "🚀 Starting Real-Time Prediction API"
-export PYTHONPATH="$(pwd)/src:$PYTHONPATH"
-python src/prediction_api_realtime.py
+# Repo root too: providers import shared helpers as src.*
+export PYTHONPATH="$(pwd):$(pwd)/src:$PYTHONPATH"
 
+WORKERS="${WORKERS:-1}"
+if [ "$WORKERS" -le 1 ]; then
+    python src/prediction_api_realtime.py
+    exit $?
+fi
+
+# Several workers share one market feed so there is a single IB client and
+# one warm cache; MAGIC8_MARKET_FEED makes the workers use it even when
+# performance.market_feed.enabled is false, and fail if it is missing
+export MAGIC8_MARKET_FEED=1
+echo "📡 Starting shared market feed for $WORKERS workers"
+# A segment left by a crashed run must not pass for the new feed
+rm -f /dev/shm/magic8_market_feed
+python src/market_feed.py &
+FEED_PID=$!
+trap 'kill $FEED_PID 2>/dev/null' EXIT
+
+# Without the feed every worker would quietly open its own connections
+for _ in $(seq 1 50); do
+    [ -e /dev/shm/magic8_market_feed ] && break
+    if ! kill -0 "$FEED_PID" 2>/dev/null; then
+        echo "❌ Market feed exited during startup" >&2
+        exit 1
+    fi
+    sleep 0.2
+done
+if [ ! -e /dev/shm/magic8_market_feed ] || ! kill -0 "$FEED_PID" 2>/dev/null; then
+    echo "❌ Market feed did not create /dev/shm/magic8_market_feed" >&2
+    exit 1
+fi
+
+# Models are loaded once and the workers are forked afterwards, sharing
+# the booster memory (GET /memory shows per-worker RSS and USS)
+python src/prediction_api_realtime.py --workers "$WORKERS"
@@ -3,29 +3,24 @@
 import os
 import json
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
 
+from src.data.dataset_store import read_trades, write_dataset
+
+
+def split_data_by_symbol(input_file: str, output_dir: str, dataset_dir: Optional[str] = None) -> Dict:
+    """Split aggregated data into per-symbol CSVs and return statistics.
+
+    ``input_file`` may be a CSV, a Parquet file or a partitioned dataset.
+    When ``dataset_dir`` is given the typed trades are also written there
+    as a Parquet dataset partitioned by symbol and strategy.
+    """
+    # Numeric columns that might have mixed types are coerced on load
+    df = read_trades(input_file)
+
+    if dataset_dir:
+        write_dataset(df, dataset_dir)
 
-def split_data_by_symbol(input_file: str, output_dir: str) -> Dict:
-    """Split aggregated data into per-symbol CSVs and return statistics."""
-    # Read with low_memory=False to avoid DtypeWarning
-    df = pd.read_csv(input_file, low_memory=False)
-    
-    # Convert numeric columns that might have mixed types
-    numeric_columns = ['price', 'premium', 'predicted', 'closed', 'expired', 
-                      'risk', 'reward', 'ratio', 'profit',
-                      'expected_move', 'low', 'high', 'target1', 'target2',
-                      'predicted_trades', 'closing',
-                      'strike1', 'strike2', 'strike3', 'strike4',
-                      'bid1', 'ask1', 'bid2', 'ask2', 'bid3', 'ask3', 'bid4', 'ask4',
-                      'mid1', 'mid2', 'mid3', 'mid4',
-                      'call_delta', 'put_delta', 'predicted_delta',
-                      'short_term', 'long_term', 'closing_delta']
-    
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
     symbols = df['symbol'].unique()
     os.makedirs(output_dir, exist_ok=True)
 
@@ -63,9 +58,10 @@ def split_data_by_symbol(input_file: str, output_dir: str) -> Dict:
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Split aggregated trades by symbol")
-    parser.add_argument("input_file", help="Path to aggregated CSV")
+    parser.add_argument("input_file", help="Path to aggregated CSV, Parquet file or dataset")
     parser.add_argument("output_dir", help="Directory to write symbol files")
+    parser.add_argument("--dataset", help="Also write a Parquet dataset partitioned by symbol/strategy here")
     args = parser.parse_args()
 
-    stats = split_data_by_symbol(args.input_file, args.output_dir)
+    stats = split_data_by_symbol(args.input_file, args.output_dir, args.dataset)
     print(json.dumps(stats, indent=2))
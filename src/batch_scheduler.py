@@ -0,0 +1,123 @@
+"""Time-windowed micro-batching for single-item async requests."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``submit`` calls into batched handler calls.
+
+    When no batch is in flight, items are dispatched on the next loop
+    iteration, so a lone request does not wait and only submits from the
+    same iteration are combined. While a batch is running, new items are
+    collected until it finishes, ``max_batch_size`` is reached or
+    ``timeout_ms`` has passed since the first of them, then ``handler`` is
+    awaited once with the whole list. It must return one result per item;
+    a result that is an ``Exception`` instance is raised to that caller
+    only. If the handler itself raises, every caller in the batch gets the
+    exception.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 10,
+        timeout_ms: float = 100,
+    ) -> None:
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.timeout = timeout_ms / 1000
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.items = 0
+        self.max_fill = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.monotonic()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            if self._tasks:
+                self._timer = loop.call_later(self.timeout, self._flush)
+            else:
+                self._timer = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        # Items that queued up behind this batch go out right away
+        if self._pending and not self._tasks:
+            self._flush()
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        started = time.monotonic()
+        delays = [started - queued for _, _, queued in batch]
+        self.batches += 1
+        self.items += len(batch)
+        self.max_fill = max(self.max_fill, len(batch))
+        self.total_delay += sum(delays)
+        self.max_delay = max(self.max_delay, max(delays))
+
+        try:
+            results = await self.handler([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+        except BaseException as e:
+            for _, future, _ in batch:
+                if future.done():
+                    continue
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            elif isinstance(result, BaseException):
+                future.cancel()
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Flush queued items and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Batch fill and queueing-delay statistics."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "avg_fill": round(self.items / (self.batches * self.max_batch_size), 3) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_fill,
+            "avg_queue_delay_ms": round(1000 * self.total_delay / self.items, 3) if self.items else 0.0,
+            "max_queue_delay_ms": round(1000 * self.max_delay, 3),
+        }
@@ -2,79 +2,224 @@ from __future__ import annotations
 """Simple in-memory cache manager with TTL support."""
 
 import hashlib
+import json
+import sys
 import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import numpy as np
+
 
 @dataclass
 class _CacheItem:
     data: Any
-    timestamp: float
+    expires_at: float
+    nbytes: int
+    version: int
+
+
+def _sizeof(data: Any) -> int:
+    """Cheap size estimate used for per-namespace byte limits."""
+    if isinstance(data, np.ndarray):
+        return int(data.nbytes)
+    if isinstance(data, (list, tuple)):
+        return sys.getsizeof(data) + 8 * len(data)
+    return sys.getsizeof(data)
+
+
+class TTLCache:
+    """LRU cache with a fixed TTL and amortized O(1) insert/evict.
+
+    Entries live in an ``OrderedDict`` kept in recency order for LRU
+    eviction. Because every entry in a namespace shares one TTL, expiry
+    order equals insertion order, so a deque of ``(expires_at, key,
+    version)`` lets expired entries be purged from the front without
+    scanning the whole cache.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1000, max_bytes: Optional[int] = None) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, _CacheItem]" = OrderedDict()
+        self._expiry: deque = deque()
+        self._version = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        item = self._items.get(key)
+        return item is not None and item.expires_at > time.monotonic()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        self._purge_expired(now)
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if item.expires_at <= now:
+            self._remove(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item.data
+
+    def set(self, key: str, data: Any) -> None:
+        now = time.monotonic()
+        if key in self._items:
+            self._remove(key)
+        self._version += 1
+        item = _CacheItem(data, now + self.ttl, _sizeof(data), self._version)
+        self._items[key] = item
+        self._expiry.append((item.expires_at, key, item.version))
+        self.nbytes += item.nbytes
+        self._purge_expired(now)
+        self._evict()
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._expiry.clear()
+        self.nbytes = 0
+
+    def _remove(self, key: str) -> None:
+        item = self._items.pop(key)
+        self.nbytes -= item.nbytes
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, key, version = self._expiry.popleft()
+            item = self._items.get(key)
+            if item is not None and item.version == version:
+                self._remove(key)
+                self.expired += 1
+        # Drop stale expiry records left behind by overwrites and evictions
+        if len(self._expiry) > 2 * len(self._items) + 64:
+            self._expiry = deque(
+                rec for rec in self._expiry
+                if rec[1] in self._items and self._items[rec[1]].version == rec[2]
+            )
+
+    def _evict(self) -> None:
+        while len(self._items) > self.max_size or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes and len(self._items) > 1
+        ):
+            key = next(iter(self._items))
+            self._remove(key)
+            self.evictions += 1
 
 
 class CacheManager:
     """Manage feature and prediction caches with TTL."""
 
-    def __init__(self, feature_ttl: int = 60, prediction_ttl: int = 300, max_size: int = 1000) -> None:
+    def __init__(
+        self,
+        feature_ttl: int = 60,
+        prediction_ttl: int = 300,
+        max_size: int = 1000,
+        max_bytes: Optional[int] = None,
+        market_bar_seconds: int = 60,
+    ) -> None:
         self.feature_ttl = feature_ttl
         self.prediction_ttl = prediction_ttl
         self.max_size = max_size
-        self.feature_cache: Dict[str, _CacheItem] = {}
-        self.prediction_cache: Dict[str, _CacheItem] = {}
-        self.feature_hits = 0
-        self.feature_misses = 0
-        self.prediction_hits = 0
-        self.prediction_misses = 0
+        self.namespaces: Dict[str, TTLCache] = {}
+        self.add_namespace("feature", feature_ttl, max_size, max_bytes)
+        self.add_namespace("prediction", prediction_ttl, max_size, max_bytes)
+        # Market-derived features are shared by every order on a symbol and
+        # bar; order-derived features depend only on the order itself
+        self.market_bar_seconds = market_bar_seconds
+        self.add_namespace("market", feature_ttl, max_size, max_bytes)
+        self.add_namespace("order", prediction_ttl, max_size, max_bytes)
+
+    def add_namespace(
+        self, name: str, ttl: float, max_size: int = 1000, max_bytes: Optional[int] = None
+    ) -> TTLCache:
+        """Create (or replace) a namespace with its own TTL and limits."""
+        cache = TTLCache(ttl, max_size, max_bytes)
+        self.namespaces[name] = cache
+        return cache
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.namespaces[namespace].get(key)
+
+    def set(self, namespace: str, key: str, data: Any) -> None:
+        self.namespaces[namespace].set(key, data)
+
+    @staticmethod
+    def hash_features(features: Any) -> str:
+        """Hash a feature vector via its float64 buffer."""
+        buf = np.ascontiguousarray(features, dtype=np.float64)
+        return hashlib.blake2b(buf.tobytes(), digest_size=8).hexdigest()
 
     def get_feature_key(self, symbol: str, ts: float) -> str:
         minute_ts = int(ts // 60) * 60
         return f"features_{symbol}_{minute_ts}"
 
+    def get_market_key(self, symbol: str, ts: float) -> str:
+        bar_ts = int(ts // self.market_bar_seconds) * self.market_bar_seconds
+        return f"market_{symbol}_{bar_ts}"
+
+    def get_order_key(self, symbol: str, order: Dict[str, Any], ts: Optional[float] = None) -> str:
+        # The day is part of the key because order features such as
+        # ``is_0dte`` depend on it
+        day = time.strftime("%Y-%m-%d", time.localtime(ts))
+        payload = json.dumps(order, sort_keys=True, default=str).encode()
+        digest = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        return f"order_{symbol}_{day}_{digest}"
+
     def get_prediction_key(self, symbol: str, strategy: str, features: Any) -> str:
-        feature_hash = hashlib.md5(str(features).encode()).hexdigest()[:8]
-        return f"pred_{symbol}_{strategy}_{feature_hash}"
+        return f"pred_{symbol}_{strategy}_{self.hash_features(features)}"
 
     def get_feature(self, key: str) -> Optional[Any]:
-        item = self.feature_cache.get(key)
-        if item and time.time() - item.timestamp < self.feature_ttl:
-            self.feature_hits += 1
-            return item.data
-        if item:
-            del self.feature_cache[key]
-        self.feature_misses += 1
-        return None
+        return self.get("feature", key)
 
     def set_feature(self, key: str, data: Any) -> None:
-        self.feature_cache[key] = _CacheItem(data, time.time())
-        self._evict(self.feature_cache)
+        self.set("feature", key, data)
 
     def get_prediction(self, key: str) -> Optional[Any]:
-        item = self.prediction_cache.get(key)
-        if item and time.time() - item.timestamp < self.prediction_ttl:
-            self.prediction_hits += 1
-            return item.data
-        if item:
-            del self.prediction_cache[key]
-        self.prediction_misses += 1
-        return None
+        return self.get("prediction", key)
 
     def set_prediction(self, key: str, data: Any) -> None:
-        self.prediction_cache[key] = _CacheItem(data, time.time())
-        self._evict(self.prediction_cache)
+        self.set("prediction", key, data)
+
+    def get_market(self, key: str) -> Optional[Any]:
+        return self.get("market", key)
+
+    def set_market(self, key: str, data: Any) -> None:
+        self.set("market", key, data)
+
+    def get_order(self, key: str) -> Optional[Any]:
+        return self.get("order", key)
+
+    def set_order(self, key: str, data: Any) -> None:
+        self.set("order", key, data)
+
+    @property
+    def feature_cache(self) -> TTLCache:
+        return self.namespaces["feature"]
 
-    def _evict(self, cache: Dict[str, _CacheItem]) -> None:
-        if len(cache) <= self.max_size:
-            return
-        # remove oldest 10% items
-        sorted_keys = sorted(cache, key=lambda k: cache[k].timestamp)
-        for k in sorted_keys[: max(len(cache) // 10, 1)]:
-            del cache[k]
+    @property
+    def prediction_cache(self) -> TTLCache:
+        return self.namespaces["prediction"]
 
     def stats(self) -> Dict[str, int]:
-        return {
-            "feature_hits": self.feature_hits,
-            "feature_misses": self.feature_misses,
-            "prediction_hits": self.prediction_hits,
-            "prediction_misses": self.prediction_misses,
-        }
+        stats: Dict[str, int] = {}
+        for name, cache in self.namespaces.items():
+            stats[f"{name}_hits"] = cache.hits
+            stats[f"{name}_misses"] = cache.misses
+            stats[f"{name}_evictions"] = cache.evictions
+            stats[f"{name}_expired"] = cache.expired
+            stats[f"{name}_size"] = len(cache)
+            stats[f"{name}_bytes"] = cache.nbytes
+        return stats
@@ -0,0 +1,27 @@
+"""Shared HTTP session settings for talking to Magic8-Companion."""
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+# Statuses meaning the companion has no bulk endpoint
+BULK_UNSUPPORTED = (404, 405, 501)
+
+
+def make_session(
+    timeout: float = 5,
+    pool_size: int = 20,
+    keepalive_timeout: float = 30,
+) -> aiohttp.ClientSession:
+    """Create a ClientSession with a keep-alive pool sized for the companion.
+
+    All requests go to one host, so the per-host limit is the pool size.
+    Idle connections are kept open for ``keepalive_timeout`` seconds so a
+    burst of predictions reuses them instead of reconnecting.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        limit_per_host=pool_size,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=ClientTimeout(total=timeout))
@@ -0,0 +1,127 @@
+"""Append-only on-disk store of OHLCV bars, one SQLite file per symbol/interval.
+
+The real-time API appends every bar it fetches, so after a restart only
+the gap since the last stored bar has to be requested from IB or the
+companion. ``Phase1DataPreparation.load_ibkr_data`` reads the same files,
+so live and training bars come from one place.
+
+Bars are keyed by their start time in epoch seconds (UTC). Re-appending a
+bar replaces it, which lets the still-forming last bar be updated. Files
+use WAL journaling so training reads do not block live appends.
+"""
+
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+PathLike = Union[str, Path]
+
+_UNIT_SECONDS = {'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400, 'week': 604800}
+
+
+def interval_seconds(interval: str) -> int:
+    """Seconds in an IB bar size such as ``"5 mins"`` or ``"1 day"``."""
+    match = re.fullmatch(r'\s*(\d+)\s*(sec|min|hour|day|week)s?\s*', interval)
+    if not match:
+        raise ValueError(f"Unknown bar size: {interval}")
+    return int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+def _slug(interval: str) -> str:
+    return re.sub(r'\s+', '_', interval.strip())
+
+
+class BarStore:
+    """SQLite-backed bar store under ``root``.
+
+    Args:
+        root: Directory holding ``{symbol}_{interval}.sqlite`` files
+        naive_tz: Timezone assumed for bar times without one
+    """
+
+    def __init__(self, root: PathLike = 'data/bars', naive_tz: str = 'US/Eastern') -> None:
+        self.root = Path(root)
+        self.naive_tz = naive_tz
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / f'{symbol}_{_slug(interval)}.sqlite'
+
+    def _connect(self, symbol: str, interval: str) -> sqlite3.Connection:
+        path = self.path(symbol, interval)
+        new = not path.exists()
+        if new:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        if new:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS bars ('
+                'ts INTEGER PRIMARY KEY, time TEXT, open REAL, high REAL, '
+                'low REAL, close REAL, volume REAL)'
+            )
+        return conn
+
+    def _epoch(self, value) -> int:
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize(self.naive_tz)
+        return int(ts.timestamp())
+
+    def append(self, symbol: str, interval: str, bars: Iterable[Dict]) -> int:
+        """Store ``bars`` (dicts with time/open/high/low/close/volume)."""
+        rows = [
+            (
+                self._epoch(bar['time']),
+                str(bar['time']),
+                bar['open'],
+                bar['high'],
+                bar['low'],
+                bar['close'],
+                bar.get('volume', 0),
+            )
+            for bar in bars
+        ]
+        if not rows:
+            return 0
+        with closing(self._connect(symbol, interval)) as conn, conn:
+            conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        """Epoch seconds of the newest stored bar, or None."""
+        if not self.path(symbol, interval).exists():
+            return None
+        with closing(self._connect(symbol, interval)) as conn:
+            return conn.execute('SELECT MAX(ts) FROM bars').fetchone()[0]
+
+    def read(self, symbol: str, interval: str, limit: Optional[int] = None) -> List[Dict]:
+        """Return the newest ``limit`` bars (all when None), oldest first."""
+        if not self.path(symbol, interval).exists():
+            return []
+        query = 'SELECT time, open, high, low, close, volume FROM bars ORDER BY ts DESC'
+        params = ()
+        if limit is not None:
+            query += ' LIMIT ?'
+            params = (limit,)
+        with closing(self._connect(symbol, interval)) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {'time': t, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': int(v or 0)}
+            for t, o, h, l, c, v in reversed(rows)
+        ]
+
+    def read_frame(self, symbol: str, interval: str) -> pd.DataFrame:
+        """Return every stored bar as a DataFrame with a UTC ``date`` column."""
+        columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+        if not self.path(symbol, interval).exists():
+            return pd.DataFrame(columns=columns)
+        with closing(self._connect(symbol, interval)) as conn:
+            df = pd.read_sql_query(
+                'SELECT ts, open, high, low, close, volume FROM bars ORDER BY ts', conn
+            )
+        df['date'] = pd.to_datetime(df.pop('ts'), unit='s', utc=True)
+        return df[columns]
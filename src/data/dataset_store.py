@@ -0,0 +1,154 @@
+"""Typed Parquet dataset store for Magic8 trade data.
+
+Training entry points used to reread large CSVs with ``low_memory=False``
+and coerce numeric columns one by one. This module writes the trades once
+as a Hive-partitioned Parquet dataset (``symbol=.../strategy=...``) with
+numeric columns already typed, and reads it back with column projection
+and partition/predicate pushdown so each consumer only loads what it uses.
+
+``read_trades`` accepts a dataset directory, a single ``.parquet`` file or
+a legacy CSV, so callers can switch over without changing their inputs.
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Columns that are numeric in the processed trade data but can arrive as
+# mixed/object dtype when read from CSV
+NUMERIC_COLUMNS = [
+    'price', 'premium', 'predicted', 'closed', 'expired',
+    'risk', 'reward', 'ratio', 'profit',
+    'expected_move', 'low', 'high', 'target1', 'target2',
+    'predicted_trades', 'closing',
+    'strike1', 'strike2', 'strike3', 'strike4',
+    'bid1', 'ask1', 'bid2', 'ask2', 'bid3', 'ask3', 'bid4', 'ask4',
+    'mid1', 'mid2', 'mid3', 'mid4',
+    'call_delta', 'put_delta', 'predicted_delta',
+    'short_term', 'long_term', 'closing_delta',
+]
+
+PARTITION_COLUMNS = ['symbol', 'strategy']
+
+PathLike = Union[str, Path]
+
+
+def _partitioning(partition_cols: List[str]) -> ds.Partitioning:
+    return ds.partitioning(
+        pa.schema([(col, pa.string()) for col in partition_cols]), flavor='hive'
+    )
+
+
+def coerce_trades(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce the known numeric trade columns to numbers in place."""
+    cols = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    if cols:
+        df[cols] = df[cols].apply(pd.to_numeric, errors='coerce')
+    return df
+
+
+def is_dataset(path: PathLike) -> bool:
+    """Return True if ``path`` is a partitioned dataset written by this module."""
+    path = Path(path)
+    return path.is_dir() and any(path.glob(f'{PARTITION_COLUMNS[0]}=*'))
+
+
+def write_dataset(
+    df: pd.DataFrame,
+    root: PathLike,
+    partition_cols: Optional[List[str]] = None,
+) -> Path:
+    """Write trades as a typed Parquet dataset partitioned by symbol/strategy.
+
+    Partitions present in ``df`` are replaced; other partitions under
+    ``root`` are left untouched.
+    """
+    partition_cols = partition_cols or PARTITION_COLUMNS
+    root = Path(root)
+    df = coerce_trades(df.copy())
+    for col in partition_cols:
+        df[col] = df[col].astype(str)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        str(root),
+        format='parquet',
+        partitioning=_partitioning(partition_cols),
+        existing_data_behavior='delete_matching',
+        basename_template='part-{i}.parquet',
+    )
+    return root
+
+
+def dataset_symbols(root: PathLike) -> List[str]:
+    """List the symbols present in a dataset without reading any data."""
+    prefix = f'{PARTITION_COLUMNS[0]}='
+    return sorted(
+        unquote(p.name[len(prefix):])
+        for p in Path(root).glob(f'{prefix}*')
+        if p.is_dir()
+    )
+
+
+def read_trades(
+    path: PathLike,
+    columns: Optional[List[str]] = None,
+    symbols: Optional[Iterable[str]] = None,
+    strategies: Optional[Iterable[str]] = None,
+    filter: Optional[pc.Expression] = None,
+) -> pd.DataFrame:
+    """Load trades from a dataset, Parquet file or CSV.
+
+    Args:
+        path: Dataset directory, ``.parquet`` file or CSV file
+        columns: Columns to load (all when None)
+        symbols: Only load these symbols
+        strategies: Only load these strategies
+        filter: Extra pyarrow expression pushed down to the scan
+
+    Returns:
+        DataFrame with the known numeric columns coerced
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        if filter is not None:
+            raise ValueError("Expression filters require a Parquet input")
+        df = coerce_trades(pd.read_csv(path, low_memory=False))
+        if symbols is not None:
+            df = df[df['symbol'].isin(list(symbols))]
+        if strategies is not None:
+            df = df[df['strategy'].isin(list(strategies))]
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df.reset_index(drop=True)
+
+    if is_dataset(path):
+        dataset = ds.dataset(str(path), format='parquet', partitioning=_partitioning(PARTITION_COLUMNS))
+    else:
+        dataset = ds.dataset(str(path), format='parquet')
+
+    expr = filter
+    for col, values in (('symbol', symbols), ('strategy', strategies)):
+        if values is None:
+            continue
+        cond = pc.field(col).isin(list(values))
+        expr = cond if expr is None else expr & cond
+
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+
+def read_split(data_dir: PathLike, name: str) -> pd.DataFrame:
+    """Load a Phase 1 split (``train``/``val``/``test``), preferring Parquet."""
+    data_dir = Path(data_dir)
+    parquet_file = data_dir / f'{name}_data.parquet'
+    if parquet_file.exists():
+        return pd.read_parquet(parquet_file)
+    return pd.read_csv(data_dir / f'{name}_data.csv')
@@ -3,39 +3,74 @@ Data Manager for magic8-accuracy-predictor
 Handles data source selection with caching and fallback to IBKR.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Any
 
 import aiohttp
 import numpy as np
 
 from data_providers.standalone_provider import StandaloneDataProvider
+from src.companion_http import BULK_UNSUPPORTED, make_session
 from src.constants import DEFAULT_IB_PORT
+from src.data.bar_store import BarStore, interval_seconds
+from src.historical_scheduler import PRIORITY_LIVE, PRIORITY_WARMUP
 
 logger = logging.getLogger(__name__)
 
 
 class DataManager:
-    """Manage market data from companion API with IBKR fallback."""
+    """Manage market data from companion API with IBKR fallback.
+
+    Cached entries have a soft and a hard TTL on the monotonic clock.
+    Before the soft TTL an entry is served as is; between the soft and
+    hard TTL it is served immediately while a single background refresh
+    runs (stale-while-revalidate); after the hard TTL callers wait for
+    the upstream fetch. When upstream fails, a still-usable stale entry
+    is preferred over mock data.
+
+    The ``*_many`` methods load every symbol that needs fetching with one
+    batch: one bulk companion request when the companion supports it,
+    otherwise at most ``companion.max_concurrency`` concurrent per-symbol
+    requests over a shared keep-alive pool.
+    """
 
     def __init__(self, config: dict):
         self.config = config
         self.cache: Dict[str, Dict[str, Any]] = {}
         perf_cfg = config.get("performance", {}).get("cache", {})
-        market_ttl = perf_cfg.get("market_data_ttl")
-        self.price_cache_ttl = timedelta(seconds=market_ttl or 30)
-        self.bars_cache_ttl = timedelta(minutes=5)
-        self.companion_url = config.get("companion", {}).get("base_url", "http://localhost:8765")
+        self.price_cache_ttl = float(perf_cfg.get("market_data_ttl") or 30)
+        self.price_cache_hard_ttl = float(perf_cfg.get("market_data_hard_ttl") or 4 * self.price_cache_ttl)
+        self.bars_cache_ttl = float(perf_cfg.get("bars_ttl") or 300)
+        self.bars_cache_hard_ttl = float(perf_cfg.get("bars_hard_ttl") or 3 * self.bars_cache_ttl)
+        companion_cfg = config.get("companion", {})
+        self.companion_url = companion_cfg.get("base_url", "http://localhost:8765")
+        self.companion_pool_size = companion_cfg.get("pool_size", 20)
+        self.companion_keepalive = companion_cfg.get("keepalive_timeout", 30)
+        self._companion_limit = asyncio.Semaphore(companion_cfg.get("max_concurrency", 8))
+        # None until the first bulk request tells us whether it exists
+        self._companion_bulk: Optional[bool] = None
         self.use_standalone = config.get("standalone", {}).get("enabled", True)
         self._ib_provider: Optional[StandaloneDataProvider] = None
         self._companion_session: Optional[aiohttp.ClientSession] = None
+        self._ib_connect_lock = asyncio.Lock()
         self._subscription_failures: Dict[str, bool] = {}  # Track subscription failures
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced_requests: Dict[str, int] = {}
+        self.symbol_stats: Dict[str, Dict[str, float]] = {}
+        store_cfg = config.get("bar_store", {})
+        self.bar_store: Optional[BarStore] = (
+            BarStore(store_cfg.get("path", "data/bars")) if store_cfg.get("enabled", False) else None
+        )
 
     async def __aenter__(self):
         """Initialize connections on context manager entry."""
         # Create companion session
-        self._companion_session = aiohttp.ClientSession()
+        self._companion_session = make_session(
+            pool_size=self.companion_pool_size, keepalive_timeout=self.companion_keepalive
+        )
         
         # Initialize IB provider if enabled
         if self.use_standalone:
@@ -44,6 +79,7 @@ class DataManager:
                 ib_host=conf.get("ib_host", "127.0.0.1"),
                 ib_port=conf.get("ib_port", DEFAULT_IB_PORT),
                 client_id=conf.get("client_id", 99),
+                pacing=conf.get("pacing"),
             )
             await self._ib_provider.connect()
         
@@ -82,35 +118,249 @@ class DataManager:
         return False
 
 
-    def _is_cache_valid(self, key: str, ttl: timedelta) -> bool:
-        if key not in self.cache:
-            return False
-        ts = self.cache[key].get("timestamp")
-        if not ts:
-            return False
-        return datetime.now() - ts < ttl
+    def _start_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Return the in-flight task for ``key``, starting ``fetch`` if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return task
+
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once for concurrent callers asking for ``key``.
+
+        The first caller starts the fetch; callers arriving while it is in
+        flight await the same task instead of issuing their own upstream
+        request. The task is shielded so one caller being cancelled does
+        not cancel it for the others.
+        """
+        if key in self._inflight:
+            self.coalesced_requests[key] = self.coalesced_requests.get(key, 0) + 1
+        return await asyncio.shield(self._start_flight(key, fetch))
+
+    def _count(self, symbol: str, name: str, value: float = 1) -> None:
+        stats = self.symbol_stats.setdefault(symbol, {})
+        stats[name] = stats.get(name, 0) + value
+
+    async def _cached(
+        self,
+        key: str,
+        symbol: str,
+        soft_ttl: float,
+        hard_ttl: float,
+        load: Callable[[int], Awaitable[Any]],
+        fallback: Callable[[], Any],
+        priority: int = PRIORITY_LIVE,
+    ) -> Any:
+        """Serve ``key`` from cache with stale-while-revalidate.
+
+        ``load(priority)`` fetches from upstream and returns None on
+        failure; ``fallback()`` supplies mock data when there is nothing
+        usable cached.
+        """
+        entry = self.cache.get(key)
+        age = time.monotonic() - entry["stored_at"] if entry else None
+        if entry is not None and age < soft_ttl:
+            self._count(symbol, "hits")
+            return entry["data"]
+        if entry is not None and age < hard_ttl:
+            self._count(symbol, "stale_serves")
+            # Nobody waits on the refresh, so it queues behind live requests
+            self._start_flight(key, lambda: self._refresh(key, symbol, load, PRIORITY_WARMUP))
+            return entry["data"]
+
+        self._count(symbol, "misses")
+        data = await self._single_flight(key, lambda: self._refresh(key, symbol, load, priority))
+        if data is not None:
+            return data
+        self._count(symbol, "fallbacks")
+        return fallback()
+
+    async def _cached_many(
+        self,
+        keys: Dict[str, str],
+        soft_ttl: float,
+        hard_ttl: float,
+        load_many: Callable[[List[str], int], Awaitable[Dict[str, Any]]],
+        fallback: Callable[[str], Any],
+        priority: int = PRIORITY_LIVE,
+    ) -> Dict[str, Any]:
+        """Multi-symbol :meth:`_cached` for ``keys`` (symbol -> cache key).
+
+        Symbols that need fetching are loaded together by one
+        ``load_many(symbols, priority)`` call, which returns data (or None)
+        per symbol. Each symbol still gets its own in-flight entry, so
+        single-symbol callers share the batch and vice versa.
+        """
+        now = time.monotonic()
+        result: Dict[str, Any] = {}
+        stale: Dict[str, str] = {}
+        missing: Dict[str, str] = {}
+        for symbol, key in keys.items():
+            entry = self.cache.get(key)
+            age = now - entry["stored_at"] if entry else None
+            if entry is not None and age < soft_ttl:
+                self._count(symbol, "hits")
+                result[symbol] = entry["data"]
+            elif entry is not None and age < hard_ttl:
+                self._count(symbol, "stale_serves")
+                result[symbol] = entry["data"]
+                stale[symbol] = key
+            else:
+                self._count(symbol, "misses")
+                missing[symbol] = key
+
+        if stale:
+            self._start_flights(stale, load_many, PRIORITY_WARMUP)
+        if missing:
+            for key in missing.values():
+                if key in self._inflight:
+                    self.coalesced_requests[key] = self.coalesced_requests.get(key, 0) + 1
+            tasks = self._start_flights(missing, load_many, priority)
+            loaded = await asyncio.gather(*(asyncio.shield(t) for t in tasks.values()))
+            for symbol, data in zip(tasks, loaded):
+                if data is None:
+                    self._count(symbol, "fallbacks")
+                    data = fallback(symbol)
+                result[symbol] = data
+        return {symbol: result[symbol] for symbol in keys}
+
+    def _start_flights(
+        self,
+        keys: Dict[str, str],
+        load_many: Callable[[List[str], int], Awaitable[Dict[str, Any]]],
+        priority: int,
+    ) -> Dict[str, asyncio.Task]:
+        """Join in-flight fetches and start one batch for the remaining keys."""
+        tasks = {}
+        new = {}
+        for symbol, key in keys.items():
+            task = self._inflight.get(key)
+            if task is not None:
+                tasks[symbol] = task
+            else:
+                new[symbol] = key
+        if new:
+            batch = asyncio.ensure_future(self._refresh_many(new, load_many, priority))
+            for symbol, key in new.items():
+                tasks[symbol] = self._start_flight(key, lambda s=symbol: self._pick(batch, s))
+        return tasks
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, symbol: str) -> Any:
+        return (await asyncio.shield(batch))[symbol]
+
+    async def _refresh_many(
+        self,
+        keys: Dict[str, str],
+        load_many: Callable[[List[str], int], Awaitable[Dict[str, Any]]],
+        priority: int,
+    ) -> Dict[str, Any]:
+        start = time.monotonic()
+        try:
+            loaded = await load_many(list(keys), priority)
+        except Exception as e:
+            logger.debug("Batch refresh of %s failed: %s", list(keys), e)
+            loaded = {}
+        return {
+            symbol: self._finish_refresh(key, symbol, loaded.get(symbol), start)
+            for symbol, key in keys.items()
+        }
+
+    async def _refresh(
+        self, key: str, symbol: str, load: Callable[[int], Awaitable[Any]], priority: int
+    ) -> Any:
+        start = time.monotonic()
+        try:
+            data = await load(priority)
+        except Exception as e:
+            logger.debug("Refresh of %s failed: %s", key, e)
+            data = None
+        return self._finish_refresh(key, symbol, data, start)
+
+    def _finish_refresh(self, key: str, symbol: str, data: Any, start: float) -> Any:
+        """Record refresh stats; keep serving the previous value if ``data`` is None."""
+        elapsed_ms = 1000 * (time.monotonic() - start)
+        self._count(symbol, "refreshes")
+        self._count(symbol, "refresh_ms_total", elapsed_ms)
+        stats = self.symbol_stats[symbol]
+        stats["refresh_ms_max"] = max(stats.get("refresh_ms_max", 0.0), elapsed_ms)
+
+        if data is None:
+            self._count(symbol, "refresh_failures")
+            # Keep serving the previous value while it is within its hard TTL
+            entry = self.cache.get(key)
+            if entry is not None and time.monotonic() - entry["stored_at"] < entry["hard_ttl"]:
+                return entry["data"]
+            return None
+        return data
 
-    async def get_market_data(self, symbol: str) -> Dict[str, Any]:
+    async def get_market_data(self, symbol: str, priority: int = PRIORITY_LIVE) -> Dict[str, Any]:
+        return await self._cached(
+            f"market_{symbol}",
+            symbol,
+            self.price_cache_ttl,
+            self.price_cache_hard_ttl,
+            lambda p: self._load_market_data(symbol, p),
+            lambda: self._get_mock_data(symbol),
+            priority,
+        )
+
+    async def get_market_data_many(
+        self, symbols: List[str], priority: int = PRIORITY_LIVE
+    ) -> Dict[str, Dict[str, Any]]:
+        """Market data for several symbols, fetching the uncached ones as one batch."""
+        return await self._cached_many(
+            {symbol: f"market_{symbol}" for symbol in dict.fromkeys(symbols)},
+            self.price_cache_ttl,
+            self.price_cache_hard_ttl,
+            self._load_market_data_many,
+            self._get_mock_data,
+            priority,
+        )
+
+    async def _load_market_data(self, symbol: str, priority: int = PRIORITY_LIVE) -> Optional[Dict[str, Any]]:
+        return (await self._load_market_data_many([symbol], priority)).get(symbol)
+
+    async def _load_market_data_many(
+        self, symbols: List[str], priority: int = PRIORITY_LIVE
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        # try companion
+        bulk = await self._companion_bulk_get("/market", "markets", symbols)
+        if bulk is not None:
+            loaded = {s: self._companion_market(bulk[s]) for s in symbols if s in bulk}
+        else:
+            results = await asyncio.gather(
+                *(self._bounded(self._fetch_from_companion(s)) for s in symbols),
+                return_exceptions=True,
+            )
+            loaded = {}
+            for symbol, data in zip(symbols, results):
+                if isinstance(data, Exception):
+                    logger.debug("Companion fetch failed for %s: %s", symbol, data)
+                else:
+                    loaded[symbol] = data
+        for symbol, data in loaded.items():
+            self._update_cache(f"market_{symbol}", data, self.price_cache_hard_ttl)
+
+        # IBKR requests are paced by the provider's scheduler
+        missing = [s for s in symbols if s not in loaded]
+        if missing:
+            results = await asyncio.gather(*(self._load_market_data_ibkr(s, priority) for s in missing))
+            loaded.update(zip(missing, results))
+        return {symbol: loaded.get(symbol) for symbol in symbols}
+
+    async def _load_market_data_ibkr(self, symbol: str, priority: int) -> Optional[Dict[str, Any]]:
         key = f"market_{symbol}"
-        if self._is_cache_valid(key, self.price_cache_ttl):
-            logger.debug("Using cached data for %s", symbol)
-            return self.cache[key]["data"]
 
         # Skip IBKR if we know this symbol has subscription issues
         skip_ibkr = self._subscription_failures.get(symbol, False)
 
-        # try companion
-        try:
-            data = await self._fetch_from_companion(symbol)
-            self._update_cache(key, data)
-            return data
-        except Exception as e:
-            logger.debug("Companion fetch failed for %s: %s", symbol, e)
-
         if self.use_standalone and not skip_ibkr:
             try:
-                data = await self._fetch_from_ibkr(symbol)
-                self._update_cache(key, data)
+                data = await self._fetch_from_ibkr(symbol, priority)
+                self._update_cache(key, data, self.price_cache_hard_ttl)
                 # Clear subscription failure flag on success
                 self._subscription_failures[symbol] = False
                 return data
@@ -123,52 +373,154 @@ class DataManager:
                 else:
                     logger.warning("IBKR fetch failed for %s: %s", symbol, e)
 
-        return self._get_mock_data(symbol)
+        return None
 
     async def get_current_price(self, symbol: str) -> Dict[str, Any]:
         """Convenience wrapper returning only current price information."""
         return await self.get_market_data(symbol)
 
-    async def get_price_data(self, symbol: str, bars: int = 100, interval: str = "5 mins") -> Optional[list]:
-        """Get historical price bars with caching."""
-        key = f"bars_{symbol}_{bars}_{interval}"
-        if self._is_cache_valid(key, self.bars_cache_ttl):
-            return self.cache[key]["data"]
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await self.get_market_data_many(symbols)
+
+    async def get_price_data(
+        self, symbol: str, bars: int = 100, interval: str = "5 mins", priority: int = PRIORITY_LIVE
+    ) -> Optional[list]:
+        """Get historical price bars with caching.
+
+        ``priority`` orders the IBKR request against other historical
+        requests (live predictions ahead of warmup/backfill).
+        """
+        return await self._cached(
+            f"bars_{symbol}_{bars}_{interval}",
+            symbol,
+            self.bars_cache_ttl,
+            self.bars_cache_hard_ttl,
+            lambda p: self._load_price_data(symbol, bars, interval, p),
+            list,
+            priority,
+        )
+
+    async def get_price_data_many(
+        self,
+        symbols: List[str],
+        bars: int = 100,
+        interval: str = "5 mins",
+        priority: int = PRIORITY_LIVE,
+    ) -> Dict[str, list]:
+        """Price bars for several symbols, fetching the uncached ones as one batch."""
+        return await self._cached_many(
+            {symbol: f"bars_{symbol}_{bars}_{interval}" for symbol in dict.fromkeys(symbols)},
+            self.bars_cache_ttl,
+            self.bars_cache_hard_ttl,
+            lambda syms, p: self._load_price_data_many(syms, bars, interval, p),
+            lambda symbol: [],
+            priority,
+        )
+
+    async def _load_price_data(
+        self, symbol: str, bars: int, interval: str, priority: int = PRIORITY_LIVE
+    ) -> Optional[list]:
+        return (await self._load_price_data_many([symbol], bars, interval, priority))[symbol]
+
+    async def _load_price_data_many(
+        self, symbols: List[str], bars: int, interval: str, priority: int = PRIORITY_LIVE
+    ) -> Dict[str, Optional[list]]:
+        stored_and_gaps = await asyncio.gather(*(self._stored_bars(s, bars, interval) for s in symbols))
+        stored = {s: entry[0] for s, entry in zip(symbols, stored_and_gaps)}
+        loaded: Dict[str, list] = {}
+
+        if self.use_standalone and self._ib_provider:
+            results = await asyncio.gather(*(
+                self._ibkr_bars(s, bars, interval, priority, duration)
+                for s, (_, duration) in zip(symbols, stored_and_gaps)
+            ))
+            loaded.update((s, data) for s, data in zip(symbols, results) if data)
 
+        # Fallback to companion if available
+        missing = [s for s in symbols if s not in loaded]
+        if missing and self._companion_session:
+            bulk = await self._companion_bulk_get(
+                "/market/bars", "bars", missing, count=bars, interval=interval
+            )
+            if bulk is not None:
+                loaded.update((s, bulk[s]) for s in missing if s in bulk)
+            else:
+                results = await asyncio.gather(
+                    *(self._bounded(self._companion_bars(s, bars, interval)) for s in missing)
+                )
+                loaded.update((s, data) for s, data in zip(missing, results) if data is not None)
+
+        result: Dict[str, Optional[list]] = {}
+        for symbol in symbols:
+            if symbol in loaded:
+                data = await self._store_bars(symbol, bars, interval, loaded[symbol])
+                self._update_cache(f"bars_{symbol}_{bars}_{interval}", data, self.bars_cache_hard_ttl)
+                result[symbol] = data
+            else:
+                # Upstream unavailable: what is on disk beats nothing
+                result[symbol] = stored[symbol] or None
+        return result
+
+    async def _stored_bars(self, symbol: str, bars: int, interval: str):
+        """Stored bars and the IB duration covering the gap since the newest one."""
+        # Bars already on disk only need the gap since the newest one
+        stored: list = []
+        duration = None
+        if self.bar_store is not None:
+            stored = await asyncio.to_thread(self.bar_store.read, symbol, interval, bars)
+            last_ts = await asyncio.to_thread(self.bar_store.last_timestamp, symbol, interval)
+            if len(stored) >= bars and last_ts is not None:
+                gap = int(time.time() - last_ts) + interval_seconds(interval)
+                if gap <= 86400:
+                    duration = f"{max(gap, 60)} S"
+        return stored, duration
+
+    async def _ibkr_bars(
+        self, symbol: str, bars: int, interval: str, priority: int, duration: Optional[str]
+    ) -> Optional[list]:
         try:
-            if self.use_standalone and self._ib_provider:
-                data = await self._ib_provider.get_price_data(symbol, bars=bars, interval=interval)
-                if data:
-                    self.cache[key] = {"data": data, "timestamp": datetime.now()}
-                    return data
+            return await self._ib_provider.get_price_data(
+                symbol, bars=bars, interval=interval, priority=priority, duration=duration
+            )
         except Exception as e:
             logger.debug(f"IBKR price data failed for {symbol}: {e}")
+            return None
 
-        # Fallback to companion if available
-        if self._companion_session:
-            try:
-                url = f"{self.companion_url}/market/{symbol}/bars?count={bars}&interval={interval}"
-                async with self._companion_session.get(url, timeout=5) as resp:
-                    if resp.status == 200:
-                        payload = await resp.json()
-                        data = payload.get("bars", [])
-                        self.cache[key] = {"data": data, "timestamp": datetime.now()}
-                        return data
-            except Exception as e:
-                logger.debug(f"Companion bars failed for {symbol}: {e}")
+    async def _companion_bars(self, symbol: str, bars: int, interval: str) -> Optional[list]:
+        try:
+            url = f"{self.companion_url}/market/{symbol}/bars?count={bars}&interval={interval}"
+            async with self._companion_session.get(url, timeout=5) as resp:
+                if resp.status == 200:
+                    payload = await resp.json()
+                    return payload.get("bars", [])
+        except Exception as e:
+            logger.debug(f"Companion bars failed for {symbol}: {e}")
+        return None
 
-        return []
+    async def _store_bars(self, symbol: str, bars: int, interval: str, data: list) -> list:
+        """Append fetched bars to the bar store and return the newest ``bars``."""
+        if self.bar_store is None or not data:
+            return data
+        await asyncio.to_thread(self.bar_store.append, symbol, interval, data)
+        return await asyncio.to_thread(self.bar_store.read, symbol, interval, bars)
 
     async def get_vix_data(self) -> Dict[str, Any]:
         """Get current VIX data with proper fields."""
+        return await self._cached(
+            "vix_data",
+            "VIX",
+            self.price_cache_ttl,
+            self.price_cache_hard_ttl,
+            lambda p: self._load_vix_data(),
+            self._get_mock_vix_data,
+        )
+
+    async def _load_vix_data(self) -> Optional[Dict[str, Any]]:
         key = "vix_data"
-        if self._is_cache_valid(key, self.price_cache_ttl):
-            return self.cache[key]["data"]
-
         if self.use_standalone and self._ib_provider:
             try:
                 data = await self._ib_provider.get_vix_data()
-                self._update_cache(key, data)
+                self._update_cache(key, data, self.price_cache_hard_ttl)
                 return data
             except Exception as e:
                 logger.warning(f"IBKR VIX data fetch failed: {e}")
@@ -187,13 +539,16 @@ class DataManager:
                             "low": float(payload.get("low", 0)),
                             "time": payload.get("time", datetime.now().isoformat()),
                         }
-                        self._update_cache(key, data)
+                        self._update_cache(key, data, self.price_cache_hard_ttl)
                         return data
             except Exception as e:
                 logger.debug(f"Companion VIX fetch failed: {e}")
 
+        return None
+
+    def _get_mock_vix_data(self) -> Dict[str, Any]:
         mock = self._get_mock_data("VIX")
-        data = {
+        return {
             "last": mock["price"],
             "change": 0,
             "change_pct": 0,
@@ -201,8 +556,6 @@ class DataManager:
             "low": mock["price"],
             "time": datetime.now().isoformat(),
         }
-        self._update_cache(key, data)
-        return data
 
     def _is_subscription_error(self, error_msg: str) -> bool:
         """Check if the error is due to missing market data subscription."""
@@ -222,14 +575,60 @@ class DataManager:
         async with self._companion_session.get(url, timeout=5) as resp:
             if resp.status != 200:
                 raise Exception(f"API returned {resp.status}")
-            data = await resp.json()
-            return {
-                "price": data.get("price", 0.0),
-                "volatility": data.get("volatility", 0.20),
-                "source": "companion",
-            }
+            return self._companion_market(await resp.json())
 
-    async def _fetch_from_ibkr(self, symbol: str) -> Dict[str, Any]:
+    @staticmethod
+    def _companion_market(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "price": data.get("price", 0.0),
+            "volatility": data.get("volatility", 0.20),
+            "source": "companion",
+        }
+
+    async def _companion_bulk_get(
+        self, path: str, key: str, symbols: List[str], **params
+    ) -> Optional[Dict[str, Any]]:
+        """GET a companion bulk endpoint and return its per-symbol mapping.
+
+        Returns None when there is no session, a single symbol, the request
+        failed or returned an unexpected payload, or the companion has no
+        bulk endpoints (remembered, so later batches go straight to
+        per-symbol requests).
+        """
+        if not self._companion_session or self._companion_bulk is False or len(symbols) < 2:
+            return None
+        try:
+            async with self._companion_session.get(
+                f"{self.companion_url}{path}",
+                params={"symbols": ",".join(symbols), **params},
+                timeout=5,
+            ) as resp:
+                if resp.status in BULK_UNSUPPORTED:
+                    logger.info("Companion has no bulk endpoints; using per-symbol requests")
+                    self._companion_bulk = False
+                    return None
+                if resp.status != 200:
+                    logger.debug("Companion bulk %s returned %s", path, resp.status)
+                    return None
+                payload = await resp.json()
+        except Exception as e:
+            logger.debug("Companion bulk %s failed: %s", path, e)
+            return None
+
+        data = payload.get(key) if isinstance(payload, dict) else None
+        if not isinstance(data, dict):
+            # Only the statuses above prove the endpoint is missing
+            logger.warning("Companion bulk %s returned no %r mapping", path, key)
+            return None
+        self._companion_bulk = True
+        return data
+
+    async def _bounded(self, coro: Awaitable[Any]) -> Any:
+        """Run ``coro`` within the companion concurrency limit."""
+        async with self._companion_limit:
+            return await coro
+
+    async def _fetch_from_ibkr(self, symbol: str, priority: int = PRIORITY_LIVE) -> Dict[str, Any]:
         """Fetch data from IBKR, ensuring connection persists."""
         # Ensure provider is initialized and connected
         if not self._ib_provider:
@@ -238,9 +637,13 @@ class DataManager:
                 ib_host=conf.get("ib_host", "127.0.0.1"),
                 ib_port=conf.get("ib_port", DEFAULT_IB_PORT),
                 client_id=conf.get("client_id", 99),
+                pacing=conf.get("pacing"),
             )
         if not await self._ib_provider.is_connected():
-            await self._ib_provider.connect()
+            # Batched loads reach here concurrently; connect only once
+            async with self._ib_connect_lock:
+                if not await self._ib_provider.is_connected():
+                    await self._ib_provider.connect()
 
         try:
             price_data = await self._ib_provider.get_current_price(symbol)
@@ -249,7 +652,9 @@ class DataManager:
             # Only try to get volatility if we got a valid price
             if price_data.get("last", 0) > 0:
                 try:
-                    bars = await self._ib_provider.get_price_data(symbol, bars=20, interval="5 mins")
+                    bars = await self._ib_provider.get_price_data(
+                        symbol, bars=20, interval="5 mins", priority=priority
+                    )
                     if bars:
                         closes = [bar["close"] for bar in bars]
                         if len(closes) > 1:
@@ -287,13 +692,29 @@ class DataManager:
             "source": "mock",
         }
 
-    def _update_cache(self, key: str, data: Dict[str, Any]):
-        self.cache[key] = {"data": data, "timestamp": datetime.now()}
+    def _update_cache(self, key: str, data: Any, hard_ttl: float):
+        self.cache[key] = {
+            "data": data,
+            "stored_at": time.monotonic(),
+            "hard_ttl": hard_ttl,
+            "timestamp": datetime.now(),
+        }
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-symbol cache, stale-serve, refresh-latency and fallback counters."""
+        result = {}
+        for symbol, counters in self.symbol_stats.items():
+            stats = dict(counters)
+            refreshes = stats.get("refreshes", 0)
+            total_ms = stats.pop("refresh_ms_total", 0.0)
+            stats["avg_refresh_ms"] = round(total_ms / refreshes, 3) if refreshes else 0.0
+            stats["refresh_ms_max"] = round(stats.get("refresh_ms_max", 0.0), 3)
+            result[symbol] = stats
+        return result
 
     async def warm_cache(self, symbols: list[str]):
         """Pre-fetch market data for common symbols."""
-        for sym in symbols:
-            try:
-                await self.get_market_data(sym)
-            except Exception as exc:
-                logger.debug("Warm cache failed for %s: %s", sym, exc)
+        try:
+            await self.get_market_data_many(symbols, priority=PRIORITY_WARMUP)
+        except Exception as exc:
+            logger.debug("Warm cache failed for %s: %s", symbols, exc)
@@ -48,7 +48,15 @@ def get_data_provider(config: dict) -> BaseDataProvider:
         
         # Wrap in fallback handler
         from .fallback_provider import FallbackDataProvider
-        return FallbackDataProvider(primary_provider, fallback_provider)
+        failover = config.get('failover', {})
+        return FallbackDataProvider(
+            primary_provider,
+            fallback_provider,
+            hedge=failover.get('hedge', True),
+            hedge_delay=failover.get('hedge_delay', 0.5),
+            failure_threshold=failover.get('failure_threshold', 3),
+            cooldown=failover.get('cooldown', 30.0),
+        )
     
     return primary_provider
 
@@ -64,21 +72,28 @@ def _create_provider(provider_type: str, config: dict) -> BaseDataProvider:
         return CompanionDataProvider(
             base_url=provider_config.get('base_url', 'http://localhost:8765'),
             timeout=provider_config.get('timeout', 5),
-            retry_attempts=provider_config.get('retry_attempts', 3)
+            retry_attempts=provider_config.get('retry_attempts', 3),
+            pool_size=provider_config.get('pool_size', 20),
+            keepalive_timeout=provider_config.get('keepalive_timeout', 30),
+            max_concurrency=provider_config.get('max_concurrency', 8),
         )
     
     elif provider_type == 'redis':
         return RedisDataProvider(
             host=provider_config.get('host', 'localhost'),
             port=provider_config.get('port', 6379),
-            channels=provider_config.get('channels', {})
+            channels=provider_config.get('channels', {}),
+            db=provider_config.get('db', 0),
+            max_connections=provider_config.get('max_connections', 10),
+            max_age=provider_config.get('max_age', 30),
         )
     
     elif provider_type == 'standalone':
         return StandaloneDataProvider(
             ib_host=provider_config.get('ib_host', '127.0.0.1'),
             ib_port=provider_config.get('ib_port', DEFAULT_IB_PORT),
-            client_id=provider_config.get('client_id', 99)
+            client_id=provider_config.get('client_id', 99),
+            pacing=provider_config.get('pacing'),
         )
     
     elif provider_type == 'mock':
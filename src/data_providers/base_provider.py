@@ -2,10 +2,14 @@
 Base interface for market data providers.
 """
 
+import asyncio
+import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
 
 class BaseDataProvider(ABC):
     """
@@ -204,6 +208,54 @@ class BaseDataProvider(ABC):
         
         return market_open <= current_minutes < market_close
     
+    async def get_price_data_many(
+        self,
+        symbols: List[str],
+        bars: int = 100,
+        interval: str = "5 mins"
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get historical price bars for several symbols.
+        
+        Providers with a bulk request should override this. Symbols whose
+        fetch failed are left out of the result.
+        
+        Returns:
+            Dictionary of symbol to price bars
+        """
+        # Default implementation - one concurrent request per symbol
+        results = await asyncio.gather(
+            *(self.get_price_data(symbol, bars, interval) for symbol in symbols),
+            return_exceptions=True
+        )
+        return self._collect(symbols, results, "price data")
+    
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get current price snapshots for several symbols.
+        
+        Providers with a bulk request should override this. Symbols whose
+        fetch failed are left out of the result.
+        
+        Returns:
+            Dictionary of symbol to price snapshot
+        """
+        results = await asyncio.gather(
+            *(self.get_current_price(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+        return self._collect(symbols, results, "current price")
+    
+    @staticmethod
+    def _collect(symbols: List[str], results: List, what: str) -> Dict:
+        collected = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to get {what} for {symbol}: {result}")
+            else:
+                collected[symbol] = result
+        return collected
+    
     async def subscribe_to_updates(
         self,
         symbol: str,
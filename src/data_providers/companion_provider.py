@@ -14,11 +14,35 @@ from typing import Dict, List, Optional
 import aiohttp
 from aiohttp import ClientTimeout
 
+from src.companion_http import BULK_UNSUPPORTED, make_session
 from .base_provider import BaseDataProvider
 
 logger = logging.getLogger(__name__)
 
 
+def _format_bar(bar: Dict) -> Dict:
+    return {
+        'time': bar.get('time'),
+        'open': float(bar.get('open', 0)),
+        'high': float(bar.get('high', 0)),
+        'low': float(bar.get('low', 0)),
+        'close': float(bar.get('close', 0)),
+        'volume': int(bar.get('volume', 0))
+    }
+
+
+def _format_quote(symbol: str, data: Dict) -> Dict:
+    return {
+        'symbol': symbol,
+        'last': float(data.get('last', 0)),
+        'bid': float(data.get('bid', 0)),
+        'ask': float(data.get('ask', 0)),
+        'bid_size': int(data.get('bid_size', 0)),
+        'ask_size': int(data.get('ask_size', 0)),
+        'time': data.get('time', datetime.now().isoformat())
+    }
+
+
 class CompanionDataProvider(BaseDataProvider):
     """
     Data provider that uses Magic8-Companion's IB connection via HTTP API.
@@ -27,13 +51,20 @@ class CompanionDataProvider(BaseDataProvider):
     - Avoids IBKR connection conflicts
     - Leverages existing connection management
     - Provides centralized rate limiting
+    
+    Multi-symbol reads use the companion's bulk endpoints when it has
+    them and otherwise fall back to at most ``max_concurrency`` concurrent
+    per-symbol requests over the shared keep-alive pool.
     """
     
     def __init__(
         self,
         base_url: str = "http://localhost:8765",
         timeout: int = 5,
-        retry_attempts: int = 3
+        retry_attempts: int = 3,
+        pool_size: int = 20,
+        keepalive_timeout: float = 30,
+        max_concurrency: int = 8
     ):
         """
         Initialize the companion data provider.
@@ -42,12 +73,22 @@ class CompanionDataProvider(BaseDataProvider):
             base_url: Base URL for Magic8-Companion API
             timeout: Request timeout in seconds
             retry_attempts: Number of retry attempts for failed requests
+            pool_size: Maximum open connections to the companion
+            keepalive_timeout: Seconds idle connections are kept open
+            max_concurrency: Concurrent per-symbol requests when a bulk
+                endpoint is unavailable
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = ClientTimeout(total=timeout)
         self.retry_attempts = retry_attempts
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.max_concurrency = max_concurrency
         self.session: Optional[aiohttp.ClientSession] = None
         self._connected = False
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # None until the first bulk request tells us whether it exists
+        self._bulk_supported: Optional[bool] = None
         
         logger.info(f"CompanionDataProvider initialized with base_url: {base_url}")
     
@@ -56,7 +97,9 @@ class CompanionDataProvider(BaseDataProvider):
         try:
             # Create session if not exists
             if not self.session:
-                self.session = aiohttp.ClientSession(timeout=self.timeout)
+                self.session = make_session(
+                    self.timeout.total, self.pool_size, self.keepalive_timeout
+                )
             
             # Test connection with health check
             async with self.session.get(f"{self.base_url}/health") as response:
@@ -131,6 +174,9 @@ class CompanionDataProvider(BaseDataProvider):
                     return await response.json()
                     
             except aiohttp.ClientError as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status < 500:
+                    # Client errors will not succeed on retry
+                    raise
                 logger.warning(
                     f"Request failed (attempt {attempt + 1}/{self.retry_attempts}): {e}"
                 )
@@ -156,18 +202,7 @@ class CompanionDataProvider(BaseDataProvider):
             )
             
             # Ensure consistent format
-            formatted_bars = []
-            for bar in data.get('bars', []):
-                formatted_bars.append({
-                    'time': bar.get('time'),
-                    'open': float(bar.get('open', 0)),
-                    'high': float(bar.get('high', 0)),
-                    'low': float(bar.get('low', 0)),
-                    'close': float(bar.get('close', 0)),
-                    'volume': int(bar.get('volume', 0))
-                })
-                
-            return formatted_bars
+            return [_format_bar(bar) for bar in data.get('bars', [])]
             
         except Exception as e:
             logger.error(f"Failed to get price data for {symbol}: {e}")
@@ -177,21 +212,83 @@ class CompanionDataProvider(BaseDataProvider):
         """Get current price snapshot from Magic8-Companion."""
         try:
             data = await self._make_request(f"/api/market_data/{symbol}/quote")
-            
-            return {
-                'symbol': symbol,
-                'last': float(data.get('last', 0)),
-                'bid': float(data.get('bid', 0)),
-                'ask': float(data.get('ask', 0)),
-                'bid_size': int(data.get('bid_size', 0)),
-                'ask_size': int(data.get('ask_size', 0)),
-                'time': data.get('time', datetime.now().isoformat())
-            }
+            return _format_quote(symbol, data)
             
         except Exception as e:
             logger.error(f"Failed to get current price for {symbol}: {e}")
             raise
     
+    async def _bulk_request(self, endpoint: str, key: str, symbols: List[str], **params) -> Optional[Dict]:
+        """
+        Request ``symbols`` from a bulk endpoint.
+        
+        Returns the per-symbol mapping under ``key``, or None when the
+        companion has no such endpoint (remembered) or the request failed
+        or returned an unexpected payload.
+        """
+        if self._bulk_supported is False or len(symbols) < 2:
+            return None
+        try:
+            data = await self._make_request(
+                endpoint, params={'symbols': ','.join(symbols), **params}
+            )
+        except aiohttp.ClientResponseError as e:
+            if e.status in BULK_UNSUPPORTED:
+                logger.info("Magic8-Companion has no bulk endpoints; using per-symbol requests")
+                self._bulk_supported = False
+            else:
+                logger.warning(f"Bulk request {endpoint} failed: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Bulk request {endpoint} failed: {e}")
+            return None
+        
+        if not isinstance(data, dict) or not isinstance(data.get(key), dict):
+            # Only the statuses above prove the endpoint is missing
+            logger.warning(f"Bulk request {endpoint} returned no '{key}' mapping")
+            return None
+        self._bulk_supported = True
+        return data[key]
+    
+    async def _bounded(self, coro):
+        async with self._semaphore:
+            return await coro
+    
+    async def get_price_data_many(
+        self,
+        symbols: List[str],
+        bars: int = 100,
+        interval: str = "5 mins"
+    ) -> Dict[str, List[Dict]]:
+        """Get price bars for several symbols in one request when supported."""
+        data = await self._bulk_request(
+            "/api/market_data/bars", 'bars', symbols, count=bars, interval=interval
+        )
+        if data is not None:
+            return {
+                symbol: [_format_bar(bar) for bar in data[symbol]]
+                for symbol in symbols if symbol in data
+            }
+        results = await asyncio.gather(
+            *(self._bounded(self.get_price_data(symbol, bars, interval)) for symbol in symbols),
+            return_exceptions=True
+        )
+        return self._collect(symbols, results, "price data")
+    
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get quotes for several symbols in one request when supported."""
+        data = await self._bulk_request("/api/market_data/quotes", 'quotes', symbols)
+        if data is not None:
+            return {
+                symbol: _format_quote(symbol, data[symbol])
+                for symbol in symbols if symbol in data
+            }
+        results = await asyncio.gather(
+            *(self._bounded(self.get_current_price(symbol)) for symbol in symbols),
+            return_exceptions=True
+        )
+        return self._collect(symbols, results, "current price")
+    
     async def get_vix_data(self) -> Dict:
         """Get current VIX data from Magic8-Companion."""
         try:
@@ -1,35 +1,132 @@
 """
 Fallback data provider for automatic failover.
 
-Simple wrapper that tries primary provider first, then falls back to
-secondary if primary fails.
+Wraps a primary and a fallback provider. Each provider's latency and
+failures are tracked; a request that runs longer than the preferred
+provider's observed p95 is hedged to the other provider (first success
+wins), and a provider that keeps failing is skipped for a cooldown by a
+circuit breaker.
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
 
 from .base_provider import BaseDataProvider
 
 logger = logging.getLogger(__name__)
 
 
+class ProviderHealth:
+    """Latency window, failure counters and circuit breaker for one provider.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    the provider is skipped for ``cooldown`` seconds; the next call after
+    that is a trial that closes the circuit on success or reopens it.
+    """
+
+    def __init__(self, name: str, window: int = 200, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.name = name
+        self.latencies: deque = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.circuit_opens = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.last_error: Optional[str] = None
+
+    def available(self, now: Optional[float] = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self.open_until
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        """95th percentile latency in seconds, or None with too few samples."""
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, error: Exception) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        if self.consecutive_failures >= self.failure_threshold:
+            if self.available():
+                self.circuit_opens += 1
+                logger.warning(f"Circuit opened for {self.name} for {self.cooldown:.0f}s after {self.consecutive_failures} failures")
+            self.open_until = time.monotonic() + self.cooldown
+
+    def report(self) -> Dict[str, Any]:
+        p95 = self.p95(min_samples=1)
+        avg = sum(self.latencies) / len(self.latencies) if self.latencies else None
+        return {
+            'circuit': 'closed' if self.available() else 'open',
+            'requests': self.requests,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'circuit_opens': self.circuit_opens,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'avg_latency_ms': round(1000 * avg, 3) if avg is not None else None,
+            'p95_latency_ms': round(1000 * p95, 3) if p95 is not None else None,
+            'last_error': self.last_error,
+        }
+
+
 class FallbackDataProvider(BaseDataProvider):
     """
     Provides automatic failover between two data providers.
-    
-    Ship-fast implementation - tries primary first, then fallback.
+
+    Requests go to the primary unless its circuit is open. When the
+    preferred provider fails the other one is tried; when it is merely
+    slow (past its p95, or ``hedge_delay`` until enough samples exist) a
+    hedged request is sent to the other provider and the first success
+    is returned.
     """
     
     def __init__(
         self,
         primary: BaseDataProvider,
-        fallback: BaseDataProvider
+        fallback: BaseDataProvider,
+        hedge: bool = True,
+        hedge_delay: float = 0.5,
+        min_samples: int = 20,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
     ):
-        """Initialize with primary and fallback providers."""
+        """Initialize with primary and fallback providers.
+
+        Args:
+            hedge: Send a hedged request to the other provider when the
+                first one is slow
+            hedge_delay: Hedge delay (seconds) used until ``min_samples``
+                latencies have been observed
+            failure_threshold: Consecutive failures that open a circuit
+            cooldown: Seconds an open circuit skips its provider
+        """
         self.primary = primary
         self.fallback = fallback
         self.current = primary
-        self._primary_failed = False
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self._health = {
+            id(provider): ProviderHealth(type(provider).__name__, failure_threshold=failure_threshold, cooldown=cooldown)
+            for provider in (primary, fallback)
+        }
+        self._ready: set = set()
         
         logger.info(
             f"FallbackDataProvider initialized: "
@@ -42,7 +139,7 @@ class FallbackDataProvider(BaseDataProvider):
         # Try primary first
         if await self.primary.connect():
             self.current = self.primary
-            self._primary_failed = False
+            self._ready.add(id(self.primary))
             logger.info("Connected to primary provider")
             return True
         
@@ -50,7 +147,7 @@ class FallbackDataProvider(BaseDataProvider):
         logger.warning("Primary provider failed, trying fallback")
         if await self.fallback.connect():
             self.current = self.fallback
-            self._primary_failed = True
+            self._ready.add(id(self.fallback))
             logger.info("Connected to fallback provider")
             return True
         
@@ -61,52 +158,88 @@ class FallbackDataProvider(BaseDataProvider):
         """Disconnect both providers."""
         await self.primary.disconnect()
         await self.fallback.disconnect()
+        self._ready.clear()
     
     async def is_connected(self) -> bool:
         """Check current provider connection."""
         return await self.current.is_connected()
-    
+
+    def _order(self) -> List[BaseDataProvider]:
+        """Providers in the order to try: primary first unless its circuit is open."""
+        now = time.monotonic()
+        order = [self.primary, self.fallback]
+        available = [p for p in order if self._health[id(p)].available(now)]
+        # With every circuit open, trying is better than failing outright
+        return available or order
+
+    async def _call(self, provider: BaseDataProvider, method_name: str, *args, **kwargs):
+        health = self._health[id(provider)]
+        start = time.monotonic()
+        try:
+            if id(provider) not in self._ready:
+                if not (await provider.is_connected() or await provider.connect()):
+                    raise ConnectionError(f"{type(provider).__name__} is not connected")
+                self._ready.add(id(provider))
+            result = await getattr(provider, method_name)(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            health.record_failure(e)
+            self._ready.discard(id(provider))
+            logger.warning(f"{method_name} failed on {type(provider).__name__}: {e}")
+            raise
+        health.record_success(time.monotonic() - start)
+        self.current = provider
+        return result
+
     async def _try_with_fallback(self, method_name: str, *args, **kwargs):
         """
-        Try method on current provider, fallback if fails.
-        
-        Simple implementation - if current fails, switch to other.
+        Call method on the preferred provider, hedging or failing over to the other.
         """
+        order = self._order()
+        first = asyncio.ensure_future(self._call(order[0], method_name, *args, **kwargs))
+        if len(order) == 1:
+            return await first
+        second_provider = order[1]
+
+        delay = None
+        if self.hedge:
+            delay = self._health[id(order[0])].p95(self.min_samples) or self.hedge_delay
         try:
-            # Try current provider
-            method = getattr(self.current, method_name)
-            result = await method(*args, **kwargs)
-            
-            # If we're on fallback and primary is back, switch back
-            if self._primary_failed and await self.primary.is_connected():
-                self.current = self.primary
-                self._primary_failed = False
-                logger.info("Switched back to primary provider")
-            
-            return result
-            
-        except Exception as e:
-            logger.warning(f"{method_name} failed on {type(self.current).__name__}: {e}")
-            
-            # Switch to other provider
-            if self.current == self.primary:
-                if await self.fallback.is_connected() or await self.fallback.connect():
-                    self.current = self.fallback
-                    self._primary_failed = True
-                    logger.info("Switched to fallback provider")
-            else:
-                if await self.primary.is_connected() or await self.primary.connect():
-                    self.current = self.primary
-                    self._primary_failed = False
-                    logger.info("Switched back to primary provider")
-            
-            # Retry with new provider
+            done, _ = await asyncio.wait({first}, timeout=delay)
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+
+        if done:
+            if not first.exception():
+                return first.result()
+            # Failed outright: plain failover
             try:
-                method = getattr(self.current, method_name)
-                return await method(*args, **kwargs)
+                return await self._call(second_provider, method_name, *args, **kwargs)
             except Exception as e2:
                 logger.error(f"{method_name} failed on both providers: {e2}")
                 raise
+
+        # Slow: hedge to the other provider, first success wins
+        self._health[id(second_provider)].hedges += 1
+        second = asyncio.ensure_future(self._call(second_provider, method_name, *args, **kwargs))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._health[id(second_provider)].hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        logger.error(f"{method_name} failed on both providers: {error}")
+        raise error
     
     async def get_price_data(
         self,
@@ -126,6 +259,24 @@ class FallbackDataProvider(BaseDataProvider):
         """Get current price with fallback."""
         return await self._try_with_fallback('get_current_price', symbol)
     
+    async def get_price_data_many(
+        self,
+        symbols: List[str],
+        bars: int = 100,
+        interval: str = "5 mins"
+    ) -> Dict[str, List[Dict]]:
+        """Get price data for several symbols with fallback."""
+        return await self._try_with_fallback(
+            'get_price_data_many',
+            symbols,
+            bars=bars,
+            interval=interval
+        )
+    
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get current prices for several symbols with fallback."""
+        return await self._try_with_fallback('get_current_price_many', symbols)
+    
     async def get_vix_data(self) -> Dict:
         """Get VIX data with fallback."""
         return await self._try_with_fallback('get_vix_data')
@@ -145,12 +296,18 @@ class FallbackDataProvider(BaseDataProvider):
         )
     
     async def health_check(self) -> Dict:
-        """Check health of both providers."""
+        """Check health of both providers, with their latency and circuit state."""
         primary_health = await self.primary.health_check()
         fallback_health = await self.fallback.health_check()
+        primary_health['requests'] = self._health[id(self.primary)].report()
+        fallback_health['requests'] = self._health[id(self.fallback)].report()
+        primary_ok = (
+            primary_health['status'] == 'healthy'
+            and self._health[id(self.primary)].available()
+        )
         
         return {
-            'status': 'healthy' if primary_health['status'] == 'healthy' else 'degraded',
+            'status': 'healthy' if primary_ok else 'degraded',
             'connected': await self.is_connected(),
             'current_provider': type(self.current).__name__,
             'primary': primary_health,
@@ -1,16 +1,21 @@
 """
 Redis data provider for subscribing to market data streams.
 
-This is a simplified implementation that subscribes to Redis pub/sub channels
-for market data. Ideal for distributed systems where Magic8-Companion publishes
-data to Redis.
+Magic8-Companion publishes bars, quotes and VIX to Redis pub/sub channels
+and also stores the latest values under ``bars:{symbol}:{interval}`` and
+``quote:{symbol}`` keys. This provider keeps one long-lived listener that
+copies every published update into a local mirror keyed by those same
+Redis keys, so reads are served from memory. Keys missing from the mirror
+are fetched with a single MGET per call, whatever the number of symbols.
 """
 
 import asyncio
 import json
 import logging
+import re
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import redis.asyncio as aioredis
 
@@ -19,14 +24,16 @@ from .base_provider import BaseDataProvider
 logger = logging.getLogger(__name__)
 
 
+def _channel_regex(template: str) -> "re.Pattern":
+    return re.compile(re.escape(template).replace(re.escape('{symbol}'), '(?P<symbol>[^:]+)') + '$')
+
+
 class RedisDataProvider(BaseDataProvider):
     """
-    Simple Redis-based data provider using pub/sub pattern.
-    
-    Ship-fast implementation - can be enhanced later with:
-    - Connection pooling
-    - Better error handling
-    - Data validation
+    Redis-backed data provider with a pooled client and a pub/sub mirror.
+
+    Mirror entries older than ``max_age`` seconds are refetched from the
+    Redis keys, so a stalled publisher does not freeze the data.
     """
     
     def __init__(
@@ -34,9 +41,18 @@ class RedisDataProvider(BaseDataProvider):
         host: str = "localhost",
         port: int = 6379,
         channels: Optional[Dict] = None,
-        db: int = 0
+        db: int = 0,
+        max_connections: int = 10,
+        max_age: float = 30.0,
+        client: Optional[Any] = None,
     ):
-        """Initialize Redis data provider."""
+        """Initialize Redis data provider.
+
+        Args:
+            max_connections: Size of the connection pool
+            max_age: Seconds a mirrored value is served without re-reading Redis
+            client: Preconfigured async Redis client (used instead of a pool)
+        """
         self.host = host
         self.port = port
         self.db = db
@@ -45,26 +61,43 @@ class RedisDataProvider(BaseDataProvider):
             'vix_data': 'market:vix',
             'option_data': 'market:options:{symbol}'
         }
+        self.max_connections = max_connections
+        self.max_age = max_age
         
-        self.redis: Optional[aioredis.Redis] = None
-        self.pubsub: Optional[aioredis.client.PubSub] = None
-        self._cache = {}  # Simple in-memory cache
+        self.redis: Optional[aioredis.Redis] = client
+        self._owns_client = client is None
+        self._listener: Optional[asyncio.Task] = None
+        self._channel_patterns = {
+            name: _channel_regex(template) for name, template in self.channels.items()
+        }
+        # Redis key -> (monotonic receive time, decoded value)
+        self._mirror: Dict[str, Tuple[float, Any]] = {}
+        self._callbacks: Dict[str, List[Callable]] = {}
+
+        self.mirror_hits = 0
+        self.round_trips = 0
+        self.keys_fetched = 0
+        self.messages = 0
+        self.listener_restarts = 0
         
         logger.info(f"RedisDataProvider initialized: {host}:{port}")
     
     async def connect(self) -> bool:
-        """Connect to Redis."""
+        """Connect to Redis and start the pub/sub listener."""
         try:
-            self.redis = await aioredis.from_url(
-                f"redis://{self.host}:{self.port}/{self.db}",
-                decode_responses=True
-            )
+            if self.redis is None:
+                pool = aioredis.ConnectionPool.from_url(
+                    f"redis://{self.host}:{self.port}/{self.db}",
+                    decode_responses=True,
+                    max_connections=self.max_connections,
+                )
+                self.redis = aioredis.Redis(connection_pool=pool)
             
             # Test connection
             await self.redis.ping()
-            
-            # Create pubsub
-            self.pubsub = self.redis.pubsub()
+
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
             
             logger.info("Connected to Redis")
             return True
@@ -74,11 +107,17 @@ class RedisDataProvider(BaseDataProvider):
             return False
     
     async def disconnect(self):
-        """Disconnect from Redis."""
-        if self.pubsub:
-            await self.pubsub.close()
-        if self.redis:
-            await self.redis.close()
+        """Stop the listener and disconnect from Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.redis is not None and self._owns_client:
+            await self.redis.aclose()
+            self.redis = None
         logger.info("Disconnected from Redis")
     
     async def is_connected(self) -> bool:
@@ -90,6 +129,88 @@ class RedisDataProvider(BaseDataProvider):
             return True
         except:
             return False
+
+    async def _listen(self):
+        """Mirror every published update; resubscribe after errors."""
+        patterns = [template.replace('{symbol}', '*') for template in self.channels.values()]
+        delay = 0.5
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(*patterns)
+                delay = 0.5
+                async for message in pubsub.listen():
+                    if message['type'] in ('message', 'pmessage'):
+                        await self._on_message(message['channel'], message['data'])
+            except asyncio.CancelledError:
+                await self._close_pubsub(pubsub)
+                raise
+            except Exception as e:
+                self.listener_restarts += 1
+                logger.warning(f"Redis listener error, resubscribing in {delay:.1f}s: {e}")
+            await self._close_pubsub(pubsub)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    @staticmethod
+    async def _close_pubsub(pubsub):
+        try:
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+    async def _on_message(self, channel: str, raw: str):
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.debug(f"Ignoring non-JSON message on {channel}")
+            return
+        self.messages += 1
+        now = time.monotonic()
+
+        for name, pattern in self._channel_patterns.items():
+            match = pattern.match(channel)
+            if not match:
+                continue
+            symbol = match.groupdict().get('symbol')
+            if name == 'price_data' and symbol:
+                if 'bars' in data:
+                    interval = data.get('interval', '5 mins')
+                    self._mirror[f"bars:{symbol}:{interval}"] = (now, data['bars'])
+                if 'last' in data:
+                    self._mirror[f"quote:{symbol}"] = (now, data)
+            elif name == 'vix_data':
+                self._mirror["quote:VIX"] = (now, data)
+            for callback in self._callbacks.get(f"{name}:{symbol or ''}", []):
+                try:
+                    await callback(data)
+                except Exception as e:
+                    logger.error(f"Subscription callback error: {e}")
+            break
+
+    async def _read(self, keys: List[str]) -> Dict[str, Any]:
+        """Return decoded values for ``keys`` from the mirror, MGET-ing the rest."""
+        now = time.monotonic()
+        values: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            entry = self._mirror.get(key)
+            if entry is not None and now - entry[0] <= self.max_age:
+                values[key] = entry[1]
+                self.mirror_hits += 1
+            elif key not in missing:
+                missing.append(key)
+
+        if missing:
+            self.round_trips += 1
+            self.keys_fetched += len(missing)
+            for key, raw in zip(missing, await self.redis.mget(missing)):
+                if raw is None:
+                    continue
+                value = json.loads(raw)
+                self._mirror[key] = (now, value)
+                values[key] = value
+        return values
     
     async def get_price_data(
         self,
@@ -97,62 +218,52 @@ class RedisDataProvider(BaseDataProvider):
         bars: int = 100,
         interval: str = "5 mins"
     ) -> List[Dict]:
-        """Get price data from Redis cache."""
-        # Try cache first
-        cache_key = f"bars:{symbol}:{interval}"
-        
-        # Get from Redis
-        data = await self.redis.get(cache_key)
-        if data:
-            bars_data = json.loads(data)
-            # Return requested number of bars
-            return bars_data[-bars:] if len(bars_data) > bars else bars_data
-        
-        # Fallback: subscribe and wait for data
-        channel = self.channels['price_data'].format(symbol=symbol)
-        await self.pubsub.subscribe(channel)
-        
-        try:
-            # Wait for data with timeout
-            async with asyncio.timeout(5.0):
-                async for message in self.pubsub.listen():
-                    if message['type'] == 'message':
-                        data = json.loads(message['data'])
-                        if 'bars' in data:
-                            return data['bars'][-bars:]
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout waiting for price data: {symbol}")
-            return []
-        finally:
-            await self.pubsub.unsubscribe(channel)
+        """Get price data from the mirror or the Redis bars key."""
+        return (await self.get_price_data_many([symbol], bars, interval))[symbol]
+
+    async def get_price_data_many(
+        self,
+        symbols: List[str],
+        bars: int = 100,
+        interval: str = "5 mins"
+    ) -> Dict[str, List[Dict]]:
+        """Get price bars for several symbols with at most one round trip."""
+        keys = {symbol: f"bars:{symbol}:{interval}" for symbol in symbols}
+        values = await self._read(list(keys.values()))
+        result = {}
+        for symbol, key in keys.items():
+            bars_data = values.get(key) or []
+            if not bars_data:
+                logger.debug(f"No price data in Redis for {symbol}")
+            result[symbol] = bars_data[-bars:]
+        return result
     
     async def get_current_price(self, symbol: str) -> Dict:
-        """Get current price from Redis."""
-        # Simple implementation - get latest from cache
-        quote_key = f"quote:{symbol}"
-        
-        data = await self.redis.get(quote_key)
-        if data:
-            return json.loads(data)
-        
-        # Return empty quote if not found
-        return {
-            'symbol': symbol,
-            'last': 0,
-            'bid': 0,
-            'ask': 0,
-            'bid_size': 0,
-            'ask_size': 0,
-            'time': datetime.now().isoformat()
-        }
+        """Get current price from the mirror or the Redis quote key."""
+        return (await self.get_current_price_many([symbol]))[symbol]
+
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Get quotes for several symbols with at most one round trip."""
+        values = await self._read([f"quote:{symbol}" for symbol in symbols])
+        result = {}
+        for symbol in symbols:
+            data = values.get(f"quote:{symbol}")
+            # Empty quote if not found
+            result[symbol] = data if data else {
+                'symbol': symbol,
+                'last': 0,
+                'bid': 0,
+                'ask': 0,
+                'bid_size': 0,
+                'ask_size': 0,
+                'time': datetime.now().isoformat()
+            }
+        return result
     
     async def get_vix_data(self) -> Dict:
-        """Get VIX data from Redis."""
-        vix_key = "quote:VIX"
-        
-        data = await self.redis.get(vix_key)
-        if data:
-            vix_data = json.loads(data)
+        """Get VIX data from the mirror or Redis."""
+        vix_data = (await self._read(["quote:VIX"])).get("quote:VIX")
+        if vix_data:
             return {
                 'last': vix_data.get('last', 0),
                 'change': vix_data.get('change', 0),
@@ -171,6 +282,18 @@ class RedisDataProvider(BaseDataProvider):
             'low': 15.0,
             'time': datetime.now().isoformat()
         }
+
+    def stats(self) -> Dict[str, Any]:
+        """Mirror and round-trip counters."""
+        return {
+            'mirrored_keys': len(self._mirror),
+            'mirror_hits': self.mirror_hits,
+            'round_trips': self.round_trips,
+            'keys_fetched': self.keys_fetched,
+            'messages': self.messages,
+            'listener_running': self._listener is not None and not self._listener.done(),
+            'listener_restarts': self.listener_restarts,
+        }
     
     async def get_option_chain(
         self,
@@ -190,28 +313,11 @@ class RedisDataProvider(BaseDataProvider):
         callback,
         update_type: str = "price"
     ) -> str:
-        """Subscribe to real-time updates."""
-        channel = self.channels.get(f'{update_type}_data', '').format(symbol=symbol)
+        """Register ``callback`` for updates delivered by the shared listener."""
+        name = f'{update_type}_data'
+        key = f"{name}:{symbol if '{symbol}' in self.channels.get(name, '') else ''}"
+        self._callbacks.setdefault(key, []).append(callback)
         
-        # Create subscription task
         subscription_id = f"{symbol}_{update_type}_{id(callback)}"
-        
-        async def listen():
-            pubsub = self.redis.pubsub()
-            await pubsub.subscribe(channel)
-            
-            try:
-                async for message in pubsub.listen():
-                    if message['type'] == 'message':
-                        data = json.loads(message['data'])
-                        await callback(data)
-            except Exception as e:
-                logger.error(f"Subscription error: {e}")
-            finally:
-                await pubsub.close()
-        
-        # Start listener
-        asyncio.create_task(listen())
-        
-        logger.info(f"Subscribed to {channel}")
+        logger.info(f"Subscribed to {self.channels.get(name, '').format(symbol=symbol)}")
         return subscription_id
@@ -7,11 +7,12 @@ import asyncio
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Set
-import math
 
 from ib_insync import IB, Stock, Index, Option, util
 from src.constants import DEFAULT_IB_PORT
+from src.historical_scheduler import PRIORITY_LIVE, HistoricalRequestScheduler
 from src.ib_connection_manager import IBConnectionManager
+from src.quote_stream import QuoteStream
 
 from .base_provider import BaseDataProvider
 
@@ -27,16 +28,27 @@ class StandaloneDataProvider(BaseDataProvider):
         self,
         ib_host: str = "127.0.0.1",
         ib_port: int = DEFAULT_IB_PORT,
-        client_id: int = 99
+        client_id: int = 99,
+        pacing: Optional[Dict] = None,
     ):
-        """Initialize standalone IBKR provider."""
+        """Initialize standalone IBKR provider.
+
+        Args:
+            pacing: Options for the historical request scheduler
+                (see :class:`HistoricalRequestScheduler`)
+        """
         self.ib_host = ib_host
         self.ib_port = ib_port
         self.client_id = client_id
+        self.pacing = pacing or {}
         self.ib: Optional[IB] = None  # will be obtained from IBConnectionManager
         
         # Contract cache
         self._contracts = {}
+
+        # Streaming quote subscriptions, bound to ``self.ib``
+        self._quotes: Optional[QuoteStream] = None
+        self._history: Optional[HistoricalRequestScheduler] = None
         
         # Track failed symbols to avoid repeated subscription errors
         self._failed_symbols: Set[str] = set()
@@ -58,6 +70,8 @@ class StandaloneDataProvider(BaseDataProvider):
             self.ib = await manager.connect_async(
                 self.ib_host, self.ib_port, self.client_id
             )
+            self._quotes = manager.quote_stream(self._get_contract)
+            self._history = manager.history_scheduler(**self.pacing)
 
             def error_handler(reqId, errorCode, errorString, contract):
                 if errorCode == 354:
@@ -66,6 +80,8 @@ class StandaloneDataProvider(BaseDataProvider):
                     )
                     if contract and hasattr(contract, 'symbol'):
                         self._failed_symbols.add(contract.symbol)
+                        if self._quotes is not None:
+                            self._quotes.unsubscribe(contract.symbol)
 
             self.ib.errorEvent += error_handler
 
@@ -78,6 +94,7 @@ class StandaloneDataProvider(BaseDataProvider):
     async def disconnect(self):
         """Disconnect from IBKR."""
         IBConnectionManager.instance().disconnect()
+        self._quotes = None
         self.ib = None
 
     async def is_connected(self) -> bool:
@@ -86,6 +103,21 @@ class StandaloneDataProvider(BaseDataProvider):
             return False
         return self.ib.isConnected()
     
+    @property
+    def quotes(self) -> QuoteStream:
+        """Quote stream for the current connection."""
+        if self._quotes is None or self._quotes.ib is not self.ib:
+            self._quotes = QuoteStream(self.ib, self._get_contract)
+        return self._quotes
+
+    @property
+    def history(self) -> HistoricalRequestScheduler:
+        """Pacing scheduler all historical requests go through."""
+        if self._history is None:
+            self._history = HistoricalRequestScheduler(self.ib, **self.pacing)
+        self._history.ib = self.ib
+        return self._history
+
     def _get_contract(self, symbol: str):
         """Get or create contract for symbol."""
         if symbol in self._contracts:
@@ -113,9 +145,16 @@ class StandaloneDataProvider(BaseDataProvider):
         self,
         symbol: str,
         bars: int = 100,
-        interval: str = "5 mins"
+        interval: str = "5 mins",
+        priority: int = PRIORITY_LIVE,
+        duration: Optional[str] = None,
     ) -> List[Dict]:
-        """Get historical price bars from IBKR."""
+        """Get historical price bars from IBKR.
+
+        Requests are sent through :attr:`history`, which paces them and
+        serves ``priority`` order (lower first). ``duration`` overrides the
+        IB duration string, e.g. to fetch only a recent gap.
+        """
         if not await self.is_connected():
             logger.error("Not connected to IBKR")
             return []
@@ -129,10 +168,11 @@ class StandaloneDataProvider(BaseDataProvider):
             contract = self._get_contract(symbol)
             
             # Request historical data
-            bars_data = await self.ib.reqHistoricalDataAsync(
+            bars_data = await self.history.request(
                 contract,
+                priority=priority,
                 endDateTime='',
-                durationStr='1 D' if bars <= 100 else '5 D',
+                durationStr=duration or ('1 D' if bars <= 100 else '5 D'),
                 barSizeSetting=interval,
                 whatToShow='TRADES',
                 useRTH=True,
@@ -163,65 +203,27 @@ class StandaloneDataProvider(BaseDataProvider):
             return []
     
     async def get_current_price(self, symbol: str) -> Dict:
-        """Get current price from IBKR."""
+        """Get current price from the streaming quote store.
+
+        The first call for a symbol subscribes and waits for its first
+        tick; later calls are served from memory while the quote is fresh.
+        A stale quote raises so the caller falls back to another source.
+        """
         if not await self.is_connected():
             raise Exception("Not connected to IBKR")
         
         # Skip if we know this symbol has subscription issues
         if symbol in self._failed_symbols:
             raise Exception(f"Market data subscription missing for {symbol}")
-        
-        ticker = None
-        try:
-            contract = self._get_contract(symbol)
-
-            # Request market data
-            ticker = self.ib.reqMktData(contract, '', False, False)
 
-            # Wait for data with timeout
-            timeout = 5  # Increased timeout
-            start_time = asyncio.get_event_loop().time()
-
-            while (ticker.last is None or math.isnan(ticker.last)) and ticker.close is None:
-                await asyncio.sleep(0.1)
-                if asyncio.get_event_loop().time() - start_time > timeout:
-                    if symbol in self._failed_symbols:
-                        raise Exception(f"Market data subscription missing for {symbol}")
-                    raise Exception(f"Timeout waiting for market data for {symbol}")
-            
-            # Helper function to safely convert to int, handling NaN
-            def safe_int(value):
-                if value is None or (isinstance(value, float) and math.isnan(value)):
-                    return 0
-                return int(value)
-            
-            # Helper function to safely convert to float, handling NaN
-            def safe_float(value):
-                if value is None or (isinstance(value, float) and math.isnan(value)):
-                    return 0.0
-                return float(value)
-            
-            return {
-                'symbol': symbol,
-                'last': safe_float(ticker.last or ticker.close),
-                'bid': safe_float(ticker.bid),
-                'ask': safe_float(ticker.ask),
-                'bid_size': safe_int(ticker.bidSize),
-                'ask_size': safe_int(ticker.askSize),
-                'time': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            # Re-raise the exception to be handled by DataManager
-            raise e
-        finally:
-            if ticker is not None and hasattr(ticker, "reqId") and ticker.reqId is not None:
-                try:
-                    self.ib.cancelMktData(ticker)
-                except Exception as cancel_error:
-                    logger.debug(
-                        f"Error cancelling market data for {symbol}: {cancel_error}"
-                    )
+        try:
+            quote = await self.quotes.wait_for(symbol, timeout=5)
+        except TimeoutError as e:
+            if symbol in self._failed_symbols:
+                raise Exception(f"Market data subscription missing for {symbol}")
+            # No tick, or a stale quote that resubscribing did not refresh
+            raise Exception(str(e)) from None
+        return quote.to_dict()
 
     async def _update_daily_data(self, symbol: str):
         """Fetch daily bar data to update previous close and high/low."""
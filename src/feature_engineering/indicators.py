@@ -0,0 +1,285 @@
+"""
+Streaming technical indicators for real-time feature generation.
+
+Each symbol keeps a small amount of state (ring buffers, monotonic deques,
+Wilder averages) that is updated in O(1) per new bar, so generating
+features only reads the latest values instead of rebuilding a DataFrame.
+
+The definitions match ``add_price_indicators``, which is what
+``Phase1DataPreparation.load_ibkr_data`` uses offline:
+
+- ``sma_20``: 20-bar simple moving average of close
+- ``momentum_5``: ``close.pct_change(5)``
+- ``volatility_20``: 20-bar standard deviation of close (ddof=1)
+- ``rsi``: Wilder RSI (``ta.momentum.RSIIndicator``, window 14)
+- ``price_position``: close position inside the 20-bar high/low range
+"""
+
+import copy
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+def add_price_indicators(df: pd.DataFrame, window: int = 20, momentum: int = 5, rsi_period: int = 14) -> pd.DataFrame:
+    """Add the Phase 1 price indicators to an OHLC DataFrame in place."""
+    import ta
+
+    df[f'sma_{window}'] = df['close'].rolling(window).mean()
+    df[f'momentum_{momentum}'] = df['close'].pct_change(momentum)
+    df[f'volatility_{window}'] = df['close'].rolling(window).std()
+    if len(df) > rsi_period:
+        df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=rsi_period).rsi()
+    df[f'high_{window}'] = df['high'].rolling(window).max()
+    df[f'low_{window}'] = df['low'].rolling(window).min()
+    df['price_position'] = (df['close'] - df[f'low_{window}']) / (df[f'high_{window}'] - df[f'low_{window}'] + 1e-8)
+    return df
+
+
+def add_vix_indicators(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+    """Add the Phase 1 VIX indicators to a close-price DataFrame in place."""
+    df[f'vix_sma_{window}'] = df['close'].rolling(window).mean()
+    df['vix_change'] = df['close'].pct_change()
+    return df
+
+
+class RollingStats:
+    """Fixed-size window with O(1) mean and sample standard deviation."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values: deque = deque(maxlen=size)
+        self._pivot: Optional[float] = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def push(self, value: float) -> None:
+        # Values are stored relative to the first one seen to keep the
+        # running sum of squares well conditioned for index-level prices.
+        if self._pivot is None:
+            self._pivot = value
+        x = value - self._pivot
+        if len(self._values) == self.size:
+            old = self._values[0]
+            self._sum -= old
+            self._sumsq -= old * old
+        self._values.append(x)
+        self._sum += x
+        self._sumsq += x * x
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self.size
+
+    def mean(self) -> Optional[float]:
+        if not self.full:
+            return None
+        return self._pivot + self._sum / self.size
+
+    def std(self) -> Optional[float]:
+        if not self.full or self.size < 2:
+            return None
+        var = (self._sumsq - self._sum * self._sum / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class RollingExtreme:
+    """Sliding-window max (or min) using a monotonic deque."""
+
+    def __init__(self, size: int, mode: str = "max"):
+        self.size = size
+        self._better = (lambda a, b: a >= b) if mode == "max" else (lambda a, b: a <= b)
+        self._deque: deque = deque()
+        self._count = 0
+
+    def push(self, value: float) -> None:
+        while self._deque and self._better(value, self._deque[-1][1]):
+            self._deque.pop()
+        self._deque.append((self._count, value))
+        self._count += 1
+        if self._deque[0][0] <= self._count - 1 - self.size:
+            self._deque.popleft()
+
+    def value(self) -> Optional[float]:
+        if self._count < self.size:
+            return None
+        return self._deque[0][1]
+
+
+class WilderRSI:
+    """Wilder RSI matching ``ta.momentum.RSIIndicator`` (``adjust=False`` EWM)."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self._prev: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    def push(self, close: float) -> None:
+        # ``ta`` fills the first (NaN) diff with 0, so it seeds both averages
+        diff = 0.0 if self._prev is None else close - self._prev
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        if self._count == 0:
+            self._avg_gain, self._avg_loss = gain, loss
+        else:
+            self._avg_gain += self.alpha * (gain - self._avg_gain)
+            self._avg_loss += self.alpha * (loss - self._avg_loss)
+        self._prev = close
+        self._count += 1
+
+    def value(self) -> Optional[float]:
+        if self._count < self.period:
+            return None
+        if self._avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+
+class IndicatorState:
+    """Streaming indicator state for one symbol."""
+
+    def __init__(
+        self,
+        window: int = 20,
+        sma_periods: Iterable[int] = (20,),
+        momentum_periods: Iterable[int] = (5,),
+        rsi_period: int = 14,
+    ):
+        self.window = window
+        self.sma = {p: RollingStats(p) for p in sma_periods}
+        self.volatility = RollingStats(window)
+        self.high = RollingExtreme(window, "max")
+        self.low = RollingExtreme(window, "min")
+        self.rsi = WilderRSI(rsi_period)
+        self.momentum_periods = list(momentum_periods)
+        self._closes: deque = deque(maxlen=max(self.momentum_periods, default=0) + 1)
+        self.last_time: Optional[str] = None
+        self.last_close: Optional[float] = None
+        self.n_bars = 0
+
+    def push(self, bar: Dict) -> None:
+        close = float(bar['close'])
+        for stats in self.sma.values():
+            stats.push(close)
+        self.volatility.push(close)
+        self.high.push(float(bar['high']))
+        self.low.push(float(bar['low']))
+        self.rsi.push(close)
+        self._closes.append(close)
+        self.last_time = bar.get('time')
+        self.last_close = close
+        self.n_bars += 1
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Return the current indicator values (``None`` until warmed up)."""
+        values: Dict[str, Optional[float]] = {'close': self.last_close}
+        for period, stats in self.sma.items():
+            values[f'sma_{period}'] = stats.mean()
+        for period in self.momentum_periods:
+            if len(self._closes) > period and self._closes[-1 - period]:
+                past = self._closes[-1 - period]
+                values[f'momentum_{period}'] = (self._closes[-1] - past) / past
+            else:
+                values[f'momentum_{period}'] = None
+        values[f'volatility_{self.window}'] = self.volatility.std()
+        values['rsi'] = self.rsi.value()
+        high, low = self.high.value(), self.low.value()
+        if high is None or low is None:
+            values['price_position'] = None
+        else:
+            values['price_position'] = (self.last_close - low) / (high - low + 1e-8)
+        return values
+
+
+class IndicatorEngine:
+    """Per-symbol streaming indicators fed from provider bars."""
+
+    def __init__(
+        self,
+        window: int = 20,
+        sma_periods: Iterable[int] = (20,),
+        momentum_periods: Iterable[int] = (5,),
+        rsi_period: int = 14,
+    ):
+        self._params = dict(
+            window=window,
+            sma_periods=tuple(sma_periods),
+            momentum_periods=tuple(momentum_periods),
+            rsi_period=rsi_period,
+        )
+        # Closed bars only; the newest bar of a provider window may still be
+        # forming, so it is applied to a copy kept in ``_current``
+        self._states: Dict[str, IndicatorState] = {}
+        self._current: Dict[str, IndicatorState] = {}
+
+    def _new_state(self) -> IndicatorState:
+        return IndicatorState(**self._params)
+
+    def update(self, symbol: str, bars: List[Dict]) -> int:
+        """Push bars newer than the last one seen for ``symbol``.
+
+        ``bars`` is the provider's oldest-first window. Its last bar may still
+        be forming (IB with ``endDateTime=''``, companion bars), so it is
+        applied on top of the closed bars each time and replaced when it is
+        sent again under the same ``time``. When ``bars`` does not overlap the
+        stored state (first call, a gap, or bars without a ``time``) the state
+        is rebuilt from ``bars``.
+
+        Returns:
+            Number of bars with a ``time`` not seen before
+        """
+        if not bars:
+            return 0
+        closed = self._states.get(symbol)
+        current = self._current.get(symbol)
+        first_time, last_time = bars[0].get('time'), bars[-1].get('time')
+        if (
+            closed is None
+            or current.last_time is None
+            or first_time is None
+            or last_time is None
+            or str(first_time) > str(current.last_time)
+        ):
+            closed = self._new_state()
+            self._states[symbol] = closed
+            pending = bars[:-1]
+            new = len(bars)
+        else:
+            seen = str(current.last_time)
+            after = None if closed.last_time is None else str(closed.last_time)
+            if after is not None and str(last_time) <= after:
+                # Older window than the state already holds
+                return 0
+            pending = [
+                b for b in bars[:-1]
+                if b.get('time') is not None and (after is None or str(b['time']) > after)
+            ]
+            new = sum(1 for b in bars if b.get('time') is not None and str(b['time']) > seen)
+
+        for bar in pending:
+            closed.push(bar)
+        current = copy.deepcopy(closed)
+        current.push(bars[-1])
+        self._current[symbol] = current
+        return new
+
+    def snapshot(self, symbol: str) -> Optional[Dict[str, Optional[float]]]:
+        """Return the latest indicator values for ``symbol`` if any."""
+        state = self._current.get(symbol)
+        if state is None or state.n_bars == 0:
+            return None
+        return state.snapshot()
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        """Drop state for ``symbol`` or for every symbol."""
+        if symbol is None:
+            self._states.clear()
+            self._current.clear()
+        else:
+            self._states.pop(symbol, None)
+            self._current.pop(symbol, None)
@@ -12,14 +12,18 @@ import asyncio
 import logging
 import math
 import json
+import time as _time
+from dataclasses import dataclass
 from datetime import datetime, time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 import numpy as np
-import pandas as pd
 import joblib
 
+from .indicators import IndicatorEngine
+
 # Use absolute import for package modules
 try:
     from data_providers.base_provider import BaseDataProvider
@@ -34,6 +38,60 @@ except Exception:  # pragma: no cover - fallback for tests
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class MarketContext:
+    """Immutable market-derived features for one symbol.
+
+    ``features`` holds the price features, VIX features and VIX regime
+    one-hots; ``timestamp`` is when the snapshot was built (epoch seconds)
+    and ``bar_time`` the time of the last price bar it was built from.
+    """
+
+    symbol: str
+    features: Mapping[str, float]
+    timestamp: float
+    bar_time: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else _time.time()) - self.timestamp
+
+
+class FeaturePlan:
+    """Column layout of one symbol's training feature order, compiled once.
+
+    Maps every generator output name to its column so feature dicts can be
+    written straight into a float32 row. Training orders name price
+    features ``SPX_*``; for other symbols the generator emits
+    ``{symbol}_*`` and those names are mapped to the same columns.
+    Features missing from the input stay 0.
+    """
+
+    def __init__(self, symbol: str, feature_order: List[str]) -> None:
+        self.symbol = symbol
+        self.names = list(feature_order)
+        self.n_features = len(self.names)
+        self.index: Dict[str, int] = {}
+        for i, name in enumerate(self.names):
+            self.index.setdefault(name, i)
+        if symbol != 'SPX':
+            for i, name in enumerate(self.names):
+                if name.startswith('SPX_'):
+                    self.index.setdefault(f'{symbol}_{name[4:]}', i)
+
+    def new_row(self) -> np.ndarray:
+        return np.zeros(self.n_features, dtype=np.float32)
+
+    def write(self, row: np.ndarray, features: Mapping[str, float]) -> np.ndarray:
+        """Write the known ``features`` into their columns of ``row``."""
+        index = self.index
+        for name, value in features.items():
+            col = index.get(name)
+            if col is not None:
+                row[col] = 0.0 if value is None else value
+        return row
+
+
 class RealTimeFeatureGenerator:
     """
     Generates features for real-time predictions matching Phase 1 training.
@@ -65,14 +123,34 @@ class RealTimeFeatureGenerator:
         self.price_config = self.config.get('price', {})
         self.vix_config = self.config.get('vix', {})
 
+        # Streaming indicators, fed by bars fetched from the data provider
+        vix_sma = self.vix_config.get('sma_period', 20)
+        self.indicators = IndicatorEngine(
+            window=20,
+            sma_periods=sorted(set(self.price_config.get('sma_periods', [20])) | {vix_sma}),
+            momentum_periods=self.price_config.get('momentum_periods', [5]),
+            rsi_period=self.price_config.get('rsi_period', 14),
+        )
+
         # Load global feature order
         self.global_feature_order = self._load_feature_order(feature_info_path)
         self.symbol_feature_orders: Dict[str, List[str]] = {}
+        self._plans: Dict[str, FeaturePlan] = {}
 
         # Default to global order
         self.feature_order = self.global_feature_order
         self.feature_dir = feature_dir
 
+        # Market context snapshots, replaced as a whole by the refresher.
+        # ``context_max_age`` of 0 disables their use on the request path.
+        self._contexts: Dict[str, MarketContext] = {}
+        self._vix_features: Optional[Dict[str, float]] = None
+        self.context_symbols: Set[str] = set()
+        self.context_max_age = 0.0
+        # Cap on the refresh set, so arbitrary request symbols cannot grow it
+        self.max_context_symbols = 64
+        self._refresher: Optional[asyncio.Task] = None
+
         logger.info("RealTimeFeatureGenerator initialized")
 
     def _load_symbol_feature_order(self, symbol: str) -> List[str]:
@@ -99,6 +177,13 @@ class RealTimeFeatureGenerator:
         """Return feature order for symbol or global order."""
         return self.symbol_feature_orders.get(symbol) or self._load_symbol_feature_order(symbol)
 
+    def get_plan(self, symbol: str) -> FeaturePlan:
+        """Return the compiled feature plan for symbol."""
+        plan = self._plans.get(symbol)
+        if plan is None:
+            plan = self._plans[symbol] = FeaturePlan(symbol, self._get_feature_order(symbol))
+        return plan
+
     def _default_config(self) -> Dict:
         """Get default feature configuration matching Phase 1."""
         return {
@@ -171,7 +256,7 @@ class RealTimeFeatureGenerator:
         self,
         symbol: str,
         order_details: Dict
-    ) -> Tuple[List[float], List[str]]:
+    ) -> Tuple[np.ndarray, List[str]]:
         """
         Generate all features for a prediction.
         
@@ -180,9 +265,28 @@ class RealTimeFeatureGenerator:
             order_details: Order details dictionary
             
         Returns:
-            Tuple of (feature_values, feature_names)
+            Tuple of (float32 feature row, feature_names)
         """
-        features = {}
+        market, _ = await self.generate_market_features(symbol)
+        order_features = self.generate_order_features(symbol, order_details)
+        return self.assemble_features(symbol, market, order_features)
+
+    async def generate_market_features(self, symbol: str) -> Tuple[Mapping[str, float], bool]:
+        """
+        Generate the market-derived (price and VIX) features for a symbol.
+
+        These are shared by every order on the symbol. A fresh market
+        context is used when available; otherwise market data is fetched.
+
+        Returns:
+            Tuple of (features, complete). ``complete`` is False when some
+            market data was missing, in which case callers should not cache
+            the result.
+        """
+        context = self.get_context(symbol)
+        if context is not None:
+            # Hot path: market features come from the snapshot, no I/O
+            return context.features, True
 
         # Ensure data provider connection
         await self._ensure_connected()
@@ -213,32 +317,201 @@ class RealTimeFeatureGenerator:
                     price_data = result
                 elif i == 1:  # VIX data
                     vix_data = result
-        
-        # Generate features
-        if self.temporal_config.get('enabled', True):
-            features.update(self._generate_temporal_features())
-            
+
+        vix_features = None
+        if vix_data and self.vix_config.get('enabled', True):
+            vix_features = self._generate_vix_features(vix_data)
+
+        market = self._build_market_features(symbol, price_data, vix_features)
+        if market is not None:
+            # A symbol with real market data is kept warm from now on, up
+            # to ``max_context_symbols``
+            if len(self.context_symbols) < self.max_context_symbols:
+                self.context_symbols.add(symbol)
+            if symbol not in self.context_symbols:
+                return market, True
+            return self._store_context(symbol, market, price_data).features, True
+
+        features: Dict[str, float] = {}
         if price_data and self.price_config.get('enabled', True):
             features.update(self._generate_price_features(symbol, price_data))
-            
-        if vix_data and self.vix_config.get('enabled', True):
-            features.update(self._generate_vix_features(vix_data))
-            
-        # Trade features
-        features.update(self._generate_trade_features(symbol, order_details))
-        
-        # Convert to ordered list matching training features
-        order = self._get_feature_order(symbol)
-        feature_values, feature_names = self._align_features(features, order)
-        
-        return feature_values, feature_names
+        if vix_features:
+            features.update(vix_features)
+        return features, False
+
+    def generate_order_features(self, symbol: str, order_details: Dict) -> Dict[str, float]:
+        """Generate the order-specific (trade) features."""
+        return self._generate_trade_features(symbol, order_details)
+
+    def assemble_features(
+        self,
+        symbol: str,
+        market_features: Mapping[str, float],
+        order_features: Mapping[str, float],
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Combine temporal, market and order features in training order.
+
+        Features are written through the symbol's :class:`FeaturePlan` into
+        ``out`` (e.g. a row of a preallocated batch matrix, which may be
+        wider than the plan) or into a new float32 row.
+
+        Returns:
+            Tuple of (feature row, feature_names)
+        """
+        plan = self.get_plan(symbol)
+        if out is None:
+            row = plan.new_row()
+        else:
+            out.fill(0.0)
+            row = out[:plan.n_features]
+        if self.temporal_config.get('enabled', True):
+            plan.write(row, self._generate_temporal_features())
+        plan.write(row, market_features)
+        plan.write(row, order_features)
+        return row, plan.names
     
+    @staticmethod
+    def _has_price(price_data: Optional[Dict]) -> bool:
+        if not price_data or not price_data.get('bars') or not price_data.get('current'):
+            return False
+        current = price_data['current']
+        return (current.get('last') or current.get('close') or current.get('price')) is not None
+
+    def _build_market_features(
+        self,
+        symbol: str,
+        price_data: Optional[Dict],
+        vix_features: Optional[Dict[str, float]],
+    ) -> Optional[Dict[str, float]]:
+        """Market-derived features for a context, or None if data is incomplete."""
+        price_enabled = self.price_config.get('enabled', True)
+        vix_enabled = self.vix_config.get('enabled', True)
+        if price_enabled and not self._has_price(price_data):
+            return None
+        if vix_enabled and vix_features is None:
+            return None
+
+        features: Dict[str, float] = {}
+        if price_enabled:
+            features.update(self._generate_price_features(symbol, price_data))
+        if vix_enabled:
+            features.update(vix_features)
+        return features
+
+    def _store_context(self, symbol: str, market: Dict[str, float], price_data: Optional[Dict]) -> MarketContext:
+        bars = (price_data or {}).get('bars') or []
+        context = MarketContext(
+            symbol=symbol,
+            features=MappingProxyType(dict(market)),
+            timestamp=_time.time(),
+            bar_time=str(bars[-1].get('time')) if bars and bars[-1].get('time') is not None else None,
+        )
+        # Single assignment: readers see either the old or the new snapshot
+        self._contexts[symbol] = context
+        return context
+
+    def get_context(self, symbol: str) -> Optional[MarketContext]:
+        """Return the symbol's market context if it is fresh enough to use."""
+        if self.context_max_age <= 0:
+            return None
+        context = self._contexts.get(symbol)
+        if context is None or context.age() > self.context_max_age:
+            return None
+        return context
+
+    async def refresh_contexts(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, MarketContext]:
+        """Fetch market data once and rebuild the snapshots for ``symbols``.
+
+        VIX is fetched once for all symbols and prices in bulk when the
+        provider supports it. A symbol whose price fetch fails keeps its
+        previous snapshot until it ages out.
+        """
+        symbols = sorted(symbols if symbols is not None else self.context_symbols)
+        if not symbols:
+            return {}
+        await self._ensure_connected()
+
+        vix_enabled = self.vix_config.get('enabled', True)
+        price_enabled = self.price_config.get('enabled', True)
+        tasks = [self._fetch_vix_data()] if vix_enabled else []
+        if price_enabled:
+            tasks.append(self._fetch_price_data_many(symbols))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        vix_features = None
+        if vix_enabled:
+            vix_result, results = results[0], results[1:]
+            if isinstance(vix_result, Exception):
+                logger.error(f"VIX refresh failed: {vix_result}")
+                # Reuse the last good VIX features for this round
+                vix_features = self._vix_features
+            else:
+                vix_features = self._generate_vix_features(vix_result)
+        if not price_enabled:
+            price_results = [None] * len(symbols)
+        elif isinstance(results[0], Exception):
+            price_results = [results[0]] * len(symbols)
+        else:
+            price_results = results[0]
+
+        refreshed = {}
+        for symbol, price_data in zip(symbols, price_results):
+            if isinstance(price_data, Exception):
+                logger.error(f"Context refresh failed for {symbol}: {price_data}")
+                continue
+            market = self._build_market_features(symbol, price_data, vix_features)
+            if market is not None:
+                refreshed[symbol] = self._store_context(symbol, market, price_data)
+        return refreshed
+
+    def start_context_refresher(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        interval: float = 5.0,
+        max_age: float = 30.0,
+        max_symbols: int = 64,
+    ) -> asyncio.Task:
+        """Refresh contexts every ``interval`` seconds in a background task.
+
+        Requests use a snapshot while it is younger than ``max_age`` and fall
+        back to fetching data themselves otherwise. Symbols seen by requests
+        whose market data loads are added to the refresh set automatically
+        until it holds ``max_symbols``; configured ``symbols`` always are.
+        """
+        self.context_symbols.update(symbols or [])
+        self.max_context_symbols = max_symbols
+        self.context_max_age = max_age
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._context_loop(interval))
+        return self._refresher
+
+    async def stop_context_refresher(self):
+        """Stop the background refresher and stop serving snapshots."""
+        self.context_max_age = 0.0
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _context_loop(self, interval: float):
+        while True:
+            try:
+                await self.refresh_contexts()
+            except Exception as e:  # pragma: no cover - keep refreshing
+                logger.error(f"Market context refresh failed: {e}")
+            await asyncio.sleep(interval)
+
     async def _fetch_price_data(self, symbol: str) -> Dict:
         """Fetch price data for feature generation."""
         await self._ensure_connected()
 
         # Get historical bars for technical indicators
         bars = await self.data_provider.get_price_data(symbol, bars=100)
+        self.indicators.update(symbol, bars)
 
         # Get current price
         current = await self.data_provider.get_current_price(symbol)
@@ -248,6 +521,30 @@ class RealTimeFeatureGenerator:
             'current': current
         }
     
+    async def _fetch_price_data_many(self, symbols: List[str]) -> List:
+        """Fetch price data for ``symbols``, in bulk when the provider supports it.
+
+        Returns one entry per symbol: its price data, or the exception
+        explaining why it is missing.
+        """
+        get_bars = getattr(self.data_provider, 'get_price_data_many', None)
+        get_quotes = getattr(self.data_provider, 'get_current_price_many', None)
+        if get_bars is None or get_quotes is None:
+            return await asyncio.gather(
+                *(self._fetch_price_data(sym) for sym in symbols), return_exceptions=True
+            )
+
+        await self._ensure_connected()
+        bars, quotes = await asyncio.gather(get_bars(symbols, bars=100), get_quotes(symbols))
+        results = []
+        for symbol in symbols:
+            if symbol not in bars or symbol not in quotes:
+                results.append(LookupError(f"No price data for {symbol}"))
+                continue
+            self.indicators.update(symbol, bars[symbol])
+            results.append({'bars': bars[symbol], 'current': quotes[symbol]})
+        return results
+
     async def _fetch_vix_data(self) -> Dict:
         """Fetch VIX data for feature generation."""
         await self._ensure_connected()
@@ -257,6 +554,7 @@ class RealTimeFeatureGenerator:
 
         # Get VIX history for SMA
         vix_bars = await self.data_provider.get_price_data('VIX', bars=30)
+        self.indicators.update('VIX', vix_bars)
         
         return {
             'current': vix_current,
@@ -320,11 +618,6 @@ class RealTimeFeatureGenerator:
             logger.warning(f"Incomplete price data for {symbol}")
             return self._get_default_price_features(symbol)
         
-        # Convert to DataFrame for easier calculation
-        df = pd.DataFrame(bars)
-        df['time'] = pd.to_datetime(df['time'])
-        df.set_index('time', inplace=True)
-
         # Current price with fallback options
         current_price = (
             current.get('last')
@@ -336,38 +629,20 @@ class RealTimeFeatureGenerator:
             return self._get_default_price_features(symbol)
 
         features[f'{symbol}_close'] = current_price
-        
-        # SMA features
-        for period in self.price_config.get('sma_periods', [20]):
-            if len(df) >= period:
-                sma = df['close'].rolling(window=period).mean().iloc[-1]
-                features[f'{symbol}_sma_{period}'] = sma
-        
-        # Momentum
-        for period in self.price_config.get('momentum_periods', [5]):
-            if len(df) >= period:
-                momentum = (current_price - df['close'].iloc[-period]) / df['close'].iloc[-period] * 100
-                features[f'{symbol}_momentum_{period}'] = momentum
-        
-        # Volatility (20-period)
-        if len(df) >= 20:
-            returns = df['close'].pct_change().dropna()
-            volatility = returns.tail(20).std() * math.sqrt(252)  # Annualized
-            features[f'{symbol}_volatility_20'] = volatility
-        
-        # RSI
-        rsi_period = self.price_config.get('rsi_period', 14)
-        if len(df) >= rsi_period + 1:
-            rsi = self._calculate_rsi(df['close'], rsi_period)
-            features[f'{symbol}_rsi'] = rsi
-        
-        # Price position in range
-        if len(df) >= 20:
-            high_20 = df['high'].tail(20).max()
-            low_20 = df['low'].tail(20).min()
-            if high_20 > low_20:
-                price_position = (current_price - low_20) / (high_20 - low_20)
-                features[f'{symbol}_price_position'] = price_position
+
+        # Indicators are maintained incrementally as bars arrive
+        snapshot = self.indicators.snapshot(symbol)
+        if snapshot is None:
+            self.indicators.update(symbol, bars)
+            snapshot = self.indicators.snapshot(symbol) or {}
+
+        names = [f'sma_{p}' for p in self.price_config.get('sma_periods', [20])]
+        names += [f'momentum_{p}' for p in self.price_config.get('momentum_periods', [5])]
+        names += ['volatility_20', 'rsi', 'price_position']
+        for name in names:
+            value = snapshot.get(name)
+            if value is not None:
+                features[f'{symbol}_{name}'] = value
 
         return features
 
@@ -408,9 +683,9 @@ class RealTimeFeatureGenerator:
             features['vix_vix_change'] = 0
         
         # VIX SMA
-        if bars and len(bars) >= self.vix_config.get('sma_period', 20):
-            df = pd.DataFrame(bars)
-            vix_sma = df['close'].tail(20).mean()
+        snapshot = self.indicators.snapshot('VIX') or {}
+        vix_sma = snapshot.get(f"sma_{self.vix_config.get('sma_period', 20)}")
+        if vix_sma is not None:
             features['vix_vix_sma_20'] = vix_sma
         
         # VIX regime
@@ -426,7 +701,8 @@ class RealTimeFeatureGenerator:
 
         for name in ['low', 'normal', 'elevated', 'high']:
             features[f'vix_regime_{name}'] = float(regime == name)
-        
+
+        self._vix_features = features
         return features
     
     def _generate_trade_features(
@@ -518,54 +794,3 @@ class RealTimeFeatureGenerator:
                 features['predictions_aligned'] = float((short_term > price) == (long_term > price))
 
         return features
-    
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """Calculate RSI indicator."""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50.0
-    
-    def _align_features(
-        self,
-        features: Dict[str, float],
-        feature_order: Optional[List[str]] = None,
-    ) -> Tuple[List[float], List[str]]:
-        """
-        Align features with training feature order.
-        
-        Returns:
-            Tuple of (feature_values, feature_names)
-        """
-        if feature_order is None:
-            feature_order = self.feature_order
-        
-        # Extract values in order, using 0 for missing features
-        feature_values = []
-        feature_names = []
-        
-        for feature_name in feature_order:
-            if feature_name in features:
-                feature_values.append(features[feature_name])
-                feature_names.append(feature_name)
-            else:
-                # Handle symbol-specific features
-                if feature_name.startswith('SPX_'):
-                    # Try with actual symbol
-                    symbol = list(features.keys())[0].split('_')[0] if features else 'SPX'
-                    alt_name = feature_name.replace('SPX_', f'{symbol}_')
-                    if alt_name in features:
-                        feature_values.append(features[alt_name])
-                        feature_names.append(alt_name)
-                    else:
-                        feature_values.append(0.0)
-                        feature_names.append(feature_name)
-                else:
-                    feature_values.append(0.0)
-                    feature_names.append(feature_name)
-        
-        return feature_values, feature_names
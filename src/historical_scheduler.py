@@ -0,0 +1,344 @@
+"""Pacing-aware scheduler for IBKR historical data requests.
+
+IBKR rejects historical requests with a pacing violation (error 162) when
+a client sends more than 60 requests in any ten minutes, more than six
+for one contract within two seconds, or repeats an identical request
+within fifteen seconds. A violation then stalls every request for a
+while, including the ones live predictions are waiting on.
+
+:class:`HistoricalRequestScheduler` puts all ``reqHistoricalDataAsync``
+calls behind a token bucket sized to those limits and dispatches them by
+priority, so live requests overtake warmup and backfill. Identical pending
+requests share one upstream call, and identical requests made shortly
+after one completes are answered from its result.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LIVE = 0
+PRIORITY_WARMUP = 1
+PRIORITY_BACKFILL = 2
+
+PACING_ERROR_CODE = 162
+
+
+def _contract_key(contract) -> Tuple:
+    return tuple(
+        getattr(contract, attr, None)
+        for attr in ('conId', 'secType', 'symbol', 'exchange', 'currency')
+    )
+
+
+@dataclass
+class _Request:
+    key: str
+    contract_key: Tuple
+    contract: Any
+    params: Dict[str, Any]
+    priority: int
+    seq: int
+    queued_at: float
+    future: asyncio.Future
+    attempts: int = 0
+    dispatched: bool = False
+
+
+class HistoricalRequestScheduler:
+    """Queue historical data requests and send them within IB's pacing limits.
+
+    Args:
+        ib: ``ib_insync.IB`` (or compatible) used to send requests; may be
+            replaced after a reconnect
+        rate: Sustained requests per second
+        burst: Token bucket capacity. ``burst + rate * 600`` must stay at
+            or below 60 to respect the ten-minute limit.
+        max_per_contract: Requests allowed per contract within
+            ``contract_window`` seconds
+        identical_window: Seconds a completed result answers identical
+            requests
+        max_in_flight: Concurrent outstanding requests
+        pacing_backoff: Seconds to stop sending after a pacing violation
+        max_retries: Times a request rejected for pacing is requeued
+    """
+
+    def __init__(
+        self,
+        ib=None,
+        rate: float = 50 / 600,
+        burst: int = 10,
+        max_per_contract: int = 5,
+        contract_window: float = 2.0,
+        identical_window: float = 15.0,
+        max_in_flight: int = 10,
+        pacing_backoff: float = 15.0,
+        max_retries: int = 1,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_per_contract = max_per_contract
+        self.contract_window = contract_window
+        self.identical_window = identical_window
+        self.max_in_flight = max_in_flight
+        self.pacing_backoff = pacing_backoff
+        self.max_retries = max_retries
+
+        self._ib = None
+        self.ib = ib
+
+        self._heap: List[Tuple[int, int, _Request]] = []
+        self._pending: Dict[str, _Request] = {}
+        self._recent: Dict[str, Tuple[float, Any]] = {}
+        self._sent: Dict[Tuple, Deque[float]] = {}
+        self._seq = itertools.count()
+        self._tokens = float(burst)
+        self._refilled_at: Optional[float] = None
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+
+        self.submitted = 0
+        self.dispatched = 0
+        self.deduplicated = 0
+        self.recent_hits = 0
+        self.violations = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def ib(self):
+        return self._ib
+
+    @ib.setter
+    def ib(self, ib) -> None:
+        """Bind to a (new) connection and listen for pacing errors on it."""
+        if ib is self._ib:
+            return
+        old = getattr(self._ib, 'errorEvent', None)
+        if old is not None:
+            old -= self._on_error
+        self._ib = ib
+        event = getattr(ib, 'errorEvent', None)
+        if event is not None:
+            event += self._on_error
+
+    async def request(self, contract, priority: int = PRIORITY_LIVE, **params) -> Any:
+        """Queue ``reqHistoricalDataAsync(contract, **params)`` and return its bars."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        key = json.dumps([_contract_key(contract), params], sort_keys=True, default=str)
+        self.submitted += 1
+
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > now:
+                self.recent_hits += 1
+                return recent[1]
+            del self._recent[key]
+
+        req = self._pending.get(key)
+        if req is not None:
+            self.deduplicated += 1
+            if priority < req.priority and not req.dispatched:
+                # Promote; the old heap record is skipped when popped
+                req.priority = priority
+                heapq.heappush(self._heap, (priority, req.seq, req))
+        else:
+            req = _Request(
+                key=key,
+                contract_key=_contract_key(contract),
+                contract=contract,
+                params=params,
+                priority=priority,
+                seq=next(self._seq),
+                queued_at=now,
+                future=loop.create_future(),
+            )
+            self._pending[key] = req
+            heapq.heappush(self._heap, (priority, req.seq, req))
+            self._ensure_dispatcher()
+            self._wakeup.set()
+        return await asyncio.shield(req.future)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+    def _on_error(self, req_id, error_code, error_string, contract=None) -> None:
+        if error_code == PACING_ERROR_CODE and 'pacing' in str(error_string).lower():
+            self._pause()
+
+    def _pause(self) -> None:
+        loop = asyncio.get_event_loop()
+        self.violations += 1
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, loop.time() + self.pacing_backoff)
+        logger.warning(f"IB pacing violation; holding historical requests for {self.pacing_backoff:.0f}s")
+
+    def _refill(self, now: float) -> None:
+        if self._refilled_at is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _contract_delay(self, contract_key: Tuple, now: float) -> float:
+        """Seconds until ``contract_key`` may be sent again (0 if now)."""
+        sent = self._sent.get(contract_key)
+        if not sent:
+            return 0.0
+        while sent and sent[0] <= now - self.contract_window:
+            sent.popleft()
+        if len(sent) < self.max_per_contract:
+            return 0.0
+        return sent[0] + self.contract_window - now
+
+    def _take_next(self, now: float) -> Tuple[Optional[_Request], float]:
+        """Pop the highest-priority sendable request, or return how long to wait."""
+        if not self._heap or self._in_flight >= self.max_in_flight:
+            return None, None
+        if now < self._paused_until:
+            return None, self._paused_until - now
+        self._refill(now)
+        if self._tokens < 1:
+            return None, (1 - self._tokens) / self.rate
+
+        held = []
+        found = None
+        delay = None
+        while self._heap:
+            priority, seq, req = heapq.heappop(self._heap)
+            if req.dispatched or priority != req.priority:
+                continue
+            wait = self._contract_delay(req.contract_key, now)
+            if wait <= 0:
+                found = req
+                break
+            held.append((priority, seq, req))
+            delay = wait if delay is None else min(delay, wait)
+        for item in held:
+            heapq.heappush(self._heap, item)
+        return found, delay
+
+    async def _dispatch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            req, delay = self._take_next(loop.time())
+            if req is None:
+                self._wakeup.clear()
+                if delay is None:
+                    await self._wakeup.wait()
+                else:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+
+            now = loop.time()
+            self._tokens -= 1
+            self._sent.setdefault(req.contract_key, deque()).append(now)
+            req.dispatched = True
+            self.dispatched += 1
+            wait = now - req.queued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._in_flight += 1
+            task = loop.create_task(self._run(req))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, req: _Request) -> None:
+        req.attempts += 1
+        violations = self.violations
+        try:
+            result = await self._ib.reqHistoricalDataAsync(req.contract, **req.params)
+        except Exception as e:
+            if 'pacing violation' in str(e).lower():
+                if self.violations == violations:
+                    self._pause()
+                if req.attempts <= self.max_retries:
+                    self._requeue(req)
+                    return
+            self._finish(req, error=e)
+        else:
+            # ib_insync reports pacing violations through errorEvent and
+            # returns an empty result
+            if self.violations != violations and not result and req.attempts <= self.max_retries:
+                self._requeue(req)
+                return
+            self._finish(req, result=result)
+        finally:
+            self._in_flight -= 1
+            self._wakeup.set()
+
+    def _requeue(self, req: _Request) -> None:
+        req.dispatched = False
+        heapq.heappush(self._heap, (req.priority, req.seq, req))
+
+    def _finish(self, req: _Request, result: Any = None, error: Optional[Exception] = None) -> None:
+        self._pending.pop(req.key, None)
+        if req.future.done():
+            return
+        if error is not None:
+            self.failed += 1
+            req.future.set_exception(error)
+            req.future.exception()  # shielded callers may all have gone
+            return
+        if result:
+            loop = asyncio.get_running_loop()
+            self._recent[req.key] = (loop.time() + self.identical_window, result)
+            if len(self._recent) > 1000:
+                now = loop.time()
+                self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+        req.future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop dispatching and cancel queued requests."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for req in self._pending.values():
+            if not req.future.done():
+                req.future.cancel()
+        self._pending.clear()
+        self._heap.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.ib = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, pacing and wait-time counters."""
+        queued: Dict[int, int] = {}
+        for req in self._pending.values():
+            if not req.dispatched:
+                queued[req.priority] = queued.get(req.priority, 0) + 1
+        return {
+            'queued': sum(queued.values()),
+            'queued_by_priority': queued,
+            'in_flight': self._in_flight,
+            'tokens': round(self._tokens, 3),
+            'submitted': self.submitted,
+            'dispatched': self.dispatched,
+            'deduplicated': self.deduplicated,
+            'recent_hits': self.recent_hits,
+            'violations': self.violations,
+            'failed': self.failed,
+            'avg_wait_ms': round(1000 * self.total_wait / self.dispatched, 3) if self.dispatched else 0.0,
+            'max_wait_ms': round(1000 * self.max_wait, 3),
+        }
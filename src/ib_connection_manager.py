@@ -1,8 +1,11 @@
 import logging
 import asyncio
-from typing import Optional
+from typing import Any, Callable, Optional
 from ib_insync import IB
 
+from src.historical_scheduler import HistoricalRequestScheduler
+from src.quote_stream import QuoteStream, make_contract
+
 logger = logging.getLogger(__name__)
 
 class IBConnectionManager:
@@ -16,6 +19,8 @@ class IBConnectionManager:
         self.port = 7497
         self.client_id = 99
         self._lock = asyncio.Lock()
+        self._quotes: Optional[QuoteStream] = None
+        self._history: Optional[HistoricalRequestScheduler] = None
 
     @classmethod
     def instance(cls) -> "IBConnectionManager":
@@ -61,7 +66,37 @@ class IBConnectionManager:
             self.connect(self.host, self.port, self.client_id)
         return self.ib
 
+    def quote_stream(self, contract_factory: Callable[[str], Any] = make_contract) -> QuoteStream:
+        """Return the shared quote stream for the current connection.
+
+        After a reconnect the stream is rebuilt on the new ``IB`` object and
+        the previous symbols are subscribed again.
+        """
+        if self._quotes is None or self._quotes.ib is not self.ib:
+            symbols = []
+            if self._quotes is not None:
+                symbols = self._quotes.symbols
+                self._quotes.close()
+            self._quotes = QuoteStream(self.ib, contract_factory)
+            self._quotes.subscribe_many(symbols)
+        return self._quotes
+
+    def history_scheduler(self, **pacing: Any) -> HistoricalRequestScheduler:
+        """Return the shared historical-data scheduler for this connection.
+
+        IB paces historical requests per client connection, so every
+        provider sharing the connection must share one scheduler.
+        ``pacing`` options only apply when the scheduler is created.
+        """
+        if self._history is None:
+            self._history = HistoricalRequestScheduler(self.ib, **pacing)
+        self._history.ib = self.ib
+        return self._history
+
     def disconnect(self):
+        if self._quotes is not None:
+            self._quotes.close()
+            self._quotes = None
         if self.ib and self.ib.isConnected():
             self.ib.disconnect()
             logger.info("Disconnected from IBKR")
@@ -0,0 +1,134 @@
+"""Bounded executor for CPU-bound work called from async request handlers."""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class InferenceTimeout(TimeoutError):
+    """Raised when a job misses its deadline (queued or running)."""
+
+
+class InferenceOverloaded(RuntimeError):
+    """Raised when too many jobs are already waiting for a slot."""
+
+
+class InferenceExecutor:
+    """Run blocking calls off the event loop with a concurrency cap.
+
+    At most ``max_concurrency`` jobs run at once; further callers wait for a
+    slot, and once ``max_queue`` callers are waiting new jobs are rejected
+    with :class:`InferenceOverloaded`. ``deadline_ms`` bounds the total time
+    a caller waits (queueing plus running) before :class:`InferenceTimeout`.
+
+    A timed-out job cannot be interrupted inside the pool, so its slot is
+    only released when it actually finishes; the cap therefore always
+    reflects the real CPU load.
+
+    Jobs run in threads, which suits XGBoost and NumPy as both release the
+    GIL. A process pool is not offered: scoring jobs are bound methods of
+    the loaded predictor, which would be pickled on every call (and cannot
+    be with a lazy model registry).
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        deadline_ms: Optional[float] = None,
+    ) -> None:
+        if kind == "thread":
+            self._pool: Executor = ThreadPoolExecutor(max_workers, thread_name_prefix="inference")
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.max_queue = max_queue
+        self.deadline_ms = deadline_ms
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, fn: Callable, *args: Any, deadline_ms: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and return its result."""
+        loop = asyncio.get_running_loop()
+        deadline_ms = self.deadline_ms if deadline_ms is None else deadline_ms
+        start = loop.time()
+        expires = start + deadline_ms / 1000 if deadline_ms else None
+
+        if self._slots.locked() and self.max_queue is not None and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise InferenceOverloaded(f"{self.waiting} inference jobs already queued")
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            if expires is None or not self._slots.locked():
+                await self._slots.acquire()
+            else:
+                await asyncio.wait_for(self._slots.acquire(), expires - loop.time())
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise InferenceTimeout(f"No inference slot within {deadline_ms:.0f} ms") from None
+        finally:
+            self.waiting -= 1
+
+        started = loop.time()
+        self.total_wait += started - start
+        self.in_flight += 1
+        future = loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+
+        try:
+            if expires is None:
+                result = await future
+            else:
+                result = await asyncio.wait_for(asyncio.shield(future), max(expires - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise InferenceTimeout(f"Inference exceeded {deadline_ms:.0f} ms deadline") from None
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self.total_run += loop.time() - started
+        return result
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        # Mark errors of abandoned (timed-out) jobs as retrieved
+        if not future.cancelled():
+            future.exception()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth, concurrency and latency counters."""
+        done = self.completed + self.failed
+        return {
+            "kind": self.kind,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait / done, 3) if done else 0.0,
+            "avg_run_ms": round(1000 * self.total_run / self.completed, 3) if self.completed else 0.0,
+        }
@@ -0,0 +1,618 @@
+"""Shared-memory market feed for running the API with several workers.
+
+Every uvicorn worker normally owns a DataManager, i.e. its own IB client,
+companion session and cold cache. With the feed enabled, one feed process
+(``python src/market_feed.py``) owns the upstream connections and
+publishes market data, the recent bars and the market-feature snapshots
+for a fixed set of symbols into a ``multiprocessing.shared_memory``
+segment. Workers attach to the segment and read it directly, with no
+serialization or IPC round trip.
+
+Layout: a header, a JSON block describing the symbols and bar size, an
+append-only table of feature names, and one fixed-size record per symbol
+(plus one for VIX). There is a single writer. Each record and the name
+table are guarded by a seqlock: the writer makes the sequence number odd
+while it writes and even when it is done, and readers copy the record and
+retry if the number was odd or changed during the copy.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import signal
+import time
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEED_NAME = "magic8_market_feed"
+# Set for multi-worker servers: workers must read from the feed and fail
+# rather than open their own upstream connections when it is missing
+FEED_ENV = "MAGIC8_MARKET_FEED"
+VIX = "VIX"
+
+_MAGIC = 0x4D384644  # "M8FD"
+_VERSION = 1
+_HEADER = np.dtype([
+    ("magic", "<u4"),
+    ("version", "<u4"),
+    ("n_slots", "<u4"),
+    ("n_bars", "<u4"),
+    ("max_features", "<u4"),
+    ("meta_len", "<u4"),
+    ("names_len", "<u4"),
+    ("names_seq", "<u8"),
+    ("heartbeat", "<f8"),
+], align=True)
+_HEADER_SIZE = 64
+_META_SIZE = 4096
+_NAMES_SIZE = 16384
+
+# Record scalars; market data fills the first two, VIX quotes the rest
+_SCALARS = ("price", "volatility", "last", "change", "change_pct", "high", "low")
+_BAR_FIELDS = ("time", "open", "high", "low", "close", "volume")
+_SOURCES = ("", "companion", "ibkr", "mock", "redis", "feed")
+
+# Feature names are stored symbol-neutral: "SPY_close" -> "$_close"
+_SYMBOL_PREFIX = "$"
+
+
+def _record_dtype(n_bars: int, max_features: int) -> np.dtype:
+    return np.dtype([
+        ("seq", "<u8"),
+        ("updated", "<f8"),
+        ("source", "<u4"),
+        ("n_bars", "<u4"),
+        ("scalars", "<f8", (len(_SCALARS),)),
+        ("bars", "<f8", (n_bars, len(_BAR_FIELDS))),
+        ("features", "<f8", (max_features,)),
+    ], align=True)
+
+
+def _align(n: int, to: int = 64) -> int:
+    return (n + to - 1) // to * to
+
+
+def _epoch(value: Any) -> float:
+    """Bar time as epoch seconds; naive times are taken as UTC."""
+    import pandas as pd
+
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.value / 1e9
+
+
+def _bar_time(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+# Segments created by this process; their tracker registration is the owner's
+_created: set = set()
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without letting this process's resource
+    tracker unlink it on exit (it belongs to the feed process)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        if shm._name not in _created:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class FeedSnapshot:
+    """Consistent copy of one symbol's record; fields decode on access."""
+
+    def __init__(self, symbol: str, record: np.void, names: List[str]) -> None:
+        self.symbol = symbol
+        self._record = record
+        self._names = names
+
+    @property
+    def updated(self) -> float:
+        return float(self._record["updated"])
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.updated
+
+    @property
+    def market(self) -> Dict[str, Any]:
+        scalars = self._record["scalars"]
+        return {
+            "price": float(scalars[0]),
+            "volatility": float(scalars[1]),
+            "source": _SOURCES[int(self._record["source"])] or "feed",
+        }
+
+    @property
+    def vix(self) -> Dict[str, Any]:
+        scalars = self._record["scalars"]
+        quote = {name: float(scalars[i]) for i, name in enumerate(_SCALARS) if i >= 2}
+        quote["time"] = datetime.fromtimestamp(self.updated).isoformat()
+        return quote
+
+    @property
+    def bars(self) -> List[Dict[str, Any]]:
+        rows = self._record["bars"][: int(self._record["n_bars"])]
+        return [
+            {
+                "time": _bar_time(t),
+                "open": float(o),
+                "high": float(h),
+                "low": float(l),
+                "close": float(c),
+                "volume": int(v),
+            }
+            for t, o, h, l, c, v in rows.tolist()
+        ]
+
+    @property
+    def features(self) -> Dict[str, float]:
+        """Market features under the symbol's own names (absent ones omitted)."""
+        values = self._record["features"]
+        features = {}
+        for i, name in enumerate(self._names):
+            value = float(values[i])
+            if not math.isnan(value):
+                if name.startswith(_SYMBOL_PREFIX):
+                    name = self.symbol + name[len(_SYMBOL_PREFIX):]
+                features[name] = value
+        return features
+
+
+class MarketFeed:
+    """A market-data segment in shared memory.
+
+    Create it with :meth:`create` in the feed process (the only writer) and
+    open it with :meth:`attach` in workers.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self._shm = shm
+        self.owner = owner
+        self.name = shm.name
+        buf = shm.buf
+        self._header = np.ndarray((), dtype=_HEADER, buffer=buf)
+        if int(self._header["magic"]) != _MAGIC or int(self._header["version"]) != _VERSION:
+            raise ValueError(f"{shm.name} is not a version {_VERSION} market feed")
+
+        meta = json.loads(bytes(buf[_HEADER_SIZE:_HEADER_SIZE + int(self._header["meta_len"])]))
+        self.symbols: List[str] = meta["symbols"]
+        self.bar_size: str = meta["bar_size"]
+        self.n_bars = int(self._header["n_bars"])
+        self.max_features = int(self._header["max_features"])
+        self._slot = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        names_at = _HEADER_SIZE + _META_SIZE
+        self._names_buf = buf[names_at:names_at + _NAMES_SIZE]
+        self._records = np.ndarray(
+            (len(self.symbols),),
+            dtype=_record_dtype(self.n_bars, self.max_features),
+            buffer=buf,
+            offset=_align(names_at + _NAMES_SIZE),
+        )
+        self._names: List[str] = []
+        self._names_seq = -1
+        self._name_index: Dict[str, int] = {}
+        self._dropped_names: set = set()
+
+    @classmethod
+    def create(
+        cls,
+        symbols: Iterable[str],
+        name: str = DEFAULT_FEED_NAME,
+        n_bars: int = 100,
+        max_features: int = 128,
+        bar_size: str = "5 mins",
+    ) -> "MarketFeed":
+        """Create (replacing any left-over segment of the same name) and own a feed."""
+        symbols = list(dict.fromkeys([*symbols, VIX]))
+        meta = json.dumps({"symbols": symbols, "bar_size": bar_size}).encode()
+        if len(meta) > _META_SIZE:
+            raise ValueError("Too many symbols for the market feed")
+        offset = _align(_HEADER_SIZE + _META_SIZE + _NAMES_SIZE)
+        size = offset + len(symbols) * _record_dtype(n_bars, max_features).itemsize
+
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.warning(f"Removing stale market feed segment {name}")
+            stale.close()
+            stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(shm._name)
+
+        # New segments are zero-filled
+        header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+        header["magic"] = _MAGIC
+        header["version"] = _VERSION
+        header["n_slots"] = len(symbols)
+        header["n_bars"] = n_bars
+        header["max_features"] = max_features
+        header["meta_len"] = len(meta)
+        shm.buf[_HEADER_SIZE:_HEADER_SIZE + len(meta)] = meta
+        del header
+
+        feed = cls(shm, owner=True)
+        feed._records["features"] = np.nan
+        return feed
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_FEED_NAME) -> "MarketFeed":
+        """Open a feed created by another process (raises FileNotFoundError)."""
+        return cls(_attach_segment(name), owner=False)
+
+    # -- writer --------------------------------------------------------
+
+    def _feature_column(self, name: str) -> Optional[int]:
+        col = self._name_index.get(name)
+        if col is not None:
+            return col
+        if len(self._name_index) >= self.max_features:
+            if name not in self._dropped_names:
+                self._dropped_names.add(name)
+                logger.warning(f"Market feed is full; not publishing feature {name}")
+            return None
+        names = list(self._name_index) + [name]
+        encoded = json.dumps(names).encode()
+        if len(encoded) > _NAMES_SIZE:
+            self._dropped_names.add(name)
+            logger.warning(f"Market feed name table is full; not publishing feature {name}")
+            return None
+
+        header = self._header
+        seq = int(header["names_seq"])
+        header["names_seq"] = seq + 1
+        self._names_buf[:len(encoded)] = encoded
+        header["names_len"] = len(encoded)
+        header["names_seq"] = seq + 2
+        col = self._name_index[name] = len(names) - 1
+        return col
+
+    def publish(
+        self,
+        symbol: str,
+        market: Optional[Mapping[str, Any]] = None,
+        bars: Optional[List[Mapping[str, Any]]] = None,
+        features: Optional[Mapping[str, float]] = None,
+        vix: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """Write the given parts of ``symbol``'s record; others are kept."""
+        if not self.owner:
+            raise RuntimeError("Only the process that created the feed may publish")
+        i = self._slot.get(symbol)
+        if i is None:
+            raise KeyError(f"{symbol} is not in the market feed")
+
+        # Prepare outside the critical section to keep readers' retries short
+        columns = []
+        if features is not None:
+            prefix = f"{symbol}_"
+            for name, value in features.items():
+                stored = _SYMBOL_PREFIX + name[len(symbol):] if name.startswith(prefix) else name
+                col = self._feature_column(stored)
+                if col is not None:
+                    columns.append((col, np.nan if value is None else float(value)))
+        rows = None
+        if bars is not None:
+            rows = np.array(
+                [[_epoch(b["time"])] + [float(b.get(f, 0) or 0) for f in _BAR_FIELDS[1:]]
+                 for b in bars[-self.n_bars:]],
+                dtype=np.float64,
+            ).reshape(-1, len(_BAR_FIELDS))
+
+        record = self._records[i]
+        seq = self._records["seq"]
+        before = int(seq[i])
+        seq[i] = before + 1
+        if market is not None:
+            record["scalars"][0] = market.get("price", 0.0)
+            record["scalars"][1] = market.get("volatility", 0.0)
+            source = market.get("source", "")
+            record["source"] = _SOURCES.index(source) if source in _SOURCES else 0
+        if vix is not None:
+            for j, name in enumerate(_SCALARS[2:], start=2):
+                record["scalars"][j] = vix.get(name, 0.0)
+        if rows is not None:
+            record["bars"][:len(rows)] = rows
+            record["n_bars"] = len(rows)
+        if features is not None:
+            record["features"][:] = np.nan
+            for col, value in columns:
+                record["features"][col] = value
+        record["updated"] = time.time()
+        seq[i] = before + 2
+
+    def heartbeat(self) -> None:
+        self._header["heartbeat"] = time.time()
+
+    # -- reader --------------------------------------------------------
+
+    def _read_names(self) -> List[str]:
+        header = self._header
+        for _ in range(1000):
+            seq = int(header["names_seq"])
+            if seq == self._names_seq:
+                return self._names
+            if seq & 1:
+                continue
+            raw = bytes(self._names_buf[:int(header["names_len"])])
+            if int(header["names_seq"]) == seq:
+                self._names = json.loads(raw) if raw else []
+                self._names_seq = seq
+                return self._names
+        return self._names
+
+    def read(self, symbol: str, max_age: Optional[float] = None) -> Optional[FeedSnapshot]:
+        """Consistent snapshot of ``symbol``, or None if absent, never
+        written, older than ``max_age`` seconds or being rewritten
+        continuously."""
+        i = self._slot.get(symbol)
+        if i is None:
+            return None
+        seq = self._records["seq"]
+        for _ in range(1000):
+            before = int(seq[i])
+            if before & 1:
+                continue
+            record = self._records[i].copy()
+            if int(seq[i]) == before:
+                break
+        else:
+            return None
+        if before == 0 or (max_age is not None and time.time() - float(record["updated"]) > max_age):
+            return None
+        return FeedSnapshot(symbol, record, self._read_names())
+
+    def age(self) -> Optional[float]:
+        """Seconds since the writer's last heartbeat (None before the first)."""
+        beat = float(self._header["heartbeat"])
+        return None if beat == 0 else time.time() - beat
+
+    def close(self) -> None:
+        # Views into the buffer must go before the mapping can be closed
+        self._names_buf.release()
+        self._header = self._records = self._names_buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self._shm._name)
+
+
+class MarketFeedPublisher:
+    """Refresh the feed's symbols from a DataManager and feature generator."""
+
+    def __init__(self, feed: MarketFeed, manager, feature_gen, interval: float = 1.0) -> None:
+        self.feed = feed
+        self.manager = manager
+        self.feature_gen = feature_gen
+        self.interval = interval
+        self.symbols = [s for s in feed.symbols if s != VIX]
+        self.cycles = 0
+
+    async def publish_once(self) -> None:
+        markets, bars, vix = await asyncio.gather(
+            self.manager.get_market_data_many(self.symbols),
+            self.manager.get_price_data_many(self.symbols, bars=self.feed.n_bars, interval=self.feed.bar_size),
+            self.manager.get_vix_data(),
+        )
+        # Served from the manager's cache warmed above
+        contexts = await self.feature_gen.refresh_contexts(self.symbols)
+        for symbol in self.symbols:
+            context = contexts.get(symbol)
+            self.feed.publish(
+                symbol,
+                market=markets.get(symbol),
+                bars=bars.get(symbol) or None,
+                features=context.features if context is not None else None,
+            )
+        self.feed.publish(VIX, market={"price": vix.get("last", 0.0), "source": ""}, vix=vix)
+        self.feed.heartbeat()
+        self.cycles += 1
+
+    async def run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.publish_once()
+            except Exception as e:  # pragma: no cover - keep publishing
+                logger.error(f"Market feed refresh failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+class FeedDataManager:
+    """DataManager interface served from a :class:`MarketFeed`.
+
+    Symbols missing from the feed, or whose record is older than
+    ``max_age`` seconds, are read through ``fallback`` (a DataManager
+    configured without an IB connection). When the feed process stops
+    heartbeating the segment is re-attached, since a restarted feed
+    creates a new one.
+    """
+
+    def __init__(self, feed: MarketFeed, fallback, max_age: float = 10.0) -> None:
+        self.feed = feed
+        self.fallback = fallback
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.reattaches = 0
+        self._reattach_at = 0.0
+
+    async def connect(self) -> bool:
+        return await self.fallback.connect()
+
+    async def disconnect(self):
+        await self.fallback.disconnect()
+        self.feed.close()
+
+    async def is_connected(self) -> bool:
+        return True
+
+    def _reattach(self) -> None:
+        age = self.feed.age()
+        now = time.monotonic()
+        if (age is not None and age <= self.max_age) or now < self._reattach_at:
+            return
+        self._reattach_at = now + self.max_age
+        try:
+            feed = MarketFeed.attach(self.feed.name)
+        except (FileNotFoundError, ValueError):
+            return
+        if feed.age() is not None and feed.age() <= self.max_age:
+            old, self.feed = self.feed, feed
+            old.close()
+            self.reattaches += 1
+            logger.info("Re-attached to restarted market feed %s", feed.name)
+        else:
+            feed.close()
+
+    def _snapshots(self, symbols: Iterable[str]) -> Dict[str, FeedSnapshot]:
+        self._reattach()
+        found = {}
+        for symbol in symbols:
+            snapshot = self.feed.read(symbol, self.max_age)
+            if snapshot is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                found[symbol] = snapshot
+        return found
+
+    def get_market_features(self, symbol: str) -> Optional[Dict[str, float]]:
+        """The feed's market-feature snapshot for ``symbol``, if fresh."""
+        snapshot = self._snapshots([symbol]).get(symbol)
+        features = snapshot.features if snapshot is not None else None
+        return features or None
+
+    async def get_market_data(self, symbol: str, **kwargs) -> Dict[str, Any]:
+        return (await self.get_market_data_many([symbol], **kwargs))[symbol]
+
+    async def get_market_data_many(self, symbols: List[str], **kwargs) -> Dict[str, Dict[str, Any]]:
+        symbols = list(dict.fromkeys(symbols))
+        result = {s: snap.market for s, snap in self._snapshots(symbols).items()}
+        missing = [s for s in symbols if s not in result]
+        if missing:
+            result.update(await self.fallback.get_market_data_many(missing, **kwargs))
+        return {s: result[s] for s in symbols}
+
+    async def get_current_price(self, symbol: str) -> Dict[str, Any]:
+        return await self.get_market_data(symbol)
+
+    async def get_current_price_many(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await self.get_market_data_many(symbols)
+
+    async def get_price_data(
+        self, symbol: str, bars: int = 100, interval: str = "5 mins", **kwargs
+    ) -> Optional[list]:
+        return (await self.get_price_data_many([symbol], bars, interval, **kwargs))[symbol]
+
+    async def get_price_data_many(
+        self, symbols: List[str], bars: int = 100, interval: str = "5 mins", **kwargs
+    ) -> Dict[str, list]:
+        symbols = list(dict.fromkeys(symbols))
+        result = {}
+        if interval == self.feed.bar_size and bars <= self.feed.n_bars:
+            for symbol, snapshot in self._snapshots(symbols).items():
+                stored = snapshot.bars
+                if len(stored) >= bars:
+                    result[symbol] = stored[-bars:]
+        missing = [s for s in symbols if s not in result]
+        if missing:
+            result.update(await self.fallback.get_price_data_many(missing, bars, interval, **kwargs))
+        return {s: result[s] for s in symbols}
+
+    async def get_vix_data(self) -> Dict[str, Any]:
+        snapshot = self._snapshots([VIX]).get(VIX)
+        if snapshot is not None:
+            return snapshot.vix
+        return await self.fallback.get_vix_data()
+
+    async def warm_cache(self, symbols: List[str]):
+        """The feed process keeps its symbols warm; nothing to do here."""
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        age = self.feed.age()
+        return {
+            "feed": {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reattaches": self.reattaches,
+                "heartbeat_age": round(age, 3) if age is not None else None,
+            },
+            **self.fallback.stats(),
+        }
+
+
+def feed_symbols(cfg: Dict[str, Any]) -> List[str]:
+    """Symbols to publish: ``market_feed.symbols`` or the symbol models."""
+    feed_cfg = cfg.get("performance", {}).get("market_feed", {})
+    return feed_cfg.get("symbols") or [
+        k for k in (cfg.get("models") or {}) if k != "default" and "_" not in k
+    ]
+
+
+async def run_feed(cfg: Dict[str, Any]) -> None:
+    """Own the upstream connections and keep the shared feed fresh."""
+    from data_manager import DataManager
+    from feature_engineering.real_time_features import RealTimeFeatureGenerator
+
+    feed_cfg = cfg.get("performance", {}).get("market_feed", {})
+    perf_cfg = cfg.get("performance", {}).get("cache", {})
+    feed = MarketFeed.create(
+        feed_symbols(cfg),
+        name=feed_cfg.get("name", DEFAULT_FEED_NAME),
+        n_bars=feed_cfg.get("n_bars", 100),
+        max_features=feed_cfg.get("max_features", 128),
+    )
+    manager = DataManager({**cfg.get("data_source", {}), "performance": {"cache": perf_cfg}})
+    await manager.connect()
+    feature_gen = RealTimeFeatureGenerator(manager)
+    publisher = MarketFeedPublisher(feed, manager, feature_gen, feed_cfg.get("interval", 1.0))
+    logger.info(f"Publishing {len(publisher.symbols)} symbols to shared memory {feed.name}")
+
+    task = asyncio.ensure_future(publisher.run())
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await manager.disconnect()
+        feed.close()
+        feed.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import yaml
+
+    parser = argparse.ArgumentParser(description="Run the shared-memory market feed")
+    parser.add_argument("--config", default="config/config.yaml")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    with open(args.config) as f:
+        cfg = yaml.safe_load(f)
+    try:
+        asyncio.run(run_feed(cfg))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
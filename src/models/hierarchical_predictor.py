@@ -2,15 +2,33 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
 import joblib
 import xgboost as xgb
-from typing import Dict
+from typing import Dict, Iterable, Tuple
 import logging
 import numpy as np
 
+from .model_registry import LazyModel, LazyModelRegistry
+from .model_wrappers import NativeBoosterModel, native_parity
+
 logger = logging.getLogger(__name__)
 
+STRATEGIES = ["Butterfly", "Iron Condor", "Vertical", "Sonar"]
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Precomputed routing entry for one symbol/strategy pair."""
+
+    key: str
+    level: str
+    model_key: str
+    model: object
+    n_features: int | None
+    columns: slice
+
 
 class HierarchicalPredictor:
     """Predict using symbol-strategy models with fallbacks."""
@@ -21,13 +39,33 @@ class HierarchicalPredictor:
         symbol_paths: Dict[str, str] | None = None,
         strategy_paths: Dict[str, str] | None = None,
         default_path: str | None = None,
+        native: bool = False,
+        parity_check: bool = False,
+        parity_tolerance: float = 1e-5,
+        lazy: bool = False,
+        memory_budget: int | None = None,
     ) -> None:
+        """
+        Args:
+            native: Serve raw boosters via ``inplace_predict`` instead of
+                the pickled model objects
+            parity_check: When ``native``, compare each native booster with
+                its pickled model on random rows and keep the pickled model
+                if they disagree
+            parity_tolerance: Maximum allowed absolute probability difference
+            lazy: Load symbol-strategy models on first use through a
+                :class:`LazyModelRegistry` instead of at construction
+            memory_budget: With ``lazy``, bytes of symbol-strategy models
+                kept loaded before the least recently used are evicted
+        """
         self.symbol_strategy_models: Dict[str, object] = {}
         self.symbol_models: Dict[str, object] = {}
         self.strategy_models: Dict[str, object] = {}
         self.default_model = None
+        self.native = native
+        self.parity: Dict[str, float] = {}
 
-        def _load(path: str):
+        def _load_pickled(path: str):
             p = Path(path)
             if p.suffix == ".json":
                 booster = xgb.Booster()
@@ -40,7 +78,32 @@ class HierarchicalPredictor:
             except Exception:
                 return joblib.load(p)
 
-        if symbol_strategy_paths:
+        def _load(path: str):
+            if not native:
+                return _load_pickled(path)
+            native_model = NativeBoosterModel.load(path)
+            if not parity_check:
+                return native_model
+            pickled = _load_pickled(path)
+            diff = native_parity(pickled, native_model)
+            self.parity[path] = diff
+            if diff > parity_tolerance:
+                logger.error(
+                    "Native booster for %s differs from pickled model by %.2e; using pickled model",
+                    path,
+                    diff,
+                )
+                return pickled
+            return native_model
+
+        if symbol_strategy_paths and lazy:
+            self.symbol_strategy_models = LazyModelRegistry(
+                {k: p for k, p in symbol_strategy_paths.items() if p and Path(p).exists()},
+                _load,
+                memory_budget=memory_budget,
+                features_of=self._expected_features,
+            )
+        elif symbol_strategy_paths:
             for key, p in symbol_strategy_paths.items():
                 if p and Path(p).exists():
                     self.symbol_strategy_models[key] = _load(p)
@@ -58,49 +121,148 @@ class HierarchicalPredictor:
         if default_path and Path(default_path).exists():
             self.default_model = _load(default_path)
 
-    def predict_proba(self, symbol: str, strategy: str, features):
-        """Return probability using available models with fallback."""
+        self._routes: Dict[Tuple[str, str], ModelRoute] = {}
+        self._symbols: set[str] = set()
+        self._strategies: set[str] = set()
+        self._warned: set[str] = set()
+        self.compile()
+
+    @staticmethod
+    def _expected_features(model) -> int | None:
+        if isinstance(model, LazyModel):
+            return model.n_features
+        if hasattr(model, "n_features_in_"):
+            return int(model.n_features_in_)
+        if hasattr(model, "get_booster"):
+            num = model.get_booster().attr("num_feature")
+            if num is not None:
+                return int(num)
+        return None
+
+    def _build_route(self, symbol: str, strategy: str, load: bool = True) -> ModelRoute | None:
         key = f"{symbol}_{strategy}"
 
-        def _align(model, feats: np.ndarray) -> np.ndarray:
-            expected = None
-            if hasattr(model, "n_features_in_"):
-                expected = int(model.n_features_in_)
-            elif hasattr(model, "get_booster"):
-                booster = model.get_booster()
-                num = booster.attr("num_feature")
-                if num is not None:
-                    expected = int(num)
-
-            if expected is None:
-                return feats
-
-            current = feats.shape[1]
-            if current > expected:
+        if key in self.symbol_strategy_models:
+            level, model_key, model = "symbol_strategy", key, self.symbol_strategy_models[key]
+        elif symbol in self.symbol_models:
+            level, model_key, model = "symbol", symbol, self.symbol_models[symbol]
+        elif strategy in self.strategy_models:
+            level, model_key, model = "strategy", strategy, self.strategy_models[strategy]
+        elif self.default_model:
+            level, model_key, model = "default", "default", self.default_model
+        else:
+            raise ValueError(f"No model available for {symbol} {strategy}")
+
+        if not load and isinstance(model, LazyModel) and not model.resolved:
+            return None
+        n_features = self._expected_features(model)
+        return ModelRoute(key, level, model_key, model, n_features, slice(0, n_features))
+
+    def compile(
+        self,
+        symbols: Iterable[str] | None = None,
+        strategies: Iterable[str] | None = None,
+    ) -> None:
+        """Precompute routes for every known symbol/strategy pair.
+
+        Must be called again after the model dictionaries are modified.
+        Pairs of the known symbols and strategies not covered here (lazily
+        loaded models never used so far) are routed and memoized on first
+        use; any other pair is routed on every call, so request input
+        cannot grow the memo.
+        """
+        self._routes = {}
+        self._warned = set()
+
+        symbols = set(symbols or ())
+        strategies = set(strategies or STRATEGIES)
+        symbols.update(self.symbol_models)
+        strategies.update(self.strategy_models)
+        for key in self.symbol_strategy_models:
+            sym, _, strat = key.partition("_")
+            symbols.add(sym)
+            strategies.add(strat)
+
+        for symbol in symbols:
+            for strategy in strategies:
+                try:
+                    route = self._build_route(symbol, strategy, load=False)
+                except ValueError:
+                    continue
+                if route is not None:
+                    self._routes[(symbol, strategy)] = route
+        self._symbols, self._strategies = symbols, strategies
+
+    def route(self, symbol: str, strategy: str) -> ModelRoute:
+        """Return the precomputed route for ``symbol``/``strategy``."""
+        route = self._routes.get((symbol, strategy))
+        if route is None:
+            route = self._build_route(symbol, strategy)
+            if symbol in self._symbols and strategy in self._strategies:
+                self._routes[(symbol, strategy)] = route
+        return route
+
+    def describe(self) -> Dict[str, Dict[str, object]]:
+        """Return which model level each compiled pair falls back to."""
+        return {
+            route.key: {
+                "level": route.level,
+                "model": route.model_key,
+                "n_features": route.n_features,
+            }
+            for route in sorted(self._routes.values(), key=lambda r: r.key)
+        }
+
+    def _select(self, route: ModelRoute, feats: np.ndarray) -> np.ndarray:
+        if route.n_features is None:
+            return feats
+
+        current = feats.shape[1]
+        if current > route.n_features:
+            # Once per model: unknown pairs falling back to it share the warning
+            if route.model_key not in self._warned:
+                self._warned.add(route.model_key)
                 logger.warning(
-                    f"Feature mismatch for {key}: model expects {expected}, got {current}. Using first {expected} features."
-                )
-                return feats[:, :expected]
-            if current < expected:
-                raise ValueError(
-                    f"Model for {key} expects {expected} features, got {current}"
+                    f"Feature mismatch for {route.key}: model expects {route.n_features}, got {current}. "
+                    f"Using first {route.n_features} features."
                 )
-            return feats
+            return feats[:, route.columns]
+        if current < route.n_features:
+            raise ValueError(
+                f"Model for {route.key} expects {route.n_features} features, got {current}"
+            )
+        return feats
 
-        if key in self.symbol_strategy_models:
-            aligned = _align(self.symbol_strategy_models[key], features)
-            return self.symbol_strategy_models[key].predict_proba(aligned)
+    def predict_proba(self, symbol: str, strategy: str, features):
+        """Return probability using available models with fallback."""
+        route = self.route(symbol, strategy)
+        return route.model.predict_proba(self._select(route, np.asarray(features)))
+
+    def predict_proba_batch(self, symbols, strategies, features) -> np.ndarray:
+        """Score many rows, calling each resolved model once.
+
+        Rows are grouped by the model :meth:`predict_proba` would pick for
+        their symbol/strategy pair, so a batch spanning several symbols
+        costs one ``predict_proba`` call per distinct model.
 
-        if symbol in self.symbol_models:
-            aligned = _align(self.symbol_models[symbol], features)
-            return self.symbol_models[symbol].predict_proba(aligned)
+        Args:
+            symbols: Symbol for each row
+            strategies: Strategy for each row
+            features: 2D array of feature rows, one per symbol/strategy
 
-        if strategy in self.strategy_models:
-            aligned = _align(self.strategy_models[strategy], features)
-            return self.strategy_models[strategy].predict_proba(aligned)
+        Returns:
+            Array of shape ``(n_rows, 2)`` in the input row order
+        """
+        X = np.asarray(features)
+        if len(symbols) != len(X) or len(strategies) != len(X):
+            raise ValueError("symbols, strategies and features must have the same length")
 
-        if self.default_model:
-            aligned = _align(self.default_model, features)
-            return self.default_model.predict_proba(aligned)
+        groups: Dict[int, list] = {}
+        for i, (symbol, strategy) in enumerate(zip(symbols, strategies)):
+            route = self.route(symbol, strategy)
+            groups.setdefault(id(route.model), [route, []])[1].append(i)
 
-        raise ValueError(f"No model available for {symbol} {strategy}")
+        proba = np.zeros((len(X), 2), dtype=float)
+        for route, rows in groups.values():
+            proba[rows] = np.asarray(route.model.predict_proba(self._select(route, X[rows])), dtype=float)
+        return proba
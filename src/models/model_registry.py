@@ -0,0 +1,222 @@
+"""On-demand model loading with an LRU memory budget."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModel:
+    """Routable stand-in for a registry model, loaded on first use.
+
+    Routes keep the proxy rather than the model, so evicting the model from
+    the registry actually frees it.
+    """
+
+    def __init__(self, registry: "LazyModelRegistry", key: str) -> None:
+        self.registry = registry
+        self.key = key
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the feature count is known without loading the model."""
+        return self.key in self.registry.n_features
+
+    @property
+    def n_features(self) -> int | None:
+        """Feature count of the model, loading it the first time."""
+        if not self.resolved:
+            self.registry.get(self.key)
+        return self.registry.n_features.get(self.key)
+
+    def predict_proba(self, X):
+        return self.registry.get(self.key).predict_proba(X)
+
+    def __repr__(self) -> str:
+        return f"LazyModel({self.key!r})"
+
+
+class LazyModelRegistry(Mapping[str, LazyModel]):
+    """Models loaded from ``paths`` on first use and evicted least recently used.
+
+    Indexing returns a :class:`LazyModel` for any known key without touching
+    the disk; :meth:`get` returns the loaded model. Loaded models are kept
+    while their combined size stays within ``memory_budget`` bytes, sized by
+    their file on disk. The most recently loaded model is never evicted, so a
+    single model larger than the budget still serves.
+
+    Args:
+        paths: Model key to file path
+        loader: Loads one model from its path
+        memory_budget: Maximum bytes of loaded models (``None`` = unbounded)
+        features_of: Returns the feature count of a loaded model; it is
+            remembered after eviction so routes stay valid
+    """
+
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        loader: Callable[[str], Any],
+        memory_budget: Optional[int] = None,
+        features_of: Optional[Callable[[Any], int | None]] = None,
+    ) -> None:
+        self.paths = dict(paths)
+        self.loader = loader
+        self.memory_budget = memory_budget
+        self.features_of = features_of or (lambda model: None)
+        self.n_features: Dict[str, int | None] = {}
+        self._proxies = {key: LazyModel(self, key) for key in self.paths}
+        self._loaded: "OrderedDict[str, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+
+        self.nbytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds: Dict[str, float] = {}
+        self.total_load_seconds = 0.0
+
+    def __getitem__(self, key: str) -> LazyModel:
+        return self._proxies[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def loaded(self) -> List[str]:
+        """Keys currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def get(self, key: str):
+        """Return the loaded model for ``key``, loading it if needed."""
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                self._loaded.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Concurrent misses for one key wait for a single load
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(key)
+                if entry is not None:
+                    self._loaded.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+            path = self.paths[key]
+            start = time.perf_counter()
+            model = self.loader(path)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path)
+            n_features = self.features_of(model)
+            with self._lock:
+                self._loaded[key] = (model, size)
+                self.nbytes += size
+                self.n_features[key] = n_features
+                self.loads += 1
+                self.load_seconds[key] = elapsed
+                self.total_load_seconds += elapsed
+                self._evict()
+        logger.info("Loaded model %s in %.1f ms", key, elapsed * 1000)
+        return model
+
+    def _evict(self) -> None:
+        if self.memory_budget is None:
+            return
+        while self.nbytes > self.memory_budget and len(self._loaded) > 1:
+            key, (_, size) = self._loaded.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+            logger.debug("Evicted model %s (%d bytes)", key, size)
+
+    def preload(self, keys: Iterable[str]) -> int:
+        """Load ``keys`` in order until the budget is full; return the count.
+
+        Unlike on-demand loads, preloading stops instead of evicting, so the
+        first keys (the most used ones) stay resident.
+        """
+        count = 0
+        for key in keys:
+            if self._stop.is_set():
+                break
+            if key not in self.paths:
+                continue
+            size = os.path.getsize(self.paths[key])
+            if self.memory_budget is not None and key not in self._loaded:
+                if self.nbytes + size > self.memory_budget:
+                    break
+            try:
+                self.get(key)
+            except Exception as e:
+                logger.warning("Could not preload model %s: %s", key, e)
+                continue
+            count += 1
+        return count
+
+    def start_preload(self, keys: Iterable[str]) -> threading.Thread:
+        """Run :meth:`preload` in a daemon thread."""
+        keys = list(keys)
+
+        def run():
+            start = time.perf_counter()
+            count = self.preload(keys)
+            logger.info("Preloaded %d/%d models in %.2fs", count, len(keys), time.perf_counter() - start)
+
+        thread = threading.Thread(target=run, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """Stop a running preload after its current model."""
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            slowest = max(self.load_seconds.items(), key=lambda kv: kv[1], default=(None, 0.0))
+            return {
+                "available": len(self.paths),
+                "loaded": len(self._loaded),
+                "bytes": self.nbytes,
+                "memory_budget": self.memory_budget,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "avg_load_ms": round(self.total_load_seconds / self.loads * 1000, 2) if self.loads else 0.0,
+                "slowest_load": {"model": slowest[0], "ms": round(slowest[1] * 1000, 2)},
+            }
+
+
+def pairs_from_prediction_log(path: str, day: Optional[date] = None) -> List[str]:
+    """``SYMBOL_Strategy`` keys predicted on ``day`` (default today), most frequent first."""
+    prefix = (day or date.today()).isoformat()
+    counts: Counter = Counter()
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not str(entry.get("timestamp", "")).startswith(prefix):
+                    continue
+                symbol, strategy = entry.get("symbol"), entry.get("strategy")
+                if symbol and strategy:
+                    counts[f"{symbol}_{strategy}"] += 1
+    except FileNotFoundError:
+        return []
+    return [key for key, _ in counts.most_common()]
@@ -38,3 +38,80 @@ class XGBoostModelWrapper:
     def get_score(self, importance_type='gain'):
         """Get feature importance scores."""
         return self.booster.get_score(importance_type=importance_type)
+
+
+class NativeBoosterModel:
+    """Serve a raw XGBoost booster through ``inplace_predict``.
+
+    Skips the scikit-learn wrapper and DMatrix construction: rows are
+    converted once to a contiguous float32 array and handed straight to
+    the booster, which is where single-row latency goes otherwise.
+    """
+
+    def __init__(self, booster: xgb.Booster):
+        self.booster = booster
+        self.n_features_in_ = booster.num_features()
+        self.version = "native"
+
+    @classmethod
+    def from_model(cls, model) -> "NativeBoosterModel":
+        """Build from a Booster, sklearn XGBClassifier or XGBoostModelWrapper."""
+        if isinstance(model, cls):
+            return model
+        if isinstance(model, xgb.Booster):
+            return cls(model)
+        if hasattr(model, "get_booster"):
+            return cls(model.get_booster())
+        raise TypeError(f"Cannot build a native booster from {type(model).__name__}")
+
+    @classmethod
+    def load(cls, path: str) -> "NativeBoosterModel":
+        """Load from a native ``.json``/``.ubj`` file or a pickled model.
+
+        For ``foo.pkl`` an existing ``foo.json`` written by
+        ``convert_models_to_native.py`` is preferred.
+        """
+        import joblib
+        from pathlib import Path
+
+        p = Path(path)
+        native_path = p if p.suffix in {".json", ".ubj"} else p.with_suffix(".json")
+        if native_path.exists():
+            booster = xgb.Booster()
+            booster.load_model(str(native_path))
+            return cls(booster)
+        return cls.from_model(joblib.load(p))
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Return the positive-class probability for each row."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return self.booster.inplace_predict(X, validate_features=False)
+
+    def predict_proba(self, X):
+        """Predict probabilities in scikit-learn format."""
+        proba_pos = self.predict_positive(X)
+        return np.column_stack([1 - proba_pos, proba_pos])
+
+    def predict(self, X):
+        """Predict classes."""
+        return (self.predict_positive(X) > 0.5).astype(int)
+
+    def get_booster(self):
+        """Get the underlying XGBoost booster."""
+        return self.booster
+
+
+def reference_proba(model, X) -> np.ndarray:
+    """Positive-class probabilities via the model's own (pickled) API."""
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X))[:, 1]
+    return model.predict(xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=model.feature_names))
+
+
+def native_parity(model, native: NativeBoosterModel, n_rows: int = 64, seed: int = 0) -> float:
+    """Return the max absolute probability difference on random rows."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, native.n_features_in_)).astype(np.float32)
+    return float(np.max(np.abs(reference_proba(model, X) - native.predict_positive(X))))
@@ -34,6 +34,7 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 
 # Import the model wrapper
 from .model_wrappers import XGBoostModelWrapper
+from ..data.dataset_store import read_split
 
 class XGBoostBaseline:
     def __init__(self, config_path=None):
@@ -85,9 +86,9 @@ class XGBoostBaseline:
         self.logger.info(f"Loading data from {data_dir}")
 
         # Load train, validation, and test data
-        self.train_df = pd.read_csv(data_dir / 'train_data.csv')
-        self.val_df = pd.read_csv(data_dir / 'val_data.csv')
-        self.test_df = pd.read_csv(data_dir / 'test_data.csv')
+        self.train_df = read_split(data_dir, 'train')
+        self.val_df = read_split(data_dir, 'val')
+        self.test_df = read_split(data_dir, 'test')
         
         # Load feature info
         with open(data_dir / 'feature_info.json', 'r') as f:
@@ -8,6 +8,8 @@ import json
 import numpy as np
 from sklearn.model_selection import train_test_split
 
+from src.data.dataset_store import dataset_symbols, is_dataset, read_trades
+
 
 def prepare_symbol_data(df: pd.DataFrame):
     """Prepare raw symbol data for training."""
@@ -78,12 +80,23 @@ def prepare_symbol_data(df: pd.DataFrame):
     return df, all_features
 
 
-def train_symbol_model(csv_path: Path, model_dir: Path, features: list = None, target: str = "target"):
-    """Train a symbol-specific model handling raw data."""
-    print(f"\nTraining model for {csv_path.stem}...")
-    
-    # Load data
-    df = pd.read_csv(csv_path, low_memory=False)
+def train_symbol_model(csv_path: Path, model_dir: Path, features: list = None, target: str = "target",
+                       symbol: str = None):
+    """Train a symbol-specific model handling raw data.
+
+    ``csv_path`` may be a symbol CSV or a partitioned Parquet dataset; for a
+    dataset ``symbol`` selects the partition to train on.
+    """
+    csv_path = Path(csv_path)
+    name = f"{symbol}_trades" if symbol else csv_path.stem
+    df = read_trades(csv_path, symbols=[symbol] if symbol else None)
+    return train_model_from_frame(df, name, model_dir, features, target)
+
+
+def train_model_from_frame(df: pd.DataFrame, name: str, model_dir: Path, features: list = None,
+                           target: str = "target"):
+    """Train and save a model named ``name`` from already loaded trades."""
+    print(f"\nTraining model for {name}...")
     
     # Prepare data and get available features
     df, available_features = prepare_symbol_data(df)
@@ -168,8 +181,8 @@ def train_symbol_model(csv_path: Path, model_dir: Path, features: list = None, t
     
     # Save model and feature list
     model_dir.mkdir(parents=True, exist_ok=True)
-    model_path = model_dir / f"{csv_path.stem}_model.json"
-    features_path = model_dir / f"{csv_path.stem}_features.pkl"
+    model_path = model_dir / f"{name}_model.json"
+    features_path = model_dir / f"{name}_features.pkl"
 
     booster = model if isinstance(model, xgb.Booster) else model.get_booster()
     booster.save_model(str(model_path))
@@ -197,6 +210,19 @@ def train_all_models(data_dir: str, output_dir: str, feature_info: Path = None):
         except Exception as e:
             print(f"Warning: Could not load feature_info: {e}")
     
+    if is_dataset(data_dir):
+        symbols = dataset_symbols(data_dir)
+        print(f"Found {len(symbols)} symbols in dataset")
+        for symbol in symbols:
+            try:
+                train_symbol_model(data_dir, output_dir, features, symbol=symbol)
+                print(f"✓ Successfully trained model for {symbol}")
+            except Exception as e:
+                print(f"✗ Error training model for {symbol}: {e}")
+                import traceback
+                traceback.print_exc()
+        return
+
     # Train model for each symbol CSV
     csv_files = list(data_dir.glob("*_trades.csv"))
     print(f"Found {len(csv_files)} symbol files to process")
@@ -217,16 +243,10 @@ def train_grouped_model(csv_paths: list[Path], model_dir: Path, group_name: str,
     # Ensure output directory exists
     model_dir.mkdir(parents=True, exist_ok=True)
     
-    df_list = [pd.read_csv(p, low_memory=False) for p in csv_paths]
+    df_list = [read_trades(p) for p in csv_paths]
     df = pd.concat(df_list, ignore_index=True)
-    tmp_file = model_dir / f"{group_name}_combined.csv"
-    df.to_csv(tmp_file, index=False)
-    try:
-        train_symbol_model(tmp_file, model_dir, features)
-        print(f"✓ Grouped model trained for {group_name}")
-    finally:
-        if tmp_file.exists():
-            tmp_file.unlink()
+    train_model_from_frame(df, f"{group_name}_combined", model_dir, features)
+    print(f"✓ Grouped model trained for {group_name}")
 
 
 def train_grouped_models(groups: dict[str, list[str]], data_dir: str, output_dir: str, feature_info: Path | None = None):
@@ -244,6 +264,15 @@ def train_grouped_models(groups: dict[str, list[str]], data_dir: str, output_dir
             print(f"Warning: Could not load feature_info: {e}")
 
     for group, symbols in groups.items():
+        if is_dataset(data_dir):
+            df = read_trades(data_dir, symbols=symbols)
+            if df.empty:
+                print(f"No data for group {group} ({symbols})")
+                continue
+            output_dir.mkdir(parents=True, exist_ok=True)
+            train_model_from_frame(df, f"{group}_combined", output_dir, features)
+            print(f"✓ Grouped model trained for {group}")
+            continue
         csv_paths = [data_dir / f"{sym}_trades.csv" for sym in symbols]
         csv_paths = [p for p in csv_paths if p.exists()]
         if not csv_paths:
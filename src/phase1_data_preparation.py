@@ -14,7 +14,6 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
-import ta
 from sklearn.preprocessing import StandardScaler
 import json
 import os
@@ -24,6 +23,8 @@ import time
 
 from src.feature_engineering.magic8_features import Magic8FeatureEngineer, SymbolNormalizer
 from src.feature_engineering.delta_features import DeltaFeatureGenerator
+from src.feature_engineering.indicators import add_price_indicators, add_vix_indicators
+from src.data.bar_store import BarStore
 from validate_profit_coverage import validate_profit_data
 
 class Phase1DataPreparation:
@@ -109,16 +110,33 @@ class Phase1DataPreparation:
         self._log_time(start_time, "Data loading")
         return self
         
-    def load_ibkr_data(self, ibkr_data_path='data/ibkr'):
+    def _read_bars(self, symbol, filename, bar_store):
+        """Read 5-minute bars from the bar store, falling back to the CSV export."""
+        if bar_store is not None:
+            df = bar_store.read_frame(symbol, '5 mins')
+            if not df.empty:
+                self.logger.info(f"Reading {symbol} bars from {bar_store.path(symbol, '5 mins')}")
+                return df
+        if os.path.exists(filename):
+            df = pd.read_csv(filename)
+            df['date'] = pd.to_datetime(df['date'])
+            return df
+        return None
+
+    def load_ibkr_data(self, ibkr_data_path='data/ibkr', bar_store_path=None):
         """
         Load historical price data downloaded from IBKR.
         Assumes files are named like: historical_data_INDEX_SPX_5_mins.csv
         
         IBKR data is in UTC, so we need to convert it to match the trading data timezone.
+
+        When ``bar_store_path`` is given, bars recorded by the real-time API's
+        bar store are used in preference to the CSV files.
         """
         start_time = time.time()
         self.logger.info("Loading IBKR historical data...")
         self.price_data = {}
+        bar_store = BarStore(bar_store_path) if bar_store_path else None
         
         # Map our symbols to IBKR file naming
         symbol_mapping = {
@@ -135,10 +153,8 @@ class Phase1DataPreparation:
         for symbol, ibkr_name in symbol_mapping.items():
             # Try to load 5-minute data (primary timeframe for features)
             filename = os.path.join(ibkr_data_path, f'historical_data_{ibkr_name}_5_mins.csv')
-            if os.path.exists(filename):
-                df = pd.read_csv(filename)
-                df['date'] = pd.to_datetime(df['date'])
-                
+            df = self._read_bars(symbol, filename, bar_store)
+            if df is not None:
                 # IBKR data is in UTC - convert to Eastern Time for US markets
                 if df['date'].dt.tz is not None:
                     # Data has timezone (UTC), convert to Eastern
@@ -154,23 +170,7 @@ class Phase1DataPreparation:
                 
                 # Pre-calculate technical indicators for this symbol
                 self.logger.info(f"Calculating technical indicators for {symbol}...")
-                # 20-period SMA (about 100 minutes)
-                df['sma_20'] = df['close'].rolling(20).mean()
-                
-                # Price momentum (5-period)
-                df['momentum_5'] = df['close'].pct_change(5)
-                
-                # Volatility (20-period)
-                df['volatility_20'] = df['close'].rolling(20).std()
-                
-                # RSI
-                if len(df) > 14:
-                    df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-                
-                # Distance from high/low
-                df['high_20'] = df['high'].rolling(20).max()
-                df['low_20'] = df['low'].rolling(20).min()
-                df['price_position'] = (df['close'] - df['low_20']) / (df['high_20'] - df['low_20'] + 1e-8)
+                add_price_indicators(df)
                 
                 self.price_data[symbol] = df
                 self.logger.info(f"Loaded {len(df)} records for {symbol}")
@@ -179,9 +179,9 @@ class Phase1DataPreparation:
                 
         # Load VIX separately
         vix_file = os.path.join(ibkr_data_path, 'historical_data_INDEX_VIX_5_mins.csv')
-        if os.path.exists(vix_file):
-            self.vix_data = pd.read_csv(vix_file)
-            self.vix_data['date'] = pd.to_datetime(self.vix_data['date'])
+        vix_data = self._read_bars('VIX', vix_file, bar_store)
+        if vix_data is not None:
+            self.vix_data = vix_data
             
             # Convert VIX data from UTC to Eastern
             if self.vix_data['date'].dt.tz is not None:
@@ -193,8 +193,7 @@ class Phase1DataPreparation:
             
             # Pre-calculate VIX features
             self.logger.info("Calculating VIX technical indicators...")
-            self.vix_data['vix_sma_20'] = self.vix_data['close'].rolling(20).mean()
-            self.vix_data['vix_change'] = self.vix_data['close'].pct_change()
+            add_vix_indicators(self.vix_data)
             
             self.logger.info(f"Loaded {len(self.vix_data)} VIX records")
         else:
@@ -214,8 +213,7 @@ class Phase1DataPreparation:
         if not vix.empty:
             self.vix_data = vix[['Close', 'Volume']].rename(columns={'Close': 'close', 'Volume': 'volume'})
             # Pre-calculate VIX features
-            self.vix_data['vix_sma_20'] = self.vix_data['close'].rolling(20).mean()
-            self.vix_data['vix_change'] = self.vix_data['close'].pct_change()
+            add_vix_indicators(self.vix_data)
             self.logger.info(f"Downloaded {len(self.vix_data)} VIX records from Yahoo")
         else:
             self.logger.error("Failed to download VIX data")
@@ -534,9 +532,11 @@ class Phase1DataPreparation:
         save_columns = ['interval_datetime', 'pred_symbol', 'target'] + self.feature_names
         save_columns = [col for col in save_columns if col in train_data.columns]
         
-        train_data[save_columns].to_csv('data/phase1_processed/train_data.csv', index=False)
-        val_data[save_columns].to_csv('data/phase1_processed/val_data.csv', index=False)
-        test_data[save_columns].to_csv('data/phase1_processed/test_data.csv', index=False)
+        # Parquet keeps dtypes so training doesn't have to re-parse and coerce;
+        # CSV is still written for older tooling
+        for name, split in (('train', train_data), ('val', val_data), ('test', test_data)):
+            split[save_columns].to_parquet(f'data/phase1_processed/{name}_data.parquet', index=False)
+            split[save_columns].to_csv(f'data/phase1_processed/{name}_data.csv', index=False)
         
         # Save feature info
         feature_info = {
@@ -566,7 +566,7 @@ class Phase1DataPreparation:
         self.logger.info("Phase 1 data preparation complete!")
         return train_data, val_data, test_data
     
-    def run_phase1_pipeline(self):
+    def run_phase1_pipeline(self, bar_store_path=None):
         """Run the complete Phase 1 data preparation pipeline"""
         pipeline_start = time.time()
         
@@ -574,7 +574,7 @@ class Phase1DataPreparation:
         self.load_data()
         
         # Load IBKR historical price data
-        self.load_ibkr_data()
+        self.load_ibkr_data(bar_store_path=bar_store_path)
         
         # Add features
         self.add_basic_temporal_features()
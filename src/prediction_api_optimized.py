@@ -28,13 +28,14 @@ import json
 import logging
 import time
 import threading
-import math
 import warnings
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
 
 # IB imports
-from ib_insync import IB, Stock, Index, util, Contract
+from ib_insync import IB, util, Contract
+
+from quote_stream import QuoteStream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,8 +51,7 @@ ib = None
 ib_connected = False
 market_data_cache = {}
 cache_lock = threading.Lock()
-active_tickers = {}  # Persistent ticker subscriptions
-ticker_lock = threading.Lock()
+quotes: Optional[QuoteStream] = None  # Persistent quote subscriptions
 executor = ThreadPoolExecutor(max_workers=8)  # For parallel operations
 
 # Constants
@@ -122,7 +122,7 @@ class PredictionResponse(BaseModel):
 
 def init_ib_connection():
     """Initialize IB connection at module level, before FastAPI starts."""
-    global ib, ib_connected
+    global ib, ib_connected, quotes
     
     try:
         print("Connecting to IB Gateway on port 7497...")
@@ -131,6 +131,7 @@ def init_ib_connection():
         
         if ib.isConnected():
             ib_connected = True
+            quotes = QuoteStream(ib)
             print("✓ Connected to IB Gateway")
             # Pre-subscribe to common symbols
             pre_subscribe_symbols()
@@ -146,28 +147,7 @@ def init_ib_connection():
 
 def pre_subscribe_symbols():
     """Pre-subscribe to commonly used symbols for faster data access."""
-    symbols = ['SPX', 'SPY', 'VIX', 'XSP', 'NDX', 'QQQ', 'RUT']
-    
-    for symbol in symbols:
-        try:
-            # Create contract
-            if symbol in ['SPX', 'VIX', 'XSP']:
-                contract = Index(symbol, 'CBOE', 'USD')
-            elif symbol == 'RUT':
-                contract = Index('RUT', 'RUSSELL', 'USD')
-            elif symbol == 'NDX':
-                contract = Index('NDX', 'NASDAQ', 'USD')
-            else:
-                contract = Stock(symbol, 'SMART', 'USD')
-            
-            # Subscribe to market data
-            ticker = ib.reqMktData(contract, '', False, False)
-            with ticker_lock:
-                active_tickers[symbol] = ticker
-            logger.info(f"Pre-subscribed to {symbol}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to pre-subscribe to {symbol}: {e}")
+    quotes.subscribe_many(['SPX', 'SPY', 'VIX', 'XSP', 'NDX', 'QQQ', 'RUT'])
 
 # Connect at module import time
 init_ib_connection()
@@ -203,13 +183,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     
     # Cancel all active subscriptions
-    with ticker_lock:
-        for symbol, ticker in active_tickers.items():
-            try:
-                ib.cancelMktData(ticker)
-            except:
-                pass
-        active_tickers.clear()
+    if quotes is not None:
+        quotes.close()
     
     if ib and ib.isConnected():
         try:
@@ -231,63 +206,22 @@ app = FastAPI(
 )
 
 def get_ib_price_fast(symbol: str) -> float:
-    """Get price from pre-subscribed ticker or cache."""
-    global active_tickers
-    
-    # Check if we have an active ticker
-    with ticker_lock:
-        ticker = active_tickers.get(symbol)
-    
-    if ticker:
-        # Use pre-subscribed data - much faster!
-        if ticker.last and not math.isnan(ticker.last):
-            return float(ticker.last)
-        elif ticker.close and not math.isnan(ticker.close):
-            return float(ticker.close)
-    
-    # Fallback to regular method
+    """Get price from the in-memory quote store."""
+    quote = quotes.get(symbol) if quotes is not None else None
+    if quote is not None and not quotes.is_stale(symbol):
+        return quote.last
+
+    # Not streaming yet, or the stream went quiet
     return get_ib_price(symbol)
 
 def get_ib_price(symbol: str) -> float:
-    """Get price from IB - with improved error handling."""
-    global ib, ib_connected
-    
+    """Subscribe to symbol and wait briefly for its first quote."""
     if not ib_connected or not ib or not ib.isConnected():
         raise Exception("Not connected to IB")
     
     try:
-        # Create contract
-        if symbol in ['SPX', 'VIX', 'XSP']:
-            contract = Index(symbol, 'CBOE', 'USD')
-        elif symbol == 'RUT':
-            contract = Index('RUT', 'RUSSELL', 'USD')
-        elif symbol == 'NDX':
-            contract = Index('NDX', 'NASDAQ', 'USD')
-        else:
-            contract = Stock(symbol, 'SMART', 'USD')
-        
-        # Request market data
-        ticker = ib.reqMktData(contract, '', False, False)
-        
-        # Shorter timeout for faster fallback
-        timeout = 1.0
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            if ticker.last and not math.isnan(ticker.last):
-                price = ticker.last
-                break
-            elif ticker.close and not math.isnan(ticker.close):
-                price = ticker.close
-                break
-            time.sleep(0.05)  # Smaller sleep interval
-        else:
-            ib.cancelMktData(ticker)
-            raise Exception(f"Timeout getting price for {symbol}")
-        
-        ib.cancelMktData(ticker)
-        return float(price)
-        
+        # The subscription is kept, so later reads are served from memory
+        return quotes.wait_for_sync(symbol, timeout=1.0).last
     except Exception as e:
         logger.debug(f"Error getting IB price for {symbol}: {e}")
         raise
@@ -418,7 +352,7 @@ def root():
         "model_loaded": model is not None,
         "features_loaded": feature_names is not None,
         "ib_connected": ib_connected,
-        "active_subscriptions": len(active_tickers),
+        "active_subscriptions": len(quotes.symbols) if quotes else 0,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -432,7 +366,8 @@ def health():
             "model": "loaded" if model else "not_loaded",
             "features": f"{len(feature_names)} features" if feature_names else "not_loaded",
             "ib_connection": "connected" if ib_connected else "disconnected",
-            "active_subscriptions": len(active_tickers),
+            "active_subscriptions": len(quotes.symbols) if quotes else 0,
+            "quote_staleness": quotes.staleness() if quotes else {},
             "cache_entries": len(market_data_cache)
         }
     }
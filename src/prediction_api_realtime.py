@@ -3,6 +3,7 @@
 
 import os
 import json
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -28,14 +29,20 @@ import xgboost as xgb
 import numpy as np
 import yaml
 import time
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from data_manager import DataManager
 from feature_engineering.real_time_features import RealTimeFeatureGenerator
 from models.hierarchical_predictor import HierarchicalPredictor
+from models.model_registry import LazyModelRegistry, pairs_from_prediction_log
 from risk_reward_calculator import RiskRewardCalculator
 from cache_manager import CacheManager
+from batch_scheduler import MicroBatcher
+from inference_executor import InferenceExecutor, InferenceOverloaded, InferenceTimeout
+from market_feed import DEFAULT_FEED_NAME, FEED_ENV, FeedDataManager, MarketFeed
+from prefork_server import memory_report
 from utils.prediction_logger import PredictionLoggingMiddleware
 
 MODEL_PATH = "models/xgboost_phase1_model.pkl"
@@ -94,37 +101,20 @@ manager: DataManager
 cache_manager: CacheManager
 batch_max_size: int = 10
 prediction_logger: PredictionLoggingMiddleware | None = None
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    global model, feature_gen, manager, predictor
-    
-    # Load config
-    with open(CONFIG_PATH) as f:
-        cfg = yaml.safe_load(f)
-    perf_cfg = cfg.get("performance", {}).get("cache", {})
-    manager = DataManager({**cfg.get("data_source", {}), "performance": {"cache": perf_cfg}})
-    await manager.connect()
-
-    feature_gen = RealTimeFeatureGenerator(manager, feature_info_path=FEATURE_INFO_PATH)
-    global cache_manager
-    cache_manager = CacheManager(
-        feature_ttl=perf_cfg.get("feature_ttl", 60),
-        prediction_ttl=perf_cfg.get("prediction_ttl", 300),
-        max_size=perf_cfg.get("max_size", 1000),
-    )
-    global batch_max_size
-    batch_cfg = cfg.get("performance", {}).get("batch_predictions", {})
-    batch_max_size = batch_cfg.get("max_batch_size", 10)
-
-    monitor_cfg = cfg.get("integration", {}).get("monitoring", {})
-    if monitor_cfg.get("enabled") and monitor_cfg.get("track_predictions") and monitor_cfg.get("save_to_file"):
-        log_file = monitor_cfg.get("predictions_file", "logs/predictions.jsonl")
-        global prediction_logger
-        prediction_logger = PredictionLoggingMiddleware(log_file)
-
-    # Multi-model configuration
+predict_batcher: MicroBatcher | None = None
+inference: InferenceExecutor | None = None
+market_feed: FeedDataManager | None = None
+# Set once the models were loaded before the server started (prefork mode)
+preloaded: bool = False
+
+def load_models(cfg: dict, parity_check: bool | None = None) -> None:
+    """Load the model registry named in ``cfg`` into the module globals.
+
+    Runs inside ``lifespan`` for a single-process server; the prefork server
+    calls it once in the parent so forked workers share the boosters.
+    ``parity_check`` overrides ``prediction.native_booster.parity_check``.
+    """
+    global model, predictor
     model_map = cfg.get('models')
     symbol_strategy_dir = cfg.get('symbol_strategy_models', {}).get('dir')
 
@@ -138,13 +128,22 @@ async def lifespan(app: FastAPI):
                 key = p.stem.replace('_model', '')
                 symbol_strategy_paths[key] = str(p)
 
+        native_cfg = cfg.get('prediction', {}).get('native_booster', {})
+        lazy_cfg = cfg.get('symbol_strategy_models', {}).get('lazy', {})
+        budget_mb = lazy_cfg.get('memory_budget_mb')
         predictor = HierarchicalPredictor(
             symbol_strategy_paths=symbol_strategy_paths,
             symbol_paths={k: v for k, v in model_map.items() if k != 'default'},
             default_path=model_map.get('default'),
+            native=native_cfg.get('enabled', False),
+            parity_check=native_cfg.get('parity_check', True) if parity_check is None else parity_check,
+            parity_tolerance=native_cfg.get('parity_tolerance', 1e-5),
+            lazy=lazy_cfg.get('enabled', False),
+            memory_budget=int(budget_mb * 2**20) if budget_mb else None,
         )
         logger.info(
-            "Loaded %d symbol-strategy models, %d symbol models",
+            "%s %d symbol-strategy models, %d symbol models",
+            "Indexed" if _lazy_models() else "Loaded",
             len(predictor.symbol_strategy_models),
             len(predictor.symbol_models),
         )
@@ -171,15 +170,163 @@ async def lifespan(app: FastAPI):
         else:
             model = joblib.load(MODEL_PATH)
             logger.info("Model loaded from %s", MODEL_PATH)
-        logger.info("Feature generator ready")
+
+
+
+def _lazy_models() -> LazyModelRegistry | None:
+    models = predictor.symbol_strategy_models if predictor else None
+    return models if isinstance(models, LazyModelRegistry) else None
+
+
+def _warm_model_keys(cfg: dict) -> list:
+    """Symbol-strategy pairs from today's prediction log, most used first."""
+    lazy_cfg = cfg.get('symbol_strategy_models', {}).get('lazy', {})
+    if not lazy_cfg.get('preload_from_log', True):
+        return []
+    log_file = cfg.get('integration', {}).get('monitoring', {}).get('predictions_file', "logs/predictions.jsonl")
+    return pairs_from_prediction_log(log_file)
+
+
+def preload_models() -> None:
+    """Load the registry before forking prefork workers (see prefork_server)."""
+    global preloaded
+    with open(CONFIG_PATH) as f:
+        cfg = yaml.safe_load(f)
+    # A parity check predicts with both models, which starts OpenMP threads
+    # that do not survive the fork; run convert_models_to_native.py instead
+    load_models(cfg, parity_check=False)
+    if _lazy_models():
+        # Synchronously, so the warm models are shared by the forked workers
+        _lazy_models().preload(_warm_model_keys(cfg))
+    preloaded = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    global feature_gen, manager
+    
+    # Load config
+    with open(CONFIG_PATH) as f:
+        cfg = yaml.safe_load(f)
+    perf_cfg = cfg.get("performance", {}).get("cache", {})
+    data_cfg = {**cfg.get("data_source", {}), "performance": {"cache": perf_cfg}}
+    global market_feed
+    feed_cfg = cfg.get("performance", {}).get("market_feed", {})
+    # Workers of a multi-worker server would each connect to IB with the
+    # same client id, so they need the feed whatever the config says
+    feed_required = bool(os.environ.get(FEED_ENV))
+    if feed_cfg.get("enabled", False) or feed_required:
+        feed_name = feed_cfg.get("name", DEFAULT_FEED_NAME)
+        try:
+            feed = MarketFeed.attach(feed_name)
+        except (FileNotFoundError, ValueError) as e:
+            if feed_required:
+                raise RuntimeError(f"Market feed {feed_name} is required but unavailable: {e}") from e
+            logger.warning("Market feed %s unavailable (%s); fetching market data in this worker", feed_name, e)
+        else:
+            # The feed process owns the IB connection; workers only reach
+            # the companion for symbols the feed does not cover
+            market_feed = FeedDataManager(
+                feed,
+                DataManager({**data_cfg, "standalone": {"enabled": False}}),
+                max_age=feed_cfg.get("max_age", 10),
+            )
+    manager = market_feed or DataManager(data_cfg)
+    await manager.connect()
+
+    feature_gen = RealTimeFeatureGenerator(manager, feature_info_path=FEATURE_INFO_PATH)
+    global cache_manager
+    cache_manager = CacheManager(
+        feature_ttl=perf_cfg.get("feature_ttl", 60),
+        prediction_ttl=perf_cfg.get("prediction_ttl", 300),
+        max_size=perf_cfg.get("max_size", 1000),
+        max_bytes=perf_cfg.get("max_bytes"),
+        market_bar_seconds=perf_cfg.get("market_bar_seconds", 60),
+    )
+    global inference
+    infer_cfg = cfg.get("performance", {}).get("inference", {})
+    inference = InferenceExecutor(
+        kind=infer_cfg.get("executor", "thread"),
+        max_workers=infer_cfg.get("max_workers", 4),
+        max_concurrency=infer_cfg.get("max_concurrency"),
+        max_queue=infer_cfg.get("max_queue"),
+        deadline_ms=infer_cfg.get("deadline_ms"),
+    )
+
+    global batch_max_size
+    batch_cfg = cfg.get("performance", {}).get("batch_predictions", {})
+    batch_max_size = batch_cfg.get("max_batch_size", 10)
+    global predict_batcher
+    if batch_cfg.get("enabled", False):
+        # Coalesce concurrent single /predict calls into one scoring pass
+        predict_batcher = MicroBatcher(
+            _predict_coalesced,
+            max_batch_size=batch_max_size,
+            timeout_ms=batch_cfg.get("timeout_ms", 100),
+        )
+
+    monitor_cfg = cfg.get("integration", {}).get("monitoring", {})
+    if monitor_cfg.get("enabled") and monitor_cfg.get("track_predictions") and monitor_cfg.get("save_to_file"):
+        log_file = monitor_cfg.get("predictions_file", "logs/predictions.jsonl")
+        writer_cfg = monitor_cfg.get("writer", {})
+        global prediction_logger
+        prediction_logger = PredictionLoggingMiddleware(
+            log_file,
+            batch_size=writer_cfg.get("batch_size", 100),
+            flush_interval=writer_cfg.get("flush_interval_ms", 500) / 1000,
+            max_queue=writer_cfg.get("max_queue", 10000),
+            overflow=writer_cfg.get("overflow", "drop_oldest"),
+            max_bytes=writer_cfg.get("max_bytes"),
+            backup_count=writer_cfg.get("backup_count", 5),
+        )
+
+    # Multi-model configuration
+    model_map = cfg.get('models')
+
+    # Keep per-symbol market features warm so requests skip market-data I/O
+    context_cfg = cfg.get("performance", {}).get("market_context", {})
+    if context_cfg.get("enabled", False) and market_feed is None:
+        symbols = context_cfg.get("symbols") or [
+            k for k in (model_map or {}) if k != "default" and "_" not in k
+        ]
+        feature_gen.start_context_refresher(
+            symbols,
+            interval=context_cfg.get("refresh_interval", 5),
+            max_age=context_cfg.get("max_age", 30),
+            max_symbols=context_cfg.get("max_symbols", 64),
+        )
+    if not preloaded:
+        load_models(cfg)
+        if _lazy_models():
+            _lazy_models().start_preload(_warm_model_keys(cfg))
+    logger.info("Feature generator ready")
     
     yield
     
     # Shutdown
+    if predict_batcher:
+        await predict_batcher.close()
+    if prediction_logger:
+        await prediction_logger.close()
+    inference.shutdown(wait=False)
+    if _lazy_models():
+        _lazy_models().close()
+    await feature_gen.stop_context_refresher()
     await manager.disconnect()
 
 app = FastAPI(title="Magic8 Real-Time Prediction API", lifespan=lifespan)
 
+
+@app.exception_handler(InferenceTimeout)
+async def inference_timeout_handler(request: Request, exc: InferenceTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request: Request, exc: InferenceOverloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 @app.get("/market/{symbol}")
 async def market(symbol: str):
     data = await manager.get_market_data(symbol.upper())
@@ -192,21 +339,44 @@ async def market(symbol: str):
     }
 
 
+@app.get("/data/stats")
+async def data_stats():
+    """Per-symbol market data cache, stale-serve, refresh and fallback counters."""
+    return manager.stats()
+
+
+@app.get("/models/routes")
+async def model_routes():
+    """Show which model level each symbol/strategy pair is served by."""
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return predictor.describe()
+
+
+@app.get("/models/cache")
+async def model_cache():
+    """Loads, evictions and load times of lazily loaded symbol-strategy models."""
+    if _lazy_models() is None:
+        return {"enabled": False}
+    return {"enabled": True, **_lazy_models().stats()}
+
+
 @app.post("/calculate_risk_reward")
 async def calculate_risk_reward(request: TradeInstruction):
     """Return risk/reward metrics for a trade instruction."""
     calc = RiskRewardCalculator()
 
     if request.strategy == "Butterfly":
-        result = calc.calculate_butterfly(
-            request.strikes, request.premium, request.action, request.quantity
+        result = await inference.run(
+            calc.calculate_butterfly, request.strikes, request.premium, request.action, request.quantity
         )
     elif request.strategy in ["Iron Condor", "Sonar"]:
-        result = calc.calculate_iron_condor(
-            request.strikes, request.premium, request.action, request.quantity
+        result = await inference.run(
+            calc.calculate_iron_condor, request.strikes, request.premium, request.action, request.quantity
         )
     elif request.strategy == "Vertical":
-        result = calc.calculate_vertical(
+        result = await inference.run(
+            calc.calculate_vertical,
             request.strikes,
             request.premium,
             request.action,
@@ -226,100 +396,312 @@ async def calculate_risk_reward(request: TradeInstruction):
     }
 
 
+async def _prefetch_market_data(symbols: List[str]) -> None:
+    """Warm the data manager's caches for ``symbols`` with bulk requests.
+
+    Per-symbol feature generation then reads quotes and bars from cache
+    instead of making its own upstream requests.
+    """
+    symbols = [s for s in symbols if feature_gen.get_context(s) is None]
+    if len(symbols) < 2:
+        return
+    # Same bar count the feature generator asks for
+    await asyncio.gather(
+        manager.get_price_data_many(symbols, bars=100),
+        manager.get_market_data_many(symbols),
+        return_exceptions=True,
+    )
+
+
+async def _get_market_features(symbol: str, market_key: Optional[str] = None):
+    """Return the market-derived features for a symbol, using the market cache."""
+    market_key = market_key or cache_manager.get_market_key(symbol, time.time())
+    market = cache_manager.get_market(market_key)
+    if market is None and market_feed is not None:
+        market = market_feed.get_market_features(symbol)
+        if market is not None:
+            cache_manager.set_market(market_key, market)
+    if market is None:
+        market, complete = await feature_gen.generate_market_features(symbol)
+        if complete:
+            cache_manager.set_market(market_key, market)
+    return market
+
+
+def _assemble_features(req: TradeRequest, market, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Build a trade's float32 feature row from shared market and cached order features.
+
+    When ``out`` is given the row is written into it (e.g. a row of the
+    batch matrix) and a view of the symbol's columns is returned.
+    """
+    order = req.model_dump()
+    order_key = cache_manager.get_order_key(req.symbol, order)
+    order_features = cache_manager.get_order(order_key)
+    if order_features is None:
+        order_features = feature_gen.generate_order_features(req.symbol, order)
+        cache_manager.set_order(order_key, order_features)
+    features, _ = feature_gen.assemble_features(req.symbol, market, order_features, out=out)
+    return features
+
+
+async def _get_features(req: TradeRequest) -> np.ndarray:
+    """Return the feature vector for a trade."""
+    return _assemble_features(req, await _get_market_features(req.symbol))
+
+
+def _get_threshold(symbol: str, strategy: str) -> float:
+    """Return the decision threshold for the model serving symbol/strategy."""
+    threshold = 0.5
+    if not predictor:
+        return threshold
+    if predictor.route(symbol, strategy).level in ("symbol_strategy", "symbol"):
+        sym_thresh = thresholds_individual.get(symbol, {})
+        threshold = sym_thresh.get(strategy, 0.5)
+    else:
+        for group_name, group_thresholds in thresholds_grouped.items():
+            if symbol in group_name.split('_'):
+                threshold = group_thresholds.get(symbol, {}).get(strategy, 0.5)
+                break
+    return threshold
+
+
+def _fill_risk_reward(req: TradeRequest) -> None:
+    """Populate missing risk/reward on the request from its strikes."""
+    if (req.risk is not None and req.reward is not None) or not req.strikes:
+        return
+    calc = RiskRewardCalculator()
+    if req.strategy == "Butterfly":
+        rr = calc.calculate_butterfly(req.strikes, req.premium, req.action or "BUY", req.quantity)
+    elif req.strategy in ["Iron Condor", "Sonar"]:
+        rr = calc.calculate_iron_condor(req.strikes, req.premium, req.action or "SELL", req.quantity)
+    elif req.strategy == "Vertical":
+        rr = calc.calculate_vertical(
+            req.strikes,
+            req.premium,
+            req.action or "SELL",
+            req.option_type or "CALL",
+            req.quantity,
+        )
+    else:
+        rr = None
+    if rr:
+        req.risk = rr["max_loss"]
+        req.reward = rr["max_profit"]
+
+
+def _build_response(
+    req: TradeRequest, proba: float, threshold: float, data: Dict, n_features: int
+) -> PredictionResponse:
+    return PredictionResponse(
+        timestamp=datetime.now().isoformat(),
+        symbol=req.symbol,
+        strategy=req.strategy,
+        win_probability=float(proba),
+        prediction="WIN" if proba >= threshold else "LOSS",
+        data_source=data["source"],
+        n_features=n_features,
+    )
+
+
 async def _predict_trade(req: TradeRequest, market_data: Optional[Dict] = None) -> PredictionResponse:
     if model is None and predictor is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     order = req.model_dump()
-    ts = time.time()
-    feat_key = cache_manager.get_feature_key(req.symbol, ts)
-    features = cache_manager.get_feature(feat_key)
-    if features is None:
-        features, _ = await feature_gen.generate_features(req.symbol, order)
-        cache_manager.set_feature(feat_key, features)
+    features = await _get_features(req)
 
     pred_key = cache_manager.get_prediction_key(req.symbol, req.strategy, features)
     proba = cache_manager.get_prediction(pred_key)
 
-    threshold = 0.5
+    threshold = _get_threshold(req.symbol, req.strategy)
     if proba is None:
-        X = np.array([features])
+        X = features[np.newaxis, :]
         if predictor:
-            proba = predictor.predict_proba(req.symbol, req.strategy, X)[0][1]
-
-            if req.symbol in predictor.symbol_models or f"{req.symbol}_{req.strategy}" in predictor.symbol_strategy_models:
-                sym_thresh = thresholds_individual.get(req.symbol, {})
-                threshold = sym_thresh.get(req.strategy, 0.5)
-            else:
-                for group_name, group_thresholds in thresholds_grouped.items():
-                    if req.symbol in group_name.split('_'):
-                        threshold = group_thresholds.get(req.symbol, {}).get(req.strategy, 0.5)
-                        break
+            proba = (await inference.run(predictor.predict_proba, req.symbol, req.strategy, X))[0][1]
         else:
-            proba = model.predict_proba(X)[0][1]
+            proba = (await inference.run(model.predict_proba, X))[0][1]
         cache_manager.set_prediction(pred_key, proba)
 
     data = market_data or await manager.get_market_data(req.symbol)
+    # A few float operations on the request itself: keep them on the loop
+    _fill_risk_reward(req)
 
-    if (req.risk is None or req.reward is None) and req.strikes:
-        calc = RiskRewardCalculator()
-        if req.strategy == "Butterfly":
-            rr = calc.calculate_butterfly(req.strikes, req.premium, req.action or "BUY", req.quantity)
-        elif req.strategy in ["Iron Condor", "Sonar"]:
-            rr = calc.calculate_iron_condor(req.strikes, req.premium, req.action or "SELL", req.quantity)
-        elif req.strategy == "Vertical":
-            rr = calc.calculate_vertical(
-                req.strikes,
-                req.premium,
-                req.action or "SELL",
-                req.option_type or "CALL",
-                req.quantity,
-            )
-        else:
-            rr = None
-        if rr:
-            req.risk = rr["max_loss"]
-            req.reward = rr["max_profit"]
-
-    response = PredictionResponse(
-        timestamp=datetime.now().isoformat(),
-        symbol=req.symbol,
-        strategy=req.strategy,
-        win_probability=float(proba),
-        prediction="WIN" if proba >= threshold else "LOSS",
-        data_source=data["source"],
-        n_features=len(features),
-    )
+    response = _build_response(req, proba, threshold, data, len(features))
 
     if prediction_logger:
         await prediction_logger.log(order, response, threshold)
 
     return response
 
+
+async def _predict_trades(
+    trades: List[TradeRequest], market_data_map: Optional[Dict[str, Dict]] = None
+) -> List[PredictionResponse]:
+    """Score many trades with one model call per resolved model.
+
+    Feature rows are generated concurrently (once per feature-cache key),
+    rows missing from the prediction cache are grouped by the model
+    ``HierarchicalPredictor`` resolves for them and scored as a matrix.
+    """
+    if model is None and predictor is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if not trades:
+        return []
+
+    # Market features are fetched once per symbol/bar, concurrently
+    now = time.time()
+    market_keys = [cache_manager.get_market_key(t.symbol, now) for t in trades]
+    symbol_for_key: Dict[str, str] = {}
+    for key, trade in zip(market_keys, trades):
+        symbol_for_key.setdefault(key, trade.symbol)
+    await _prefetch_market_data(
+        [sym for k, sym in symbol_for_key.items() if k not in cache_manager.namespaces["market"]]
+    )
+    markets = await asyncio.gather(*(_get_market_features(sym, k) for k, sym in symbol_for_key.items()))
+    market_by_key = dict(zip(symbol_for_key, markets))
+
+    # Rows are written straight into one float32 matrix, padded to the
+    # widest symbol plan; models narrower than that select their columns
+    width = max(feature_gen.get_plan(t.symbol).n_features for t in trades)
+    rows = np.zeros((len(trades), width), dtype=np.float32)
+    features = [
+        _assemble_features(t, market_by_key[k], out=row)
+        for t, k, row in zip(trades, market_keys, rows)
+    ]
+
+    # Look up cached probabilities and collect the rows still to score
+    pred_keys = [
+        cache_manager.get_prediction_key(t.symbol, t.strategy, f) for t, f in zip(trades, features)
+    ]
+    probas: Dict[str, float] = {}
+    pending: Dict[str, int] = {}
+    for i, key in enumerate(pred_keys):
+        if key in probas or key in pending:
+            continue
+        cached = cache_manager.get_prediction(key)
+        if cached is None:
+            pending[key] = i
+        else:
+            probas[key] = cached
+
+    if pending:
+        idx = list(pending.values())
+        X = rows if len(idx) == len(trades) else rows[idx]
+        if predictor:
+            scored = (await inference.run(
+                predictor.predict_proba_batch,
+                [trades[i].symbol for i in idx],
+                [trades[i].strategy for i in idx],
+                X,
+            ))[:, 1]
+        else:
+            scored = np.asarray(await inference.run(model.predict_proba, X))[:, 1]
+        for key, proba in zip(pending, scored):
+            probas[key] = float(proba)
+            cache_manager.set_prediction(key, probas[key])
+
+    if market_data_map is None:
+        market_data_map = await manager.get_market_data_many([t.symbol for t in trades])
+    market_data = [market_data_map[t.symbol] for t in trades]
+
+    for trade in trades:
+        _fill_risk_reward(trade)
+
+    results = []
+    for trade, feats, key, data in zip(trades, features, pred_keys, market_data):
+        threshold = _get_threshold(trade.symbol, trade.strategy)
+        results.append(_build_response(trade, probas[key], threshold, data, len(feats)))
+    return results
+
+async def _predict_coalesced(trades: List[TradeRequest]) -> List[PredictionResponse]:
+    """Score a window of single /predict calls together and log each one."""
+    orders = [t.model_dump() for t in trades]
+    try:
+        results = await _predict_trades(trades)
+    except (InferenceOverloaded, InferenceTimeout):
+        # The executor is saturated: retrying per trade would only add load
+        raise
+    except Exception:
+        if len(trades) == 1:
+            raise
+        # Isolate the failing request(s) instead of failing the whole window
+        results = await asyncio.gather(*(_predict_trade(t) for t in trades), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return results
+
+    if prediction_logger:
+        for order, trade, response in zip(orders, trades, results):
+            await prediction_logger.log(order, response, _get_threshold(trade.symbol, trade.strategy))
+    return results
+
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(req: TradeRequest):
+    if predict_batcher is not None:
+        return await predict_batcher.submit(req)
     return await _predict_trade(req)
 
 
+@app.get("/inference/stats")
+async def inference_stats():
+    """Queue depth, concurrency and latency of the inference executor."""
+    return inference.stats()
+
+
+@app.get("/predict/batching")
+async def batching_stats():
+    """Fill and queueing-delay statistics of the /predict micro-batcher."""
+    if predict_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **predict_batcher.stats()}
+
+
 @app.post("/predict/batch", response_model=BatchPredictionResponse)
 async def predict_batch(request: BatchTradeRequest):
     trades = request.requests[:batch_max_size]
-    market_data_map: Dict[str, Dict] = {}
+    market_data_map: Optional[Dict[str, Dict]] = None
     if request.share_market_data:
-        unique_symbols = {t.symbol for t in trades}
-        for sym in unique_symbols:
-            market_data_map[sym] = await manager.get_market_data(sym)
+        market_data_map = await manager.get_market_data_many([t.symbol for t in trades])
 
-    results = []
-    for trade in trades:
-        data = market_data_map.get(trade.symbol) if request.share_market_data else None
-        results.append(await _predict_trade(trade, market_data=data))
+    results = await _predict_trades(trades, market_data_map)
     metrics = cache_manager.stats()
     if prediction_logger:
         pairs = [(t.model_dump(), r) for t, r in zip(trades, results)]
         await prediction_logger.log_batch(pairs)
     return BatchPredictionResponse(predictions=results, batch_metrics=metrics)
 
+@app.get("/memory")
+async def memory():
+    """RSS and unique set size of every API process (master and workers)."""
+    try:
+        return memory_report()
+    except FileNotFoundError:
+        raise HTTPException(status_code=501, detail="Memory report needs /proc")
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the real-time prediction API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WORKERS", 1)),
+                        help="Fork this many workers after loading the models once")
+    args = parser.parse_args()
+    if args.workers > 1:
+        from prefork_server import serve
+
+        # Check the feed before loading models; workers refuse to start without it
+        with open(CONFIG_PATH) as f:
+            feed_cfg = (yaml.safe_load(f).get("performance") or {}).get("market_feed", {})
+        try:
+            MarketFeed.attach(feed_cfg.get("name", DEFAULT_FEED_NAME)).close()
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(f"--workers needs a running market feed (python src/market_feed.py): {e}")
+        os.environ[FEED_ENV] = "1"
+        serve(app, preload_models, args.workers, host=args.host, port=args.port)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port)
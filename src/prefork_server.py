@@ -0,0 +1,216 @@
+"""Prefork server for the prediction API.
+
+Every uvicorn worker started with ``--workers`` imports the app and runs
+``lifespan`` on its own, so each loads the full model registry. Here the
+parent loads the registry once, freezes the garbage collector and only then
+forks the workers. The boosters stay on pages the workers share
+copy-on-write, so an extra worker costs its private heap rather than
+another copy of every model.
+
+``memory_report`` reads ``/proc/<pid>/smaps_rollup`` for the master and every
+worker. ``uss`` (pages mapped only by that process) is the extra cost of a
+worker, ``rss`` includes the shared model pages, and ``pss`` splits the
+shared pages evenly between the processes that map them.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Workers find their master (and through it, their siblings) via this variable
+MASTER_ENV = "MAGIC8_PREFORK_MASTER"
+
+_STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+    "Swap": "swap",
+}
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    """Turn ``smaps_rollup`` contents into byte counts."""
+    fields = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        name = _SMAPS_FIELDS.get(key)
+        if name is None:
+            continue
+        parts = rest.split()
+        fields[name] = int(parts[0]) * (1024 if parts[-1] == "kB" else 1)
+    memory = {f"{k}_bytes": fields.get(k, 0) for k in ("rss", "pss", "swap")}
+    memory["uss_bytes"] = fields.get("private_clean", 0) + fields.get("private_dirty", 0)
+    memory["shared_bytes"] = fields.get("shared_clean", 0) + fields.get("shared_dirty", 0)
+    return memory
+
+
+def process_memory(pid: int | str = "self") -> Dict[str, int]:
+    """RSS, PSS and unique set size of ``pid`` in bytes."""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        return parse_smaps_rollup(f.read())
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of ``pid``."""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except FileNotFoundError:
+        pass
+    # Kernels without CONFIG_PROC_CHILDREN: scan every process' parent
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; ppid follows its closing paren
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_report(master: Optional[int] = None) -> Dict[str, Any]:
+    """Memory of the prefork master and its workers.
+
+    Without a master (single-process server) only the current process is
+    reported.
+    """
+    if master is None and os.environ.get(MASTER_ENV):
+        master = int(os.environ[MASTER_ENV])
+    if master is None:
+        pids = [("worker", os.getpid())]
+    else:
+        pids = [("master", master)] + [("worker", p) for p in child_pids(master)]
+
+    processes = []
+    for role, pid in pids:
+        try:
+            memory = process_memory(pid)
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+        processes.append({"pid": pid, "role": role, "current": pid == os.getpid(), **memory})
+    totals = {
+        f"total_{k}": sum(p[k] for p in processes) for k in ("rss_bytes", "pss_bytes", "uss_bytes")
+    }
+    return {
+        "master": master,
+        "workers": sum(p["role"] == "worker" for p in processes),
+        "processes": processes,
+        **totals,
+    }
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket created before the fork and shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(
+    app: Any,
+    preload: Callable[[], None],
+    workers: int,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    log_level: str = "info",
+    restart_delay: float = 1.0,
+) -> None:
+    """Run ``preload`` once, then fork ``workers`` uvicorn servers for ``app``.
+
+    Workers that die are replaced; SIGTERM/SIGINT stop all of them.
+    """
+    started = time.perf_counter()
+    preload()
+    # Objects created by the preload move to the permanent generation so
+    # collections in the workers do not write to (and unshare) their pages
+    gc.collect()
+    gc.freeze()
+    logger.info("Preloaded models in %.1fs (master rss=%d MB)", time.perf_counter() - started,
+                process_memory()["rss_bytes"] // 2**20)
+
+    sock = bind_socket(host, port)
+    os.environ[MASTER_ENV] = str(os.getpid())
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        # Hold SIGTERM/SIGINT across the fork: a worker must not run the
+        # master's handler, and the master must know the pid before it stops
+        signal.pthread_sigmask(signal.SIG_BLOCK, _STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            # uvicorn installs its own handlers; until then the default ones apply
+            for signum in _STOP_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, _STOP_SIGNALS)
+            code = 0
+            try:
+                _run_worker(app, sock, log_level)
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        children[pid] = slot
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, _STOP_SIGNALS)
+        logger.info("Started worker %d (slot %d)", pid, slot)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for signum in _STOP_SIGNALS:
+        signal.signal(signum, stop)
+    for slot in range(workers):
+        spawn(slot)
+    logger.info("Serving on %s:%d with %d prefork workers", host, port, workers)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot = children.pop(pid, None)
+            if slot is None or stopping:
+                continue
+            logger.warning("Worker %d exited with code %d; restarting", pid, os.waitstatus_to_exitcode(status))
+            time.sleep(restart_delay)
+            if not stopping:
+                spawn(slot)
+    finally:
+        sock.close()
+        os.environ.pop(MASTER_ENV, None)
@@ -0,0 +1,286 @@
+"""Persistent IBKR quote subscriptions with an in-memory last-quote store."""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ib_insync import Index, Stock
+
+logger = logging.getLogger(__name__)
+
+
+def make_contract(symbol: str):
+    """Return the IBKR contract used for a symbol's quotes."""
+    if symbol in ('SPX', 'VIX', 'XSP'):
+        return Index(symbol, 'CBOE', 'USD')
+    if symbol == 'RUT':
+        return Index('RUT', 'RUSSELL', 'USD')
+    if symbol == 'NDX':
+        return Index('NDX', 'NASDAQ', 'USD')
+    return Stock(symbol, 'SMART', 'USD')
+
+
+def _num(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class StaleQuoteError(TimeoutError):
+    """Raised when a symbol's quote is too old and resubscribing did not help."""
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Last known quote for a symbol.
+
+    ``received`` is the ``time.monotonic()`` of the update and is used for
+    staleness; ``time`` is the wall-clock receive time for display.
+    """
+
+    symbol: str
+    last: float
+    bid: Optional[float]
+    ask: Optional[float]
+    bid_size: int
+    ask_size: int
+    received: float
+    time: str
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.received
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'last': self.last,
+            'bid': self.bid or 0.0,
+            'ask': self.ask or 0.0,
+            'bid_size': self.bid_size,
+            'ask_size': self.ask_size,
+            'time': self.time,
+        }
+
+
+class QuoteStream:
+    """Subscribe once per symbol and serve quotes from memory.
+
+    Each symbol gets a single streaming ``reqMktData`` subscription. Ticker
+    updates delivered through ib_insync's ``pendingTickersEvent`` replace
+    the symbol's :class:`Quote`, so reads are dictionary lookups instead
+    of a request/wait/cancel round trip. Only the first read of a symbol
+    waits, for its first tick.
+
+    A quote older than ``max_age`` seconds is stale. :meth:`get` still
+    returns it, but :meth:`wait_for` treats it as a miss: the subscription
+    may have dropped silently (farm disconnect, ticker stuck after a
+    reconnect), so it is replaced and a fresh tick awaited. Within
+    ``resubscribe_interval`` of the last attempt a stale read fails at once
+    with :class:`StaleQuoteError`, so quiet symbols or closed markets do not
+    cost a full wait per read.
+    """
+
+    def __init__(
+        self,
+        ib,
+        contract_factory: Callable[[str], Any] = make_contract,
+        max_age: float = 5.0,
+        resubscribe_interval: float = 60.0,
+    ) -> None:
+        self.ib = ib
+        self.contract_factory = contract_factory
+        self.max_age = max_age
+        self.resubscribe_interval = resubscribe_interval
+        self._resubscribed: Dict[str, float] = {}
+        self._tickers: Dict[str, Any] = {}
+        self._quotes: Dict[str, Quote] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._cond = threading.Condition()
+        self.updates = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_reads = 0
+        self.resubscribes = 0
+
+        event = getattr(ib, 'pendingTickersEvent', None)
+        if event is not None:
+            event += self._on_pending_tickers
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._tickers)
+
+    def subscribe(self, symbol: str):
+        """Start streaming ``symbol`` if not already subscribed."""
+        ticker = self._tickers.get(symbol)
+        if ticker is None:
+            ticker = self.ib.reqMktData(self.contract_factory(symbol), '', False, False)
+            self._tickers[symbol] = ticker
+            logger.info(f"Subscribed to {symbol} quotes")
+            # Snapshot fields may already be populated
+            self._update(symbol, ticker)
+        return ticker
+
+    def subscribe_many(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            try:
+                self.subscribe(symbol)
+            except Exception as e:
+                logger.warning(f"Failed to subscribe to {symbol}: {e}")
+
+    def resubscribe(self, symbol: str) -> None:
+        """Replace ``symbol``'s subscription, e.g. after it stopped ticking."""
+        self._resubscribed[symbol] = time.monotonic()
+        self.resubscribes += 1
+        ticker = self._tickers.pop(symbol, None)
+        if ticker is not None:
+            try:
+                self.ib.cancelMktData(ticker.contract)
+            except Exception as e:
+                logger.debug(f"Error cancelling market data for {symbol}: {e}")
+        # ib_insync hands back the same Ticker with its old fields, so only
+        # a new tick (not the snapshot) may refresh the quote
+        self._tickers[symbol] = self.ib.reqMktData(self.contract_factory(symbol), '', False, False)
+        logger.warning(f"Resubscribed to {symbol} quotes")
+
+    def _fresh_or_resubscribe(self, symbol: str) -> Optional[Quote]:
+        """Return a fresh quote, or ``None`` after dealing with a stale one."""
+        quote = self._quotes.get(symbol)
+        if quote is not None and quote.age() <= self.max_age:
+            self.hits += 1
+            return quote
+        self.misses += 1
+        if quote is not None:
+            self.stale_reads += 1
+            last = self._resubscribed.get(symbol)
+            if last is not None and time.monotonic() - last < self.resubscribe_interval:
+                raise StaleQuoteError(f"Quote for {symbol} is {quote.age():.1f}s old")
+            self.resubscribe(symbol)
+        return None
+
+    def unsubscribe(self, symbol: str) -> None:
+        ticker = self._tickers.pop(symbol, None)
+        self._quotes.pop(symbol, None)
+        if ticker is not None:
+            try:
+                self.ib.cancelMktData(ticker.contract)
+            except Exception as e:
+                logger.debug(f"Error cancelling market data for {symbol}: {e}")
+
+    def close(self) -> None:
+        """Cancel every subscription and detach from the IB events."""
+        for symbol in list(self._tickers):
+            self.unsubscribe(symbol)
+        event = getattr(self.ib, 'pendingTickersEvent', None)
+        if event is not None:
+            event -= self._on_pending_tickers
+        for waiters in self._waiters.values():
+            for future in waiters:
+                if not future.done():
+                    future.cancel()
+        self._waiters.clear()
+
+    def _on_pending_tickers(self, tickers) -> None:
+        for ticker in tickers:
+            contract = getattr(ticker, 'contract', None)
+            symbol = getattr(contract, 'symbol', None)
+            if symbol in self._tickers:
+                self._update(symbol, ticker)
+
+    def _update(self, symbol: str, ticker) -> None:
+        last = _num(ticker.last)
+        if last is None:
+            last = _num(ticker.close)
+        if last is None:
+            return
+        quote = Quote(
+            symbol=symbol,
+            last=last,
+            bid=_num(ticker.bid),
+            ask=_num(ticker.ask),
+            bid_size=int(_num(ticker.bidSize) or 0),
+            ask_size=int(_num(ticker.askSize) or 0),
+            received=time.monotonic(),
+            time=datetime.now().isoformat(),
+        )
+        self._quotes[symbol] = quote
+        self.updates += 1
+
+        for future in self._waiters.pop(symbol, []):
+            if not future.done():
+                future.set_result(quote)
+        with self._cond:
+            self._cond.notify_all()
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        """Return the last quote for ``symbol`` without any I/O."""
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return quote
+
+    def is_stale(self, symbol: str, now: Optional[float] = None) -> bool:
+        quote = self._quotes.get(symbol)
+        return quote is None or quote.age(now) > self.max_age
+
+    def staleness(self) -> Dict[str, Optional[float]]:
+        """Seconds since the last update of each subscribed symbol."""
+        now = time.monotonic()
+        return {
+            symbol: (round(self._quotes[symbol].age(now), 3) if symbol in self._quotes else None)
+            for symbol in self._tickers
+        }
+
+    async def wait_for(self, symbol: str, timeout: float = 5.0) -> Quote:
+        """Return a fresh quote, subscribing and awaiting a tick if needed."""
+        self.subscribe(symbol)
+        quote = self._fresh_or_resubscribe(symbol)
+        if quote is not None:
+            return quote
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(symbol, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Timeout waiting for market data for {symbol}") from None
+        finally:
+            waiters = self._waiters.get(symbol)
+            if waiters and future in waiters:
+                waiters.remove(future)
+
+    def wait_for_sync(self, symbol: str, timeout: float = 1.0) -> Quote:
+        """Blocking variant of :meth:`wait_for` for worker threads."""
+        self.subscribe(symbol)
+        quote = self._fresh_or_resubscribe(symbol)
+        if quote is not None:
+            return quote
+
+        def fresh() -> bool:
+            quote = self._quotes.get(symbol)
+            return quote is not None and quote.age() <= self.max_age
+
+        with self._cond:
+            if not self._cond.wait_for(fresh, timeout):
+                raise TimeoutError(f"Timeout waiting for market data for {symbol}")
+        return self._quotes[symbol]
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'subscriptions': len(self._tickers),
+            'quotes': len(self._quotes),
+            'updates': self.updates,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_reads': self.stale_reads,
+            'resubscribes': self.resubscribes,
+            'stale': sorted(s for s in self._tickers if self.is_stale(s, now)),
+        }
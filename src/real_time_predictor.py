@@ -182,7 +182,7 @@ class Magic8Predictor:
             )
             
             # Convert to array for prediction
-            feature_array = np.array([features])
+            feature_array = np.asarray(features)[np.newaxis, :]
             
             # Get prediction probabilities
             probabilities = self.model.predict_proba(feature_array)[0]
@@ -7,6 +7,7 @@ This can be added to any integration to enable logging.
 
 import json
 import asyncio
+import functools
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -16,13 +17,148 @@ logger = logging.getLogger(__name__)
 
 
 class PredictionLogger:
-    """Logs predictions to JSONL file for monitoring and analysis."""
-    
-    def __init__(self, log_file: str = "logs/predictions.jsonl"):
+    """Logs predictions to JSONL file for monitoring and analysis.
+
+    Entries are serialized on the caller and put on a bounded queue; a
+    background writer task drains it in batches (up to ``batch_size`` lines
+    or ``flush_interval`` seconds) and writes them from a worker thread, so
+    the request path never touches the disk. The file handle stays open and
+    is rotated once it exceeds ``max_bytes``.
+
+    When the queue is full ``overflow`` decides what happens:
+    ``"drop_oldest"`` discards the oldest pending entry, ``"drop_newest"``
+    discards the new one and ``"block"`` makes the caller wait for space.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(
+        self,
+        log_file: str = "logs/predictions.jsonl",
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        overflow: str = "drop_oldest",
+        max_bytes: Optional[int] = None,
+        backup_count: int = 5,
+    ):
         """Initialize prediction logger."""
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {self.OVERFLOW_POLICIES}, got {overflow!r}")
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = asyncio.Lock()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._fh = None
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+
+    def start(self):
+        """Start the background writer (called lazily on first log)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def flush(self):
+        """Wait until every queued entry has been written."""
+        if self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def close(self):
+        """Flush pending entries, stop the writer and close the file."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+        }
+
+    async def _enqueue(self, entry: Dict[str, Any]):
+        self.start()
+        line = json.dumps(entry) + "\n"
+        if self.overflow == "block":
+            await self._queue.put(line)
+            return
+        try:
+            self._queue.put_nowait(line)
+            return
+        except asyncio.QueueFull:
+            pass
+        self.dropped += 1
+        if self.overflow == "drop_oldest":
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(line)
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lines = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(lines) < self.batch_size:
+                try:
+                    lines.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    lines.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self._write_lines, lines)
+                self.written += len(lines)
+                self.batches += 1
+            except Exception as e:
+                logger.error(f"Failed to write {len(lines)} predictions: {e}")
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    def _write_lines(self, lines):
+        """Append ``lines`` to the log file (runs in a worker thread)."""
+        if self._fh is None:
+            self._fh = open(self.log_file, "a")
+        self._fh.write("".join(lines))
+        self._fh.flush()
+        if self.max_bytes and self._fh.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._fh.close()
+        self._fh = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = self.log_file.with_name(f"{self.log_file.name}.{i}")
+                if src.exists():
+                    src.replace(self.log_file.with_name(f"{self.log_file.name}.{i + 1}"))
+            self.log_file.replace(self.log_file.with_name(f"{self.log_file.name}.1"))
+        else:
+            self.log_file.unlink()
+        self.rotations += 1
         
     async def log_prediction(
         self,
@@ -32,7 +168,7 @@ class PredictionLogger:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """
-        Log a prediction to the JSONL file.
+        Queue a prediction for the JSONL file.
         
         Args:
             order: The order being predicted
@@ -64,10 +200,7 @@ class PredictionLogger:
             if metadata:
                 log_entry["metadata"] = metadata
             
-            # Write to file (thread-safe)
-            async with self._lock:
-                with open(self.log_file, 'a') as f:
-                    f.write(json.dumps(log_entry) + '\n')
+            await self._enqueue(log_entry)
                     
             logger.debug(f"Logged prediction for {order.get('symbol')} {order.get('strategy')}")
             
@@ -96,9 +229,7 @@ class PredictionLogger:
             if metadata:
                 log_entry["metadata"] = metadata
             
-            async with self._lock:
-                with open(self.log_file, 'a') as f:
-                    f.write(json.dumps(log_entry) + '\n')
+            await self._enqueue(log_entry)
                     
         except Exception as e:
             logger.error(f"Failed to log error: {e}")
@@ -114,10 +245,17 @@ def with_prediction_logging(log_file: str = "logs/predictions.jsonl"):
         async def predict_order(order):
             # Your prediction logic
             return prediction_result
+
+        # On shutdown, write out the queued entries
+        await predict_order.logger.close()
+
+    Entries are written in the background, so close (or ``flush``) the
+    ``logger`` attribute of the decorated function before exiting.
     """
     def decorator(func):
         logger_instance = PredictionLogger(log_file)
         
+        @functools.wraps(func)
         async def wrapper(order: Dict[str, Any], *args, **kwargs):
             try:
                 # Call the prediction function
@@ -135,6 +273,7 @@ def with_prediction_logging(log_file: str = "logs/predictions.jsonl"):
                 await logger_instance.log_error(order, e)
                 raise
         
+        wrapper.logger = logger_instance
         return wrapper
     return decorator
 
@@ -153,9 +292,14 @@ class PredictionLoggingMiddleware:
         await prediction_logger.log(order, result)
     """
     
-    def __init__(self, log_file: str = "logs/predictions.jsonl", enabled: bool = True):
-        self.logger = PredictionLogger(log_file) if enabled else None
+    def __init__(self, log_file: str = "logs/predictions.jsonl", enabled: bool = True, **writer_options):
+        self.logger = PredictionLogger(log_file, **writer_options) if enabled else None
         self.enabled = enabled
+
+    async def close(self):
+        """Flush queued entries and close the log file."""
+        if self.logger:
+            await self.logger.close()
     
     async def log(
         self,
@@ -251,6 +395,7 @@ if __name__ == "__main__":
         
         # Log prediction
         await logger.log_prediction(test_order, MockResult())
+        await logger.close()
         print(f"✓ Logged test prediction to {logger.log_file}")
         
         # Test simple logging
@@ -59,6 +59,12 @@ def create_client(monkeypatch, scenario: ms.MarketScenario, hour: int, minute: i
             price = await self.provider.get_current_price(symbol)
             return {"price": price["last"], "volatility": scenario.vix, "source": "mock"}
 
+        async def get_market_data_many(self, symbols):
+            return {s: await self.get_market_data(s) for s in dict.fromkeys(symbols)}
+
+        async def get_price_data_many(self, symbols, bars=100, interval="5 mins"):
+            return {s: await self.provider.get_price_data(s, bars, interval) for s in dict.fromkeys(symbols)}
+
         async def get_current_price(self, symbol):
             price = await self.provider.get_current_price(symbol)
             return price
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(project_root, "src"))
+
+from src.data.bar_store import BarStore, interval_seconds
+from src.data_manager import DataManager
+
+
+def bar(ts, close):
+    when = pd.Timestamp(ts, unit="s", tz="UTC").isoformat()
+    return {"time": when, "open": close, "high": close, "low": close, "close": close, "volume": 10}
+
+
+def test_append_replaces_and_reads_newest(tmp_path):
+    store = BarStore(tmp_path)
+    assert store.read("SPX", "5 mins") == []
+    assert store.append("SPX", "5 mins", [bar(300 * i, float(i)) for i in range(5)]) == 5
+    # The forming bar is overwritten, not duplicated
+    store.append("SPX", "5 mins", [bar(1200, 40.0), bar(1500, 5.0)])
+
+    assert [b["close"] for b in store.read("SPX", "5 mins", limit=3)] == [3.0, 40.0, 5.0]
+    assert store.last_timestamp("SPX", "5 mins") == 1500
+    frame = store.read_frame("SPX", "5 mins")
+    assert len(frame) == 6
+    assert str(frame["date"].dt.tz) == "UTC"
+    assert interval_seconds("1 hour") == 3600
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = []
+
+    async def get_price_data(self, symbol, bars=100, interval="5 mins", priority=0, duration=None):
+        self.calls.append(duration)
+        now = int(time.time()) // 300 * 300
+        return [bar(now - 300 * i, 100.0 + i) for i in reversed(range(bars if duration is None else 2))]
+
+
+@pytest.mark.asyncio
+async def test_restart_fetches_only_the_gap(tmp_path):
+    config = {"standalone": {"enabled": True}, "bar_store": {"enabled": True, "path": str(tmp_path)}}
+
+    first = DataManager(config)
+    first._ib_provider = FakeProvider()
+    assert len(await first.get_price_data("SPX", bars=10)) == 10
+    assert first._ib_provider.calls == [None]
+
+    restarted = DataManager(config)
+    restarted._ib_provider = FakeProvider()
+    data = await restarted.get_price_data("SPX", bars=10)
+    assert len(data) == 10
+    duration = restarted._ib_provider.calls[0]
+    assert duration.endswith(" S") and int(duration.split()[0]) < 3600
@@ -1,13 +1,16 @@
 import importlib
+import numpy as np
 import os
 import sys
+
+import pytest
 from fastapi.testclient import TestClient
 
 from tests.mocks.mock_provider import ScenarioMockProvider
 from tests.utils.market_scenarios import normal_volatility
 
 
-def create_client(monkeypatch, market_counter=None):
+def create_client(monkeypatch, market_counter=None, enter=True):
     project_root = os.path.join(os.path.dirname(__file__), "..")
     sys.path.append(project_root)
     sys.path.append(os.path.join(project_root, "src"))
@@ -17,6 +20,7 @@ def create_client(monkeypatch, market_counter=None):
     sys.modules['data_providers'] = types.ModuleType('data_providers')
     sys.modules['data_providers.standalone_provider'] = base_mod
     api = importlib.import_module("src.prediction_api_realtime")
+    FeaturePlan = importlib.import_module("feature_engineering.real_time_features").FeaturePlan
 
     class FakeManager:
         def __init__(self, cfg):
@@ -34,6 +38,12 @@ def create_client(monkeypatch, market_counter=None):
             price = await self.provider.get_current_price(symbol)
             return {"price": price["last"], "volatility": 17.0, "source": "mock"}
 
+        async def get_market_data_many(self, symbols):
+            return {s: await self.get_market_data(s) for s in dict.fromkeys(symbols)}
+
+        async def get_price_data_many(self, symbols, bars=100, interval="5 mins"):
+            return {s: await self.provider.get_price_data(s, bars, interval) for s in dict.fromkeys(symbols)}
+
     monkeypatch.setattr(api, "DataManager", FakeManager)
     monkeypatch.setattr(api.joblib, "load", lambda p: type("M", (), {"predict_proba": lambda self, X: [[0.4, 0.6]]})())
 
@@ -43,13 +53,39 @@ def create_client(monkeypatch, market_counter=None):
         feature_order = ["a", "b"]
 
         async def generate_features(self, symbol, order):
+            market, _ = await self.generate_market_features(symbol)
+            return self.assemble_features(symbol, market, self.generate_order_features(symbol, order))
+
+        async def generate_market_features(self, symbol):
             call_counter["count"] += 1
-            return [0.1, 0.2], ["a", "b"]
+            return {"a": 0.1}, True
+
+        def generate_order_features(self, symbol, order):
+            return {"b": order["premium"] / 10}
+
+        def get_context(self, symbol):
+            return None
+
+        def get_plan(self, symbol):
+            return FeaturePlan(symbol, self.feature_order)
+
+        def assemble_features(self, symbol, market, order_features, out=None):
+            plan = self.get_plan(symbol)
+            row = plan.new_row() if out is None else out[:plan.n_features]
+            plan.write(row, {**market, **order_features})
+            return row, plan.names
+
+        def start_context_refresher(self, symbols, interval=5.0, max_age=30.0, max_symbols=64):
+            pass
+
+        async def stop_context_refresher(self):
+            pass
 
     monkeypatch.setattr(api, "RealTimeFeatureGenerator", lambda *a, **k: FakeFeatureGen())
 
     client = TestClient(api.app)
-    client.__enter__()
+    if enter:
+        client.__enter__()
     return client, api, call_counter
 
 
@@ -82,3 +118,101 @@ def test_share_market_data(monkeypatch):
 
     client.__exit__(None, None, None)
 
+
+
+def test_batch_scores_each_model_once(monkeypatch):
+    client, api, _ = create_client(monkeypatch)
+
+    calls = {"count": 0}
+
+    def fake_batch(symbols, strategies, X):
+        calls["count"] += 1
+        assert len(X) == 2
+        return np.array([[0.3, 0.7], [0.6, 0.4]])
+
+    monkeypatch.setattr(api.predictor, "predict_proba_batch", fake_batch)
+    trades = [
+        {"strategy": "Butterfly", "symbol": "SPX", "premium": 1.0, "predicted_price": 5850},
+        {"strategy": "Vertical", "symbol": "SPX", "premium": 2.0, "predicted_price": 5850},
+    ]
+    resp = client.post("/predict/batch", json={"requests": trades})
+    assert resp.status_code == 200
+    probs = [p["win_probability"] for p in resp.json()["predictions"]]
+    assert probs == [0.7, 0.4]
+    assert calls["count"] == 1
+
+    client.__exit__(None, None, None)
+
+
+def test_single_predict_goes_through_micro_batcher(monkeypatch):
+    client, api, _ = create_client(monkeypatch)
+    trade = {"strategy": "Butterfly", "symbol": "SPX", "premium": 1.0, "predicted_price": 5850}
+
+    resp = client.post("/predict", json=trade)
+    assert resp.status_code == 200
+    assert resp.json()["symbol"] == "SPX"
+
+    stats = client.get("/predict/batching").json()
+    assert stats["enabled"] is True
+    assert stats["batches"] == 1
+    assert stats["items"] == 1
+
+    client.__exit__(None, None, None)
+
+
+def test_orders_on_same_symbol_keep_their_own_features(monkeypatch):
+    client, api, counter = create_client(monkeypatch)
+    monkeypatch.setattr(api.predictor, "predict_proba_batch", lambda s, st, X: np.column_stack([1 - X[:, 1], X[:, 1]]))
+
+    trades = [
+        {"strategy": "Butterfly", "symbol": "SPX", "premium": 3.0, "predicted_price": 5850},
+        {"strategy": "Butterfly", "symbol": "SPX", "premium": 8.0, "predicted_price": 5850},
+    ]
+    resp = client.post("/predict/batch", json={"requests": trades})
+    probs = [p["win_probability"] for p in resp.json()["predictions"]]
+    assert probs == pytest.approx([0.3, 0.8])
+    # Market features were shared between the two orders
+    assert counter["count"] == 1
+
+    stats = api.cache_manager.stats()
+    assert stats["market_size"] == 1
+    assert stats["order_size"] == 2
+
+    client.__exit__(None, None, None)
+
+
+def test_saturated_executor_fails_window_without_per_trade_retries(monkeypatch):
+    client, api, _ = create_client(monkeypatch)
+    attempts = {"jobs": 0, "single": 0}
+
+    async def full(fn, *args, **kwargs):
+        attempts["jobs"] += 1
+        raise api.InferenceOverloaded("queue full")
+
+    async def single(trade, market_data=None):
+        attempts["single"] += 1
+        raise AssertionError("window was retried per trade")
+
+    monkeypatch.setattr(api.inference, "run", full)
+    monkeypatch.setattr(api, "_predict_trade", single)
+    trade = {"strategy": "Butterfly", "symbol": "SPX", "premium": 4.0, "predicted_price": 5850}
+    trades = [api.TradeRequest(**trade), api.TradeRequest(**dict(trade, premium=5.0))]
+
+    with pytest.raises(api.InferenceOverloaded):
+        client.portal.call(api._predict_coalesced, trades)
+    assert attempts == {"jobs": 1, "single": 0}
+
+    client.__exit__(None, None, None)
+
+
+def test_required_market_feed_fails_startup_instead_of_falling_back(monkeypatch):
+    client, api, _ = create_client(monkeypatch, enter=False)
+    monkeypatch.setenv(api.FEED_ENV, "1")
+
+    def missing(name):
+        raise FileNotFoundError(name)
+
+    monkeypatch.setattr(api.MarketFeed, "attach", missing)
+    with pytest.raises(RuntimeError, match="required"):
+        client.__enter__()
+    assert api.market_feed is None
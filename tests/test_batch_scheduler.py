@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(project_root, "src"))
+
+from src.batch_scheduler import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_call():
+    calls = []
+
+    async def handler(items):
+        calls.append(list(items))
+        return [i * 10 for i in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=10, timeout_ms=20)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+    assert results == [0, 10, 20, 30]
+    assert calls == [[0, 1, 2, 3]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["avg_fill"] == 0.4
+    # Nothing was in flight, so the window did not wait for the timeout
+    assert stats["max_queue_delay_ms"] < 15
+
+
+@pytest.mark.asyncio
+async def test_single_submit_is_not_delayed():
+    async def handler(items):
+        return items
+
+    batcher = MicroBatcher(handler, max_batch_size=10, timeout_ms=100)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await batcher.submit(1) == 1
+    assert loop.time() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_submits_during_a_running_batch_are_coalesced():
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(items):
+        calls.append(list(items))
+        if len(calls) == 1:
+            await release.wait()
+        return items
+
+    batcher = MicroBatcher(handler, max_batch_size=10, timeout_ms=10_000)
+    first = asyncio.ensure_future(batcher.submit(0))
+    await asyncio.sleep(0.01)
+    rest = [asyncio.ensure_future(batcher.submit(i)) for i in range(1, 4)]
+    await asyncio.sleep(0.01)
+    assert calls == [[0]]
+
+    # The queued items go out as soon as the running batch finishes
+    release.set()
+    assert await asyncio.wait_for(asyncio.gather(first, *rest), 1) == [0, 1, 2, 3]
+    assert calls == [[0], [1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    sizes = []
+
+    async def handler(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(handler, max_batch_size=3, timeout_ms=10_000)
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(6))), 1)
+
+    assert results == list(range(6))
+    assert sizes == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_delivered_per_item():
+    async def handler(items):
+        return [ValueError("bad") if i == 1 else i for i in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=3, timeout_ms=5)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_handler_failure_reaches_every_caller():
+    async def handler(items):
+        raise RuntimeError("model down")
+
+    batcher = MicroBatcher(handler, max_batch_size=2, timeout_ms=5)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(2)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
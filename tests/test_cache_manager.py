@@ -0,0 +1,88 @@
+import numpy as np
+
+from src import cache_manager as cm
+from src.cache_manager import CacheManager, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_expired_entries_purged_without_reads(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cm.time, "monotonic", clock.monotonic)
+    cache = TTLCache(ttl=10, max_size=100)
+    for i in range(5):
+        cache.set(f"k{i}", i)
+    clock.now += 11
+    cache.set("fresh", 1)
+
+    assert len(cache) == 1
+    assert cache.expired == 5
+
+
+def test_byte_limit_per_namespace():
+    manager = CacheManager(max_size=100)
+    manager.add_namespace("rows", ttl=60, max_bytes=3 * 800)
+    for i in range(5):
+        manager.set("rows", str(i), np.zeros(100))
+
+    stats = manager.stats()
+    assert stats["rows_size"] == 3
+    assert stats["rows_evictions"] == 2
+    assert stats["rows_bytes"] <= 3 * 800
+
+
+def test_prediction_key_hashes_feature_buffer():
+    manager = CacheManager()
+    a = manager.get_prediction_key("SPX", "Butterfly", [0.1, 0.2, 3])
+    b = manager.get_prediction_key("SPX", "Butterfly", np.array([0.1, 0.2, 3.0], dtype=np.float32).astype(np.float64))
+    c = manager.get_prediction_key("SPX", "Butterfly", [0.1, 0.2, 4])
+    assert a == manager.get_prediction_key("SPX", "Butterfly", (0.1, 0.2, 3.0))
+    assert a != c
+    assert b.startswith("pred_SPX_Butterfly_")
+
+
+def test_stats_counters():
+    manager = CacheManager()
+    manager.set_prediction("k", 0.7)
+    assert manager.get_prediction("k") == 0.7
+    assert manager.get_prediction("missing") is None
+    stats = manager.stats()
+    assert stats["prediction_hits"] == 1
+    assert stats["prediction_misses"] == 1
+    assert stats["feature_hits"] == 0
+
+
+def test_market_and_order_keys():
+    cache = CacheManager(market_bar_seconds=300)
+    assert cache.get_market_key("SPX", 600) == cache.get_market_key("SPX", 899) == "market_SPX_600"
+    assert cache.get_market_key("SPX", 900) != cache.get_market_key("SPX", 899)
+
+    a = {"strategy": "Butterfly", "premium": 1.0, "strikes": [1, 2, 3]}
+    b = {"premium": 1.0, "strikes": [1, 2, 3], "strategy": "Butterfly"}
+    assert cache.get_order_key("SPX", a, 0) == cache.get_order_key("SPX", b, 0)
+    assert cache.get_order_key("SPX", a, 0) != cache.get_order_key("SPX", {**a, "premium": 2.0}, 0)
+    assert cache.get_order_key("SPX", a, 0) != cache.get_order_key("SPX", a, 86400 * 2)
+
+    cache.set_market("m", {"SPX_close": 1.0})
+    cache.set_order("o", {"premium_normalized": 0.1})
+    assert cache.get_market("m") == {"SPX_close": 1.0}
+    assert cache.get_order("o") == {"premium_normalized": 0.1}
+    assert "market_hits" in cache.stats() and "order_hits" in cache.stats()
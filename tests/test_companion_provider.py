@@ -0,0 +1,95 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from src.data_providers.companion_provider import CompanionDataProvider
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, bulk=True, malformed=False):
+        self.bulk = bulk
+        self.malformed = malformed
+        self.requests = []
+
+    def request(self, method, url, params=None, json=None):
+        path = url.split("8765", 1)[1]
+        self.requests.append(path)
+        if path == "/api/market_data/quotes":
+            if not self.bulk:
+                return FakeResponse(404, {})
+            if self.malformed:
+                return FakeResponse(200, {"error": "warming up"})
+            symbols = params["symbols"].split(",")
+            return FakeResponse(200, {"quotes": {s: {"last": 10.0} for s in symbols}})
+        if path == "/api/market_data/bars":
+            symbols = params["symbols"].split(",")
+            bars = [{"time": "t", "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 7}]
+            return FakeResponse(200, {"bars": {s: bars for s in symbols}})
+        symbol = path.split("/")[3]
+        return FakeResponse(200, {"last": 20.0, "symbol": symbol})
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoints_cost_one_request_per_data_type():
+    provider = CompanionDataProvider(retry_attempts=1)
+    provider.session = FakeSession()
+    symbols = ["SPX", "SPY", "QQQ"]
+
+    quotes, bars = await asyncio.gather(
+        provider.get_current_price_many(symbols), provider.get_price_data_many(symbols, bars=1)
+    )
+    assert {s: q["last"] for s, q in quotes.items()} == {s: 10.0 for s in symbols}
+    assert bars["SPY"][0]["close"] == 1.5
+    assert sorted(provider.session.requests) == ["/api/market_data/bars", "/api/market_data/quotes"]
+
+
+@pytest.mark.asyncio
+async def test_missing_bulk_endpoint_falls_back_to_per_symbol_requests():
+    provider = CompanionDataProvider(retry_attempts=3)
+    provider.session = FakeSession(bulk=False)
+
+    quotes = await provider.get_current_price_many(["SPX", "SPY"])
+    assert {s: q["last"] for s, q in quotes.items()} == {"SPX": 20.0, "SPY": 20.0}
+    # The 404 is not retried and is remembered for later batches
+    assert provider.session.requests == [
+        "/api/market_data/quotes", "/api/market_data/SPX/quote", "/api/market_data/SPY/quote"
+    ]
+    await provider.get_current_price_many(["SPX", "SPY"])
+    assert provider.session.requests.count("/api/market_data/quotes") == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_bulk_payload_does_not_disable_bulk():
+    provider = CompanionDataProvider(retry_attempts=1)
+    provider.session = FakeSession(malformed=True)
+
+    quotes = await provider.get_current_price_many(["SPX", "SPY"])
+    assert {s: q["last"] for s, q in quotes.items()} == {"SPX": 20.0, "SPY": 20.0}
+
+    provider.session.malformed = False
+    quotes = await provider.get_current_price_many(["SPX", "SPY"])
+    assert {s: q["last"] for s, q in quotes.items()} == {"SPX": 10.0, "SPY": 10.0}
+    assert provider.session.requests.count("/api/market_data/quotes") == 2
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(project_root, "src"))
+
+from src.data_manager import DataManager
+
+
+def make_manager():
+    return DataManager({"standalone": {"enabled": False}})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_market_data_shares_one_fetch(monkeypatch):
+    manager = make_manager()
+    calls = {"count": 0}
+
+    async def fake_fetch(symbol):
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return {"price": 5850.0, "volatility": 0.2, "source": "companion"}
+
+    monkeypatch.setattr(manager, "_fetch_from_companion", fake_fetch)
+    results = await asyncio.gather(*(manager.get_market_data("SPX") for _ in range(10)))
+
+    assert calls["count"] == 1
+    assert all(r["price"] == 5850.0 for r in results)
+    assert manager.coalesced_requests["market_SPX"] == 9
+    assert manager._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch(monkeypatch):
+    manager = make_manager()
+    calls = {"count": 0}
+
+    async def fake_fetch(symbol):
+        calls["count"] += 1
+        await asyncio.sleep(0.02)
+        return {"price": 585.0, "volatility": 0.2, "source": "companion"}
+
+    monkeypatch.setattr(manager, "_fetch_from_companion", fake_fetch)
+    first = asyncio.ensure_future(manager.get_market_data("SPY"))
+    second = asyncio.ensure_future(manager.get_market_data("SPY"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second)["price"] == 585.0
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_one_refresh_runs(monkeypatch):
+    manager = DataManager({
+        "standalone": {"enabled": False},
+        "performance": {"cache": {"market_data_ttl": 0.05, "market_data_hard_ttl": 10}},
+    })
+    calls = {"count": 0}
+    release = asyncio.Event()
+
+    async def fake_fetch(symbol):
+        calls["count"] += 1
+        if calls["count"] > 1:
+            await release.wait()
+        return {"price": 5850.0 + calls["count"], "volatility": 0.2, "source": "companion"}
+
+    monkeypatch.setattr(manager, "_fetch_from_companion", fake_fetch)
+    assert (await manager.get_market_data("SPX"))["price"] == 5851.0
+    await asyncio.sleep(0.06)
+
+    # Past the soft TTL: the old value comes back at once, one refresh starts
+    results = await asyncio.gather(*(manager.get_market_data("SPX") for _ in range(5)))
+    assert [r["price"] for r in results] == [5851.0] * 5
+    assert calls["count"] == 2
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert (await manager.get_market_data("SPX"))["price"] == 5852.0
+    stats = manager.stats()["SPX"]
+    assert stats["stale_serves"] == 5
+    assert stats["refreshes"] == 2
+    assert stats["refresh_ms_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_falls_back_to_mock_when_upstream_fails(monkeypatch):
+    manager = DataManager({
+        "standalone": {"enabled": False},
+        "performance": {"cache": {"market_data_ttl": 0.01, "market_data_hard_ttl": 0.02}},
+    })
+
+    async def failing_fetch(symbol):
+        raise RuntimeError("companion down")
+
+    monkeypatch.setattr(manager, "_fetch_from_companion", failing_fetch)
+    data = await manager.get_market_data("QQQ")
+    assert data["source"] == "mock"
+    stats = manager.stats()["QQQ"]
+    assert (stats["misses"], stats["fallbacks"], stats["refresh_failures"]) == (1, 1, 1)
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.payload
+
+
+class FakeCompanion:
+    """Companion session stub recording each GET."""
+
+    def __init__(self, bulk=True, malformed=False):
+        self.bulk = bulk
+        self.malformed = malformed
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(url)
+        path = url.split("8765", 1)[1]
+        if path == "/market":
+            if not self.bulk:
+                return FakeResponse(404, {})
+            if self.malformed:
+                return FakeResponse(200, {"error": "warming up"})
+            symbols = params["symbols"].split(",")
+            return FakeResponse(200, {"markets": {s: {"price": 100.0} for s in symbols}})
+        return FakeResponse(404, {})
+
+    async def single(self, symbol):
+        self.requests.append(symbol)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return {"price": 101.0, "volatility": 0.2, "source": "companion"}
+
+
+SYMBOLS = ["SPX", "SPY", "QQQ", "IWM", "RUT", "NDX", "AAPL", "TSLA"]
+
+
+@pytest.mark.asyncio
+async def test_market_data_many_uses_one_bulk_request():
+    manager = make_manager()
+    manager._companion_session = FakeCompanion()
+
+    data = await manager.get_market_data_many(SYMBOLS)
+    assert len(manager._companion_session.requests) == 1
+    assert all(data[s]["price"] == 100.0 for s in SYMBOLS)
+
+    # Single-symbol reads are now cache hits
+    assert (await manager.get_market_data("SPX"))["source"] == "companion"
+    assert len(manager._companion_session.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_market_data_many_falls_back_to_bounded_requests(monkeypatch):
+    manager = DataManager({"standalone": {"enabled": False}, "companion": {"max_concurrency": 3}})
+    companion = FakeCompanion(bulk=False)
+    manager._companion_session = companion
+    monkeypatch.setattr(manager, "_fetch_from_companion", companion.single)
+
+    data = await manager.get_market_data_many(SYMBOLS)
+    assert all(data[s]["price"] == 101.0 for s in SYMBOLS)
+    assert companion.requests[0].endswith("/market")
+    assert companion.requests[1:] == SYMBOLS
+    assert companion.max_active == 3
+
+    # Missing bulk support is remembered
+    manager.cache.clear()
+    await manager.get_market_data_many(SYMBOLS[:2])
+    assert companion.requests[-2:] == SYMBOLS[:2]
+    assert sum(r.endswith("/market") for r in companion.requests if "/" in r) == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_bulk_payload_is_not_remembered(monkeypatch):
+    manager = make_manager()
+    companion = FakeCompanion(malformed=True)
+    manager._companion_session = companion
+    monkeypatch.setattr(manager, "_fetch_from_companion", companion.single)
+
+    data = await manager.get_market_data_many(SYMBOLS[:2])
+    assert all(data[s]["price"] == 101.0 for s in SYMBOLS[:2])
+
+    # A bad 200 is a one-off failure: the next batch tries bulk again
+    companion.malformed = False
+    data = await manager.get_market_data_many(SYMBOLS[2:4])
+    assert all(data[s]["price"] == 100.0 for s in SYMBOLS[2:4])
+    assert sum(r.endswith("/market") for r in companion.requests if "/" in r) == 2
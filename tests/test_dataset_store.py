@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow.compute as pc
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from src.data.dataset_store import (
+    dataset_symbols,
+    is_dataset,
+    read_split,
+    read_trades,
+    write_dataset,
+)
+from split_data_by_symbol import split_data_by_symbol
+
+
+def make_trades():
+    return pd.DataFrame({
+        'date': ['2025-01-02'] * 6,
+        'symbol': ['SPX', 'SPX', 'NDX', 'NDX', 'RUT', 'SPX'],
+        'strategy': ['Butterfly', 'Iron Condor', 'Butterfly', 'Vertical', 'Sonar', 'Butterfly'],
+        'premium': ['1.5', '2', 'bad', '3', '4', '5'],
+        'profit': [10, -5, 3, -1, 2, 7],
+    })
+
+
+def test_csv_and_dataset_reads_agree(tmp_path):
+    csv_file = tmp_path / 'trades.csv'
+    make_trades().to_csv(csv_file, index=False)
+    root = tmp_path / 'dataset'
+
+    write_dataset(read_trades(csv_file), root)
+    assert is_dataset(root)
+    assert not is_dataset(tmp_path)
+    assert dataset_symbols(root) == ['NDX', 'RUT', 'SPX']
+    # Strategy names with spaces survive the partition path round trip
+    assert (root / 'symbol=SPX').exists()
+
+    from_csv = read_trades(csv_file, symbols=['SPX'])
+    from_ds = read_trades(root, symbols=['SPX'])
+    assert from_ds['premium'].dtype == 'float64'
+    assert sorted(from_ds['strategy']) == sorted(from_csv['strategy']) == ['Butterfly', 'Butterfly', 'Iron Condor']
+    assert sorted(from_ds['profit']) == sorted(from_csv['profit'])
+
+    ndx = read_trades(root, symbols=['NDX'], columns=['strategy', 'premium'])
+    assert list(ndx.columns) == ['strategy', 'premium']
+    assert ndx['premium'].isna().sum() == 1
+
+    winners = read_trades(root, strategies=['Butterfly'], filter=pc.field('profit') > 5)
+    assert sorted(winners['profit']) == [7, 10]
+
+
+def test_split_data_by_symbol_writes_dataset(tmp_path):
+    csv_file = tmp_path / 'trades.csv'
+    make_trades().to_csv(csv_file, index=False)
+
+    stats = split_data_by_symbol(str(csv_file), str(tmp_path / 'out'), str(tmp_path / 'dataset'))
+    assert stats['SPX']['total_trades'] == 3
+    assert (tmp_path / 'out' / 'SPX_trades.csv').exists()
+
+    # The dataset can be used as input in place of the CSV
+    again = split_data_by_symbol(str(tmp_path / 'dataset'), str(tmp_path / 'out2'))
+    assert again == stats
+
+
+def test_read_split_prefers_parquet(tmp_path):
+    df = pd.DataFrame({'target': [0, 1], 'x': [0.5, 1.5]})
+    df.assign(x=[9.0, 9.0]).to_csv(tmp_path / 'train_data.csv', index=False)
+    assert read_split(tmp_path, 'train')['x'].tolist() == [9.0, 9.0]
+    df.to_parquet(tmp_path / 'train_data.parquet', index=False)
+    assert read_split(tmp_path, 'train')['x'].tolist() == [0.5, 1.5]
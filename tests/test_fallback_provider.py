@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from src.data_providers.fallback_provider import FallbackDataProvider
+
+
+class FakeProvider:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def connect(self):
+        return True
+
+    async def disconnect(self):
+        pass
+
+    async def is_connected(self):
+        return True
+
+    async def get_current_price(self, symbol):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return {"symbol": symbol, "last": 1.0, "source": self.name}
+
+    async def health_check(self):
+        return {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged():
+    primary = FakeProvider("primary", delay=1.0)
+    fallback = FakeProvider("fallback", delay=0.01)
+    provider = FallbackDataProvider(primary, fallback, hedge_delay=0.02)
+    await provider.connect()
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await provider.get_current_price("SPX")
+    assert result["source"] == "fallback"
+    assert loop.time() - start < 0.5
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1
+
+    health = await provider.health_check()
+    assert health["fallback"]["requests"]["hedge_wins"] == 1
+    assert health["current_provider"] == "FakeProvider"
+
+
+@pytest.mark.asyncio
+async def test_failing_primary_opens_circuit():
+    primary = FakeProvider("primary", fail=True)
+    fallback = FakeProvider("fallback")
+    provider = FallbackDataProvider(primary, fallback, failure_threshold=2, cooldown=0.05)
+    await provider.connect()
+
+    for _ in range(2):
+        assert (await provider.get_current_price("SPX"))["source"] == "fallback"
+    assert primary.calls == 2
+
+    # Circuit open: the primary is skipped entirely
+    assert (await provider.get_current_price("SPX"))["source"] == "fallback"
+    assert primary.calls == 2
+    health = await provider.health_check()
+    assert health["status"] == "degraded"
+    assert health["primary"]["requests"]["circuit"] == "open"
+
+    # After the cooldown the primary gets a trial request again
+    primary.fail = False
+    await asyncio.sleep(0.06)
+    assert (await provider.get_current_price("SPX"))["source"] == "primary"
+    assert (await provider.health_check())["primary"]["requests"]["circuit"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_both_failing_raises():
+    provider = FallbackDataProvider(FakeProvider("a", fail=True), FakeProvider("b", fail=True))
+    await provider.connect()
+    with pytest.raises(RuntimeError):
+        await provider.get_current_price("SPX")
@@ -4,6 +4,9 @@ import os
 import sys
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 import types
@@ -19,7 +22,7 @@ base_module.BaseDataProvider = BaseDataProvider
 sys.modules['data_providers'] = types.ModuleType('data_providers')
 sys.modules['data_providers.base_provider'] = base_module
 
-from src.feature_engineering.real_time_features import RealTimeFeatureGenerator
+from src.feature_engineering.real_time_features import FeaturePlan, RealTimeFeatureGenerator
 
 class DummyProvider:
     async def connect(self) -> bool:
@@ -121,3 +124,77 @@ def test_risk_reward_ratio_positive():
     idx = names.index("risk_reward_ratio")
     assert feats[idx] > 0
 
+
+
+class CountingProvider(DummyProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def get_price_data(self, symbol: str, bars: int = 100, interval: str = "5 mins"):
+        self.calls += 1
+        return await super().get_price_data(symbol, bars, interval)
+
+    async def get_current_price(self, symbol: str):
+        self.calls += 1
+        return {"last": 2}
+
+
+def test_market_context_serves_requests_without_io():
+    async def run():
+        provider = CountingProvider()
+        gen = RealTimeFeatureGenerator(provider, feature_info_path="data/phase1_processed/feature_info.json")
+        gen.context_max_age = 30
+        await gen.refresh_contexts(["SPX"])
+        context = gen.get_context("SPX")
+        assert context.features["SPX_close"] == 2
+        assert context.features["vix_regime_normal"] == 1.0
+
+        calls = provider.calls
+        order = {"strategy": "Vertical", "premium": 1, "predicted_price": 1, "risk": -10, "reward": 20}
+        feats, names = await gen.generate_features("SPX", order)
+        assert provider.calls == calls
+        assert feats[names.index("risk_reward_ratio")] == 2.0
+
+        # Snapshots are immutable and replaced as a whole
+        old = context
+        await gen.refresh_contexts(["SPX"])
+        assert gen.get_context("SPX") is not old
+        with pytest.raises(TypeError):
+            old.features["SPX_close"] = 0
+
+        gen.context_max_age = 0
+        await gen.generate_features("SPX", order)
+        assert provider.calls > calls
+
+    asyncio.run(run())
+
+
+def test_feature_plan_maps_symbol_aliases(tmp_path):
+    plan = FeaturePlan("NDX", ["hour", "SPX_close", "NDX_rsi", "SPX_rsi", "vix"])
+    row = plan.write(plan.new_row(), {"NDX_close": 2.5, "NDX_rsi": 40, "vix": None, "unused": 9})
+    assert row.dtype == np.float32
+    # Exact names win over the SPX_ alias; missing and None values are 0
+    assert row.tolist() == [0.0, 2.5, 40.0, 0.0, 0.0]
+
+    gen = RealTimeFeatureGenerator(
+        DummyProvider(), feature_info_path="data/phase1_processed/feature_info.json", feature_dir=str(tmp_path)
+    )
+    assert gen.get_plan("SPX") is gen.get_plan("SPX")
+    batch = np.full((2, gen.get_plan("SPX").n_features + 3), 7, dtype=np.float32)
+    feats, names = gen.assemble_features("SPX", {"SPX_close": 3.0}, {"premium": 1.0}, out=batch[1])
+    assert np.shares_memory(feats, batch)
+    assert batch[1, names.index("SPX_close")] == 3.0
+    assert batch[1, -1] == 0.0
+
+
+def test_request_symbols_kept_warm_up_to_cap():
+    async def run():
+        gen = RealTimeFeatureGenerator(DummyProvider(), feature_info_path="data/phase1_processed/feature_info.json")
+        gen.max_context_symbols = 2
+        for symbol in ["SPX", "SPY", "XYZ1", "XYZ2"]:
+            features, complete = await gen.generate_market_features(symbol)
+            assert complete and features
+        assert gen.context_symbols == {"SPX", "SPY"}
+        assert set(gen._contexts) == {"SPX", "SPY"}
+
+    asyncio.run(run())
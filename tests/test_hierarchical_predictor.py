@@ -40,3 +40,59 @@ def test_feature_truncation_warning(caplog):
         assert "Feature mismatch for SPX_Butterfly" in caplog.text
     assert proba == 0.7
 
+
+
+class CountingModel(DummyModel):
+    def __init__(self, value: float):
+        super().__init__(value)
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return super().predict_proba(X)
+
+
+def test_batch_groups_rows_by_model():
+    predictor = HierarchicalPredictor()
+    spx = CountingModel(0.8)
+    default = CountingModel(0.2)
+    predictor.symbol_models = {"SPX": spx}
+    predictor.default_model = default
+
+    symbols = ["SPX", "QQQ", "SPX", "RUT"]
+    strategies = ["Butterfly", "Vertical", "Sonar", "Butterfly"]
+    proba = predictor.predict_proba_batch(symbols, strategies, np.zeros((4, 3)))
+
+    assert list(proba[:, 1]) == [0.8, 0.2, 0.8, 0.2]
+    assert spx.calls == 1
+    assert default.calls == 1
+
+
+def test_compiled_routes_describe_levels():
+    predictor = HierarchicalPredictor()
+    predictor.symbol_strategy_models = {"SPX_Butterfly": FeatureLimitedModel(0.8, 3)}
+    predictor.symbol_models = {"SPX": DummyModel(0.6)}
+    predictor.default_model = DummyModel(0.2)
+    predictor.compile(symbols=["QQQ"])
+
+    routes = predictor.describe()
+    assert routes["SPX_Butterfly"] == {"level": "symbol_strategy", "model": "SPX_Butterfly", "n_features": 3}
+    assert routes["SPX_Vertical"]["level"] == "symbol"
+    assert routes["QQQ_Sonar"]["level"] == "default"
+
+    route = predictor.route("SPX", "Butterfly")
+    assert route.columns == slice(0, 3)
+    assert predictor.predict_proba("SPX", "Butterfly", np.zeros((1, 5)))[0][1] == 0.8
+
+
+def test_unknown_pairs_are_not_memoized():
+    predictor = HierarchicalPredictor()
+    predictor.symbol_models = {"SPX": DummyModel(0.6)}
+    predictor.default_model = DummyModel(0.2)
+    predictor.compile()
+    n_routes = len(predictor.describe())
+
+    for i in range(50):
+        assert predictor.predict_proba(f"SYM{i}", f"Strategy{i}", [[0]])[0][1] == 0.2
+        assert predictor.predict_proba("SPX", f"Strategy{i}", [[0]])[0][1] == 0.6
+    assert len(predictor.describe()) == n_routes
@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.historical_scheduler import (
+    PRIORITY_BACKFILL,
+    PRIORITY_LIVE,
+    PRIORITY_WARMUP,
+    HistoricalRequestScheduler,
+)
+
+
+class FakeEvent:
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self.handlers.remove(handler)
+        return self
+
+    def emit(self, *args):
+        for handler in list(self.handlers):
+            handler(*args)
+
+
+class FakeIB:
+    """Records historical requests; optionally signals one pacing violation."""
+
+    def __init__(self, violate_first=False):
+        self.errorEvent = FakeEvent()
+        self.sent = []
+        self.violate_first = violate_first
+
+    async def reqHistoricalDataAsync(self, contract, **params):
+        self.sent.append((contract.symbol, params["barSizeSetting"]))
+        await asyncio.sleep(0.001)
+        if self.violate_first:
+            self.violate_first = False
+            self.errorEvent.emit(1, 162, "Historical Market Data Service error message:API historical data query cancelled: pacing violation", contract)
+            return []
+        return [contract.symbol]
+
+
+def contract(symbol):
+    return SimpleNamespace(conId=0, secType="IND", symbol=symbol, exchange="CBOE", currency="USD")
+
+
+@pytest.mark.asyncio
+async def test_priorities_and_token_bucket():
+    ib = FakeIB()
+    scheduler = HistoricalRequestScheduler(ib, rate=50, burst=1)
+
+    backfill = [
+        asyncio.ensure_future(scheduler.request(contract(s), PRIORITY_BACKFILL, barSizeSetting="1 day"))
+        for s in ("AAPL", "TSLA")
+    ]
+    warmup = asyncio.ensure_future(scheduler.request(contract("SPY"), PRIORITY_WARMUP, barSizeSetting="5 mins"))
+    live = asyncio.ensure_future(scheduler.request(contract("SPX"), PRIORITY_LIVE, barSizeSetting="5 mins"))
+    await asyncio.gather(*backfill, warmup, live)
+
+    # Queued together, live goes first and backfill last
+    assert [s for s, _ in ib.sent] == ["SPX", "SPY", "AAPL", "TSLA"]
+    stats = scheduler.stats()
+    assert stats["dispatched"] == 4
+    assert stats["queued"] == 0
+    assert stats["max_wait_ms"] >= 20
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_deduplicated():
+    ib = FakeIB()
+    scheduler = HistoricalRequestScheduler(ib)
+
+    results = await asyncio.gather(
+        *(scheduler.request(contract("SPX"), barSizeSetting="5 mins") for _ in range(5))
+    )
+    assert results == [["SPX"]] * 5
+    # Repeats inside the identical-request window are answered locally
+    assert await scheduler.request(contract("SPX"), barSizeSetting="5 mins") == ["SPX"]
+    assert len(ib.sent) == 1
+    stats = scheduler.stats()
+    assert (stats["deduplicated"], stats["recent_hits"]) == (4, 1)
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_per_contract_limit_and_pacing_backoff():
+    ib = FakeIB(violate_first=True)
+    scheduler = HistoricalRequestScheduler(
+        ib, rate=100, max_per_contract=2, contract_window=0.05, pacing_backoff=0.05
+    )
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await asyncio.gather(
+        *(scheduler.request(contract("SPX"), barSizeSetting=size) for size in ("1 min", "5 mins", "1 hour"))
+    )
+    # The violated request was retried after the backoff
+    assert results == [["SPX"]] * 3
+    assert scheduler.violations == 1
+    assert len(ib.sent) == 4
+    assert loop.time() - start >= 0.05
+    await scheduler.close()
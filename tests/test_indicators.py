@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering.indicators import IndicatorEngine, add_price_indicators
+
+
+def make_bars(n: int = 300, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 5850 + np.cumsum(rng.normal(0, 3, n))
+    times = pd.date_range("2025-07-01 09:30", periods=n, freq="5min")
+    return [
+        {
+            "time": t.isoformat(),
+            "open": c,
+            "high": c + abs(rng.normal(0, 2)),
+            "low": c - abs(rng.normal(0, 2)),
+            "close": c,
+            "volume": 0,
+        }
+        for t, c in zip(times, close)
+    ]
+
+
+def test_streaming_matches_offline_indicators():
+    bars = make_bars()
+    offline = add_price_indicators(pd.DataFrame(bars))
+
+    engine = IndicatorEngine()
+    # Provider returns overlapping 100-bar windows as time advances
+    for end in range(100, len(bars) + 1, 7):
+        engine.update("SPX", bars[max(0, end - 100):end])
+    engine.update("SPX", bars[-100:])
+
+    snap = engine.snapshot("SPX")
+    last = offline.iloc[-1]
+    for name in ["sma_20", "momentum_5", "volatility_20", "rsi", "price_position"]:
+        assert np.isclose(snap[name], last[name], rtol=1e-9, atol=1e-9), name
+
+
+def test_update_only_pushes_new_bars():
+    bars = make_bars(60)
+    engine = IndicatorEngine()
+    assert engine.update("SPX", bars[:50]) == 50
+    assert engine.update("SPX", bars[:50]) == 0
+    assert engine.update("SPX", bars[10:55]) == 5
+
+
+def test_gap_rebuilds_state():
+    bars = make_bars(200)
+    engine = IndicatorEngine()
+    engine.update("SPX", bars[:50])
+    engine.update("SPX", bars[100:200])
+
+    offline = add_price_indicators(pd.DataFrame(bars[100:200]))
+    assert np.isclose(engine.snapshot("SPX")["sma_20"], offline["sma_20"].iloc[-1])
+
+
+def test_forming_bar_is_replaced_when_resent():
+    bars = make_bars(60)
+    engine = IndicatorEngine()
+    forming = dict(bars[49], close=bars[49]["close"] + 25, high=bars[49]["high"] + 25)
+    assert engine.update("SPX", bars[:49] + [forming]) == 50
+
+    # Same timestamp, final close: replaces the forming bar instead of being dropped
+    assert engine.update("SPX", bars[10:50]) == 0
+    offline = add_price_indicators(pd.DataFrame(bars[:50]))
+    snap = engine.snapshot("SPX")
+    for name in ["sma_20", "momentum_5", "volatility_20", "rsi", "price_position"]:
+        assert np.isclose(snap[name], offline[name].iloc[-1], rtol=1e-9, atol=1e-9), name
+
+    assert engine.update("SPX", bars[20:60]) == 10
+    offline = add_price_indicators(pd.DataFrame(bars))
+    assert np.isclose(engine.snapshot("SPX")["rsi"], offline["rsi"].iloc[-1], rtol=1e-9, atol=1e-9)
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(project_root, "src"))
+
+from src.inference_executor import InferenceExecutor, InferenceOverloaded, InferenceTimeout
+
+
+@pytest.mark.asyncio
+async def test_runs_off_the_event_loop():
+    executor = InferenceExecutor(max_workers=2)
+    loop_thread = threading.get_ident()
+    thread = await executor.run(threading.get_ident)
+    assert thread != loop_thread
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_queue_depth():
+    executor = InferenceExecutor(max_workers=4, max_concurrency=2)
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    await asyncio.gather(*(executor.run(work) for _ in range(6)))
+    stats = executor.stats()
+    assert running["peak"] == 2
+    assert stats["max_waiting"] == 4
+    assert stats["completed"] == 6
+    assert stats["in_flight"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_deadline_keeps_slot_until_job_finishes():
+    executor = InferenceExecutor(max_workers=1, deadline_ms=20)
+    with pytest.raises(InferenceTimeout):
+        await executor.run(time.sleep, 0.1)
+    # The abandoned job still holds the only slot
+    assert executor.stats()["in_flight"] == 1
+    with pytest.raises(InferenceTimeout):
+        await executor.run(lambda: None)
+    await asyncio.sleep(0.15)
+    assert await executor.run(lambda: 42, deadline_ms=0) == 42
+    assert executor.stats()["timeouts"] == 2
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    first = asyncio.ensure_future(executor.run(time.sleep, 0.05))
+    second = asyncio.ensure_future(executor.run(lambda: None))
+    await asyncio.sleep(0.01)
+    with pytest.raises(InferenceOverloaded):
+        await executor.run(lambda: None)
+    await asyncio.gather(first, second)
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate():
+    executor = InferenceExecutor(max_workers=1)
+
+    def boom():
+        raise ValueError("bad row")
+
+    with pytest.raises(ValueError):
+        await executor.run(boom)
+    assert executor.stats()["failed"] == 1
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+
+def test_process_pool_is_not_offered():
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="process")
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from src.market_feed import FeedDataManager, MarketFeed
+
+
+@pytest.fixture
+def feed(request):
+    feed = MarketFeed.create(
+        ["SPX", "SPY"], name=f"m8test_{os.getpid()}_{request.node.name[:20]}", n_bars=5, max_features=8
+    )
+    yield feed
+    feed.close()
+    feed.unlink()
+
+
+def _bars(n, close=1.0):
+    return [
+        {"time": f"2025-07-01T10:{i:02d}:00", "open": 1, "high": 2, "low": 0.5, "close": close, "volume": 10}
+        for i in range(n)
+    ]
+
+
+def test_worker_reads_published_records(feed):
+    reader = MarketFeed.attach(feed.name)
+    assert reader.read("SPY") is None
+
+    feed.publish(
+        "SPY",
+        market={"price": 585.0, "volatility": 0.2, "source": "ibkr"},
+        bars=_bars(7),
+        features={"SPY_close": 585.0, "vix": 17.0, "SPY_rsi": None},
+    )
+    feed.publish("VIX", vix={"last": 17.0, "change": 0.5})
+
+    snapshot = reader.read("SPY")
+    assert snapshot.market == {"price": 585.0, "volatility": 0.2, "source": "ibkr"}
+    assert [b["time"] for b in snapshot.bars] == [f"2025-07-01T10:{i:02d}:00" for i in range(2, 7)]
+    assert snapshot.features == {"SPY_close": 585.0, "vix": 17.0}
+    assert reader.read("VIX").vix["change"] == 0.5
+    assert reader.read("QQQ") is None
+    assert reader.read("SPY", max_age=-1) is None
+    reader.close()
+
+
+def _hammer(feed, n):
+    for i in range(1, n + 1):
+        feed.publish("SPX", market={"price": i, "volatility": i}, bars=_bars(5, close=i))
+
+
+def test_seqlock_readers_never_see_torn_records(feed):
+    feed.publish("SPX", market={"price": 0, "volatility": 0}, bars=_bars(5, close=0))
+    writer = multiprocessing.get_context("fork").Process(target=_hammer, args=(feed, 3000))
+    writer.start()
+    reader = MarketFeed.attach(feed.name)
+    reads = 0
+    while writer.is_alive() or reads == 0:
+        snapshot = reader.read("SPX")
+        if snapshot is None:
+            continue
+        market = snapshot.market
+        assert market["price"] == market["volatility"]
+        assert {b["close"] for b in snapshot.bars} == {market["price"]}
+        reads += 1
+    writer.join()
+    assert writer.exitcode == 0
+    assert reader.read("SPX").market["price"] == 3000
+    reader.close()
+
+
+class FakeFallback:
+    def __init__(self):
+        self.calls = []
+
+    async def get_market_data_many(self, symbols, **kwargs):
+        self.calls.append(("market", tuple(symbols)))
+        return {s: {"price": 1.0, "volatility": 0.2, "source": "companion"} for s in symbols}
+
+    async def get_price_data_many(self, symbols, bars=100, interval="5 mins", **kwargs):
+        self.calls.append(("bars", tuple(symbols), bars, interval))
+        return {s: [] for s in symbols}
+
+    def stats(self):
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_feed_data_manager_falls_back_for_missing_and_stale(feed):
+    feed.publish("SPX", market={"price": 5850.0, "volatility": 0.2, "source": "ibkr"}, bars=_bars(5))
+    feed.heartbeat()
+    fallback = FakeFallback()
+    manager = FeedDataManager(MarketFeed.attach(feed.name), fallback, max_age=10)
+
+    data = await manager.get_market_data_many(["SPX", "QQQ"])
+    assert data["SPX"]["price"] == 5850.0
+    assert data["QQQ"]["source"] == "companion"
+    assert fallback.calls == [("market", ("QQQ",))]
+
+    assert len(await manager.get_price_data("SPX", bars=3)) == 3
+    await manager.get_price_data("SPX", bars=50)
+    await manager.get_price_data("SPX", bars=3, interval="1 min")
+    assert fallback.calls[1:] == [("bars", ("SPX",), 50, "5 mins"), ("bars", ("SPX",), 3, "1 min")]
+
+    manager.max_age = 0.01
+    time.sleep(0.02)
+    await manager.get_market_data("SPX")
+    assert fallback.calls[-1] == ("market", ("SPX",))
+    assert manager.stats()["feed"]["hits"] == 2
+    manager.feed.close()
@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+import joblib
+import numpy as np
+
+from src.models.hierarchical_predictor import HierarchicalPredictor
+from src.models.model_registry import LazyModelRegistry, pairs_from_prediction_log
+
+
+class FeatureLimitedModel:
+    def __init__(self, value: float, n_features: int):
+        self.value = value
+        self.n_features_in_ = n_features
+
+    def predict_proba(self, X):
+        assert len(X[0]) == self.n_features_in_
+        return [[1 - self.value, self.value] for _ in range(len(X))]
+
+
+def _files(tmp_path, sizes):
+    paths = {}
+    for key, size in sizes.items():
+        path = tmp_path / f"{key}_model.pkl"
+        path.write_bytes(b"x" * size)
+        paths[key] = str(path)
+    return paths
+
+
+def test_registry_loads_on_demand_and_evicts_least_recently_used(tmp_path):
+    loaded = []
+
+    def loader(path):
+        loaded.append(path)
+        return object()
+
+    paths = _files(tmp_path, {"A": 100, "B": 100, "C": 100})
+    registry = LazyModelRegistry(paths, loader, memory_budget=250)
+    assert len(registry) == 3 and loaded == []
+
+    registry.get("A")
+    registry.get("B")
+    registry.get("A")
+    registry.get("C")
+    assert registry.loaded() == ["A", "C"]
+    assert loaded == [paths["A"], paths["B"], paths["C"]]
+
+    stats = registry.stats()
+    assert (stats["loads"], stats["hits"], stats["evictions"], stats["bytes"]) == (3, 1, 1, 200)
+    assert stats["slowest_load"]["model"] in paths
+
+
+def test_preload_stops_at_budget(tmp_path):
+    paths = _files(tmp_path, {"A": 100, "B": 100, "C": 100})
+    registry = LazyModelRegistry(paths, lambda path: object(), memory_budget=250)
+    registry.start_preload(["C", "missing", "A", "B"]).join()
+    assert registry.loaded() == ["C", "A"]
+    assert registry.evictions == 0
+
+
+def test_pairs_from_prediction_log_keeps_today_by_frequency(tmp_path):
+    log = tmp_path / "predictions.jsonl"
+    entries = [
+        ("2025-07-01T09:30:00", "SPX", "Butterfly"),
+        ("2025-07-02T09:30:00", "SPY", "Vertical"),
+        ("2025-07-02T09:31:00", "SPX", "Iron Condor"),
+        ("2025-07-02T09:32:00", "SPY", "Vertical"),
+    ]
+    lines = [json.dumps({"timestamp": t, "symbol": s, "strategy": k}) for t, s, k in entries]
+    log.write_text("\n".join(lines + ["not json"]) + "\n")
+
+    assert pairs_from_prediction_log(str(log), day=date(2025, 7, 2)) == ["SPY_Vertical", "SPX_Iron Condor"]
+    assert pairs_from_prediction_log(str(tmp_path / "missing.jsonl")) == []
+
+
+def test_lazy_predictor_routes_without_loading(tmp_path):
+    spx = tmp_path / "SPX_Butterfly_model.pkl"
+    joblib.dump(FeatureLimitedModel(0.8, 3), spx)
+    spy = tmp_path / "SPY_Vertical_model.pkl"
+    joblib.dump(FeatureLimitedModel(0.7, 2), spy)
+
+    predictor = HierarchicalPredictor(
+        symbol_strategy_paths={"SPX_Butterfly": str(spx), "SPY_Vertical": str(spy)},
+        lazy=True,
+        memory_budget=1,
+    )
+    registry = predictor.symbol_strategy_models
+    assert registry.loaded() == []
+    assert "SPX_Butterfly" not in predictor.describe()
+
+    assert predictor.predict_proba("SPX", "Butterfly", np.zeros((1, 5)))[0][1] == 0.8
+    assert predictor.predict_proba("SPY", "Vertical", np.zeros((1, 5)))[0][1] == 0.7
+    # Over budget: only the latest model stays, yet routes keep working
+    assert registry.loaded() == ["SPY_Vertical"]
+    assert predictor.describe()["SPX_Butterfly"]["n_features"] == 3
+    proba = predictor.predict_proba_batch(["SPX", "SPY"], ["Butterfly", "Vertical"], np.zeros((2, 5)))
+    assert list(proba[:, 1]) == [0.8, 0.7]
+    assert registry.stats()["loads"] == 4
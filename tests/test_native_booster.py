@@ -0,0 +1,34 @@
+import numpy as np
+import xgboost as xgb
+
+from src.models.hierarchical_predictor import HierarchicalPredictor
+from src.models.model_wrappers import NativeBoosterModel, native_parity
+
+
+def test_native_matches_sklearn_classifier():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 5))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    clf = xgb.XGBClassifier(n_estimators=10, max_depth=3)
+    clf.fit(X, y)
+
+    native = NativeBoosterModel.from_model(clf)
+    assert native.n_features_in_ == 5
+    np.testing.assert_allclose(native.predict_proba(X[:10]), clf.predict_proba(X[:10]), atol=1e-6)
+    assert native_parity(clf, native) < 1e-6
+
+
+def test_hierarchical_predictor_native_mode():
+    predictor = HierarchicalPredictor(
+        symbol_paths={"SPX": "models/individual/SPX_trades_model.pkl"},
+        native=True,
+        parity_check=True,
+    )
+    model = predictor.symbol_models["SPX"]
+    assert isinstance(model, NativeBoosterModel)
+    assert predictor.parity["models/individual/SPX_trades_model.pkl"] < 1e-5
+
+    X = np.zeros((3, model.n_features_in_))
+    proba = predictor.predict_proba("SPX", "Butterfly", X)
+    assert proba.shape == (3, 2)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
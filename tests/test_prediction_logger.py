@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(project_root, "src"))
+
+from src.utils.prediction_logger import PredictionLogger, with_prediction_logging
+
+
+class Result:
+    win_probability = 0.7
+    confidence = 0.4
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_entries_are_written_in_batches(tmp_path, monkeypatch):
+    log = PredictionLogger(str(tmp_path / "p.jsonl"), batch_size=10, flush_interval=0.05)
+    writes = []
+    original = log._write_lines
+    monkeypatch.setattr(log, "_write_lines", lambda lines: (writes.append(len(lines)), original(lines)))
+
+    for i in range(25):
+        await log.log_prediction({"symbol": "SPX", "strategy": "Butterfly", "premium": i}, Result())
+    # Nothing is written on the request path
+    assert not (tmp_path / "p.jsonl").exists()
+
+    await log.close()
+    entries = read_lines(tmp_path / "p.jsonl")
+    assert [e["premium"] for e in entries] == list(range(25))
+    assert writes == [10, 10, 5]
+    assert log.stats()["written"] == 25
+
+
+@pytest.mark.asyncio
+async def test_time_based_flush(tmp_path):
+    log = PredictionLogger(str(tmp_path / "p.jsonl"), batch_size=100, flush_interval=0.01)
+    await log.log_prediction({"symbol": "SPX"}, Result())
+    await asyncio.sleep(0.1)
+    assert len(read_lines(tmp_path / "p.jsonl")) == 1
+    await log.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy,kept", [("drop_oldest", [2, 3]), ("drop_newest", [0, 1])])
+async def test_overflow_policies(tmp_path, policy, kept):
+    log = PredictionLogger(str(tmp_path / "p.jsonl"), max_queue=2, overflow=policy)
+    # Keep the writer stopped so the queue fills up
+    log.start = lambda: None
+    for i in range(4):
+        await log.log_prediction({"symbol": "SPX", "premium": i}, Result())
+    assert log.dropped == 2
+    PredictionLogger.start(log)
+    await log.close()
+    assert [e["premium"] for e in read_lines(tmp_path / "p.jsonl")] == kept
+
+
+@pytest.mark.asyncio
+async def test_rotation(tmp_path):
+    path = tmp_path / "p.jsonl"
+    log = PredictionLogger(str(path), batch_size=1, max_bytes=200, backup_count=2)
+    for i in range(6):
+        await log.log_prediction({"symbol": "SPX", "premium": i}, Result())
+        await log.flush()
+    await log.close()
+    assert log.rotations >= 2
+    assert (tmp_path / "p.jsonl.1").exists()
+    assert (tmp_path / "p.jsonl.2").exists()
+    assert not (tmp_path / "p.jsonl.3").exists()
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        PredictionLogger("logs/p.jsonl", overflow="spill")
+
+
+@pytest.mark.asyncio
+async def test_decorator_exposes_logger_for_shutdown(tmp_path):
+    path = tmp_path / "p.jsonl"
+
+    @with_prediction_logging(str(path))
+    async def predict_order(order):
+        return Result()
+
+    await predict_order({"symbol": "SPX", "strategy": "Butterfly"})
+    await predict_order.logger.close()
+    assert [e["symbol"] for e in read_lines(path)] == ["SPX"]
+    assert predict_order.__name__ == "predict_order"
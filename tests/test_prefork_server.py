@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from src import prefork_server
+from src.prefork_server import MASTER_ENV, child_pids, memory_report, parse_smaps_rollup, process_memory
+
+SMAPS = """\
+00400000-7ffd1c9f2000 ---p 00000000 00:00 0                              [rollup]
+Rss:              204800 kB
+Pss:              120000 kB
+Shared_Clean:     150000 kB
+Shared_Dirty:       4800 kB
+Private_Clean:      2000 kB
+Private_Dirty:     48000 kB
+Referenced:       204800 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup_reports_unique_set_size():
+    memory = parse_smaps_rollup(SMAPS)
+    assert memory == {
+        "rss_bytes": 204800 * 1024,
+        "pss_bytes": 120000 * 1024,
+        "swap_bytes": 0,
+        "uss_bytes": 50000 * 1024,
+        "shared_bytes": 154800 * 1024,
+    }
+
+
+def _wait(event):
+    event.wait(10)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs /proc smaps_rollup")
+def test_memory_report_lists_forked_workers(monkeypatch):
+    ctx = multiprocessing.get_context("fork")
+    done = ctx.Event()
+    workers = [ctx.Process(target=_wait, args=(done,)) for _ in range(2)]
+    for w in workers:
+        w.start()
+    try:
+        monkeypatch.setenv(MASTER_ENV, str(os.getpid()))
+        report = memory_report()
+        pids = {p["pid"]: p for p in report["processes"]}
+        assert pids[os.getpid()]["role"] == "master"
+        assert {w.pid for w in workers} <= set(pids)
+        for w in workers:
+            # Forked from this process, so most of the worker's pages are shared
+            assert pids[w.pid]["uss_bytes"] < pids[w.pid]["rss_bytes"]
+        assert report["total_rss_bytes"] >= sum(p["rss_bytes"] for p in pids.values()) > 0
+    finally:
+        done.set()
+        for w in workers:
+            w.join()
+
+    monkeypatch.delenv(MASTER_ENV)
+    report = memory_report()
+    assert [p["pid"] for p in report["processes"]] == [os.getpid()]
+
+
+def _pid_worker(app, sock, log_level):
+    # Stands in for uvicorn: answer every connection with the worker pid
+    while True:
+        conn, _ = sock.accept()
+        with conn:
+            conn.sendall(f"{os.getpid()}\n".encode())
+
+
+def _serve(port):
+    prefork_server._run_worker = _pid_worker
+    ballast = []
+
+    def preload():
+        ballast.append(np.ones(64 * 2**20 // 8))
+
+    prefork_server.serve(None, preload, workers=2, host="127.0.0.1", port=port, restart_delay=0.05)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.05)
+    raise AssertionError("timed out")
+
+
+def _ask(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=1) as conn:
+            return int(conn.makefile().readline())
+    except (OSError, ValueError):
+        return None
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs /proc smaps_rollup")
+def test_serve_shares_preload_and_replaces_dead_workers():
+    port = _free_port()
+    master = multiprocessing.get_context("fork").Process(target=_serve, args=(port,))
+    master.start()
+    try:
+        workers = _until(lambda: len(child_pids(master.pid)) == 2 and child_pids(master.pid))
+        assert _until(lambda: _ask(port)) in workers
+
+        for pid in workers:
+            memory = process_memory(pid)
+            # The 64 MB preloaded in the master is shared, not copied
+            assert memory["rss_bytes"] - memory["uss_bytes"] > 48 * 2**20
+
+        os.kill(workers[0], signal.SIGKILL)
+        replaced = _until(
+            lambda: (pids := child_pids(master.pid)) and len(pids) == 2 and workers[0] not in pids and pids
+        )
+        assert workers[1] in replaced
+        assert _until(lambda: _ask(port)) in replaced
+    finally:
+        master.terminate()
+        master.join(10)
+    assert master.exitcode == 0
@@ -4,7 +4,8 @@ from src.data_providers.standalone_provider import StandaloneDataProvider
 
 
 class FakeTicker:
-    def __init__(self):
+    def __init__(self, contract):
+        self.contract = contract
         self.last = 100.0
         self.close = None
         self.bid = 99.5
@@ -17,14 +18,16 @@ class FakeTicker:
 class FakeIB:
     def __init__(self):
         self.cancel_called = False
+        self.requests = 0
 
     def isConnected(self):
         return True
 
     def reqMktData(self, contract, *args):
-        return FakeTicker()
+        self.requests += 1
+        return FakeTicker(contract)
 
-    def cancelMktData(self, ticker):
+    def cancelMktData(self, contract):
         self.cancel_called = True
         raise Exception("No reqId found")
 
@@ -35,5 +38,11 @@ async def test_cancel_mkt_data_handled():
     provider.ib = FakeIB()
     result = await provider.get_current_price("SPX")
     assert result["symbol"] == "SPX"
-    assert provider.ib.cancel_called
+    await provider.get_current_price("SPX")
+    # The subscription is kept between reads
+    assert provider.ib.requests == 1
+    assert not provider.ib.cancel_called
 
+    provider.quotes.close()
+    assert provider.ib.cancel_called
+    assert provider.quotes.symbols == []
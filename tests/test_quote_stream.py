@@ -0,0 +1,111 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from src.quote_stream import QuoteStream, StaleQuoteError
+
+
+class FakeEvent:
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self.handlers.remove(handler)
+        return self
+
+    def emit(self, *args):
+        for handler in list(self.handlers):
+            handler(*args)
+
+
+class FakeIB:
+    def __init__(self):
+        self.pendingTickersEvent = FakeEvent()
+        self.tickers = {}
+        self.requests = []
+        self.cancelled = []
+
+    def reqMktData(self, contract, *args):
+        self.requests.append(contract.symbol)
+        ticker = SimpleNamespace(
+            contract=contract, last=math.nan, close=None, bid=math.nan, ask=math.nan,
+            bidSize=math.nan, askSize=math.nan,
+        )
+        self.tickers[contract.symbol] = ticker
+        return ticker
+
+    def cancelMktData(self, contract):
+        self.cancelled.append(contract.symbol)
+
+    def tick(self, symbol, last, bid=None, ask=None):
+        ticker = self.tickers[symbol]
+        ticker.last, ticker.bid, ticker.ask = last, bid, ask
+        self.pendingTickersEvent.emit([ticker])
+
+
+@pytest.mark.asyncio
+async def test_quotes_are_streamed_and_served_from_memory():
+    ib = FakeIB()
+    stream = QuoteStream(ib, max_age=0.05)
+
+    waiter = asyncio.ensure_future(stream.wait_for("SPX", timeout=1))
+    await asyncio.sleep(0)
+    assert stream.get("SPX") is None
+    ib.tick("SPX", 5850.0, 5849.5, 5850.5)
+    quote = await waiter
+    assert (quote.last, quote.bid, quote.ask) == (5850.0, 5849.5, 5850.5)
+
+    ib.tick("SPX", 5851.0)
+    assert (await stream.wait_for("SPX")).last == 5851.0
+    assert stream.get("SPX").to_dict()["bid"] == 0.0
+    assert ib.requests == ["SPX"]
+    assert not stream.is_stale("SPX")
+
+    await asyncio.sleep(0.06)
+    assert stream.is_stale("SPX")
+    assert stream.stats()["stale"] == ["SPX"]
+
+    stream.close()
+    assert ib.cancelled == ["SPX"]
+    assert ib.pendingTickersEvent.handlers == []
+
+
+@pytest.mark.asyncio
+async def test_wait_for_times_out_without_ticks():
+    stream = QuoteStream(FakeIB())
+    with pytest.raises(TimeoutError):
+        await stream.wait_for("NDX", timeout=0.01)
+    with pytest.raises(TimeoutError):
+        stream.wait_for_sync("NDX", timeout=0.01)
+    assert stream.staleness() == {"NDX": None}
+
+
+@pytest.mark.asyncio
+async def test_stale_quote_resubscribes_and_waits_for_fresh_tick():
+    ib = FakeIB()
+    stream = QuoteStream(ib, max_age=0.02, resubscribe_interval=10)
+    stream.subscribe("SPX")
+    ib.tick("SPX", 5850.0)
+    await asyncio.sleep(0.03)
+
+    # The subscription went quiet: replace it and serve the next tick only
+    waiter = asyncio.ensure_future(stream.wait_for("SPX", timeout=1))
+    await asyncio.sleep(0)
+    assert ib.cancelled == ["SPX"] and ib.requests == ["SPX", "SPX"]
+    ib.tick("SPX", 5852.0)
+    assert (await waiter).last == 5852.0
+
+    # Still quiet after a recent resubscribe: fail fast so callers fall back
+    await asyncio.sleep(0.03)
+    with pytest.raises(StaleQuoteError):
+        await stream.wait_for("SPX", timeout=1)
+    with pytest.raises(StaleQuoteError):
+        stream.wait_for_sync("SPX", timeout=1)
+    assert stream.stats()["resubscribes"] == 1
+    assert stream.stats()["stale_reads"] == 3
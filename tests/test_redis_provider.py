@@ -0,0 +1,146 @@
+import asyncio
+import fnmatch
+import json
+
+import pytest
+
+from src.data_providers.redis_provider import RedisDataProvider
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.patterns = []
+        self.queue = asyncio.Queue()
+
+    async def psubscribe(self, *patterns):
+        self.patterns.extend(patterns)
+        self.server.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    async def aclose(self):
+        if self in self.server.subscribers:
+            self.server.subscribers.remove(self)
+
+
+class FakeRedis:
+    """In-process stand-in for ``redis.asyncio.Redis`` (strings + pub/sub)."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+        self.calls = []
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.calls.append(("mget", tuple(keys)))
+        return [self.data.get(k) for k in keys]
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def publish(self, channel, payload):
+        for sub in list(self.subscribers):
+            pattern = next((p for p in sub.patterns if fnmatch.fnmatchcase(channel, p)), None)
+            if pattern is not None:
+                sub.queue.put_nowait(
+                    {"type": "pmessage", "pattern": pattern, "channel": channel, "data": json.dumps(payload)}
+                )
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    async def aclose(self):
+        pass
+
+
+async def _provider(server, **kwargs):
+    provider = RedisDataProvider(client=server, **kwargs)
+    assert await provider.connect()
+    await asyncio.sleep(0)
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_multi_symbol_reads_cost_one_round_trip():
+    server = FakeRedis()
+    server.data["quote:SPX"] = json.dumps({"symbol": "SPX", "last": 5000.0})
+    server.data["quote:NDX"] = json.dumps({"symbol": "NDX", "last": 18000.0})
+    provider = await _provider(server)
+
+    quotes = await provider.get_current_price_many(["SPX", "NDX", "RUT"])
+    assert quotes["SPX"]["last"] == 5000.0
+    assert quotes["NDX"]["last"] == 18000.0
+    assert quotes["RUT"]["last"] == 0
+    assert server.calls == [("mget", ("quote:SPX", "quote:NDX", "quote:RUT"))]
+
+    # Found keys are now mirrored; only the missing one is fetched again
+    await provider.get_current_price_many(["SPX", "NDX", "RUT"])
+    assert server.calls[-1] == ("mget", ("quote:RUT",))
+    assert provider.stats()["round_trips"] == 2
+    await provider.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_listener_mirrors_published_updates():
+    server = FakeRedis()
+    provider = await _provider(server)
+
+    bars = [{"time": str(i), "close": float(i)} for i in range(5)]
+    await server.publish("market:prices:SPX", {"bars": bars, "interval": "5 mins"})
+    await server.publish("market:prices:SPX", {"symbol": "SPX", "last": 5001.5})
+    await server.publish("market:vix", {"last": 17.2, "change": 0.3})
+
+    assert await provider.get_price_data("SPX", bars=3) == bars[-3:]
+    assert (await provider.get_current_price("SPX"))["last"] == 5001.5
+    assert (await provider.get_vix_data())["last"] == 17.2
+    assert server.calls == []
+    assert provider.stats()["messages"] == 3
+    await provider.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_bar_miss_returns_without_waiting():
+    provider = await _provider(FakeRedis())
+    result = await asyncio.wait_for(provider.get_price_data("TSLA"), 0.5)
+    assert result == []
+    await provider.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_callbacks_share_listener_and_listener_recovers():
+    server = FakeRedis()
+    provider = await _provider(server)
+    received = []
+
+    async def on_update(data):
+        received.append(data["last"])
+
+    await provider.subscribe_to_updates("SPX", on_update)
+    await provider.subscribe_to_updates("VIX", on_update, update_type="vix")
+    assert len(server.subscribers) == 1
+
+    server.subscribers[0].queue.put_nowait(ConnectionError("dropped"))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if server.subscribers:
+            break
+    assert provider.stats()["listener_restarts"] == 1
+
+    await server.publish("market:prices:SPX", {"symbol": "SPX", "last": 1.0})
+    await server.publish("market:prices:NDX", {"symbol": "NDX", "last": 2.0})
+    await server.publish("market:vix", {"last": 3.0})
+    assert received == [1.0, 3.0]
+    await provider.disconnect()
+    assert not server.subscribers
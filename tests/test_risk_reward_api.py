@@ -33,6 +33,12 @@ def create_client(monkeypatch):
             price = await self.provider.get_current_price(symbol)
             return {"price": price["last"], "volatility": 17.0, "source": "mock"}
 
+        async def get_market_data_many(self, symbols):
+            return {s: await self.get_market_data(s) for s in dict.fromkeys(symbols)}
+
+        async def get_price_data_many(self, symbols, bars=100, interval="5 mins"):
+            return {s: await self.provider.get_price_data(s, bars, interval) for s in dict.fromkeys(symbols)}
+
     monkeypatch.setattr(api, "DataManager", FakeManager)
     monkeypatch.setattr(api.joblib, "load", lambda p: type("M", (), {"predict_proba": lambda self, X: [[0.4, 0.6]]})())
 
@@ -0,0 +1,137 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from process_magic8_data_optimized_v3 import Magic8DataProcessorOptimized
+
+HEADER = "Day,Hour,Symbol,Price,Name,Predicted,Closed,Risk,Reward,Premium,Stop,Raw,Managed,Trade,Profit\n"
+
+
+def make_source(root):
+    rows = {
+        "2023-12-01-A": [
+            "2023-12-01,10:00,SPX,4500,Butterfly,0,0,10,20,1.5,0,1,2,desc,5",
+            "2023-12-01,10:05,NDX,15000,Iron Condor,0,0,10,20,0,0,1,2,desc,-3",
+        ],
+        "2023-12-01-B": [
+            # Same trade as the first folder -> cross-folder duplicate
+            "2023-12-01,10:00,SPX,4500,Butterfly,0,0,10,20,1.5,0,1,2,desc,5",
+            "2023-12-01,10:10,RUT,2000,Vertical,0,0,10,20,-1,0,1,2,desc,",
+        ],
+        "2023-12-04-A": [
+            "2023-12-04,09:35,SPX,4550,Sonar,0,0,10,20,2,0,1,2,desc,7",
+        ],
+    }
+    for folder, lines in rows.items():
+        path = root / folder
+        path.mkdir()
+        (path / "profit.csv").write_text(HEADER + "\n".join(lines) + "\n")
+
+
+def test_parallel_matches_serial(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    make_source(source)
+
+    serial = Magic8DataProcessorOptimized(str(source), str(tmp_path / "serial"))
+    serial.process_all_folders()
+
+    parallel = Magic8DataProcessorOptimized(str(source), str(tmp_path / "parallel"))
+    parallel.process_all_folders_parallel(workers=2)
+
+    expected = pd.read_csv(serial.output_file)
+    got = pd.read_csv(parallel.output_file)
+    pd.testing.assert_frame_equal(got, expected)
+
+    columnar = pd.read_parquet(tmp_path / "parallel" / "magic8_trades_complete.parquet")
+    assert len(columnar) == len(expected) == 4
+    assert list(columnar.columns) == parallel.column_order
+
+    assert parallel.total_trades_processed == serial.total_trades_processed
+    assert dict(parallel.strategy_counts) == dict(serial.strategy_counts)
+    assert len(parallel.quality_issues['duplicates']) == 1
+    assert len(parallel.quality_issues['negative_premiums']) == 1
+
+
+def test_incremental_only_parses_new_folders(tmp_path, monkeypatch):
+    source = tmp_path / "source"
+    source.mkdir()
+    make_source(source)
+    out = tmp_path / "out"
+
+    first = Magic8DataProcessorOptimized(str(source), str(out))
+    first.process_incremental()
+    assert set(first.load_manifest()['folders']) == {"2023-12-01-A", "2023-12-01-B", "2023-12-04-A"}
+
+    new = source / "2023-12-05-A"
+    new.mkdir()
+    (new / "profit.csv").write_text(HEADER + "2023-12-05,10:00,SPX,4600,Butterfly,0,0,10,20,1,0,1,2,desc,4\n")
+
+    parsed = []
+    original = Magic8DataProcessorOptimized.parse_folders
+
+    def tracking(self, folders, workers=None):
+        parsed.extend(f.name for f in folders)
+        return original(self, folders, workers)
+
+    monkeypatch.setattr(Magic8DataProcessorOptimized, "parse_folders", tracking)
+
+    second = Magic8DataProcessorOptimized(str(source), str(out))
+    second.process_incremental()
+    assert parsed == ["2023-12-05-A"]
+
+    full = Magic8DataProcessorOptimized(str(source), str(tmp_path / "full"))
+    full.process_all_folders()
+    pd.testing.assert_frame_equal(pd.read_csv(second.output_file), pd.read_csv(full.output_file))
+    assert dict(second.strategy_counts) == dict(full.strategy_counts)
+
+    entry = second.load_manifest()['folders']["2023-12-05-A"]
+    assert (entry['row_start'], entry['row_end']) == (4, 5)
+
+    # Unchanged tree: nothing is parsed and the dataset is left alone
+    parsed.clear()
+    Magic8DataProcessorOptimized(str(source), str(out)).process_incremental()
+    assert parsed == []
+
+    # Editing an older folder reparses just that folder
+    (source / "2023-12-04-A" / "profit.csv").write_text(
+        HEADER + "2023-12-04,09:35,SPX,4550,Sonar,0,0,10,20,2,0,1,2,desc,-7\n"
+    )
+    third = Magic8DataProcessorOptimized(str(source), str(out))
+    third.process_incremental()
+    assert parsed == ["2023-12-04-A"]
+    df = pd.read_csv(third.output_file)
+    assert len(df) == 5
+    assert df.loc[df['date'] == '2023-12-04', 'profit'].tolist() == [-7]
+
+
+def test_incremental_retries_folder_that_failed(tmp_path, monkeypatch):
+    source = tmp_path / "source"
+    source.mkdir()
+    make_source(source)
+    out = tmp_path / "out"
+
+    original = Magic8DataProcessorOptimized.process_folder
+    failures = []
+
+    def flaky(self, folder):
+        if folder.name == "2023-12-04-A" and not failures:
+            failures.append(folder.name)
+            raise OSError("transient read error")
+        return original(self, folder)
+
+    monkeypatch.setattr(Magic8DataProcessorOptimized, "process_folder", flaky)
+
+    first = Magic8DataProcessorOptimized(str(source), str(out))
+    first.process_incremental()
+    assert failures == ["2023-12-04-A"]
+    assert "2023-12-04-A" not in first.load_manifest()['folders']
+    assert len(pd.read_csv(first.output_file)) == 3
+
+    second = Magic8DataProcessorOptimized(str(source), str(out))
+    second.process_incremental()
+    assert "2023-12-04-A" in second.load_manifest()['folders']
+    assert len(pd.read_csv(second.output_file)) == 4